@@ -1,9 +1,14 @@
 from .agent import Agent
+from .completion_cache import CompletionCache
 from .orchestrator import DebateOrchestrator
 from .specializations import create_agent_for_domain
+from .runner import DebateRunner, DebateQueueFull
 
 __all__ = [
     'Agent',
+    'CompletionCache',
     'DebateOrchestrator',
     'create_agent_for_domain',
+    'DebateRunner',
+    'DebateQueueFull',
 ]
\ No newline at end of file
@@ -1,6 +1,13 @@
 import asyncio
-from typing import Optional, Dict, Any
-from llama_index.llms.ollama import Ollama
+import threading
+import time
+from typing import Optional, Dict, Any, Callable, List, Tuple
+from llama_index.core.base.llms.types import ChatMessage
+from .completion_cache import CompletionCache
+from .llm_registry import LLMRegistry, default_registry
+from .metrics import span
+from .prompts import PromptLayout
+from .tokens import count_tokens
 
 class Agent:
     def __init__(
@@ -9,7 +16,12 @@ class Agent:
         domain: str,
         knowledge_base,
         llm_type: str = "ollama",
-        model_name: str = "qwen2.5:3b"
+        model_name: str = "qwen2.5:3b",
+        request_timeout: float = 300.0,
+        registry: Optional[LLMRegistry] = None,
+        completion_cache: Optional[CompletionCache] = None,
+        max_tokens: Optional[int] = None,
+        stop_sequences: Optional[List[str]] = None
     ):
         """
         Initialize an Agent.
@@ -20,54 +32,190 @@ class Agent:
             knowledge_base: The knowledge base for accessing domain-specific information
             llm_type (str): The type of LLM to use
             model_name (str): The name of the model to use
+            request_timeout (float): Seconds to wait for a single LLM call
+            registry (LLMRegistry, optional): Shared LLM clients; defaults to the process-wide registry
+            completion_cache (CompletionCache, optional): Replays identical generations instead of
+                calling the LLM again
+            max_tokens (int, optional): Hard limit on tokens generated per response
+                (num_predict for Ollama); None leaves it to the model
+            stop_sequences (List[str], optional): Extra sequences that end a response; the other
+                participants' "[Name]:" tags are always added
         """
         self.name = name
         self.domain = domain
         self.knowledge_base = knowledge_base
         self.llm_type = llm_type
         self.model_name = model_name
+        self.request_timeout = request_timeout
+        self.registry = registry or default_registry
+        self.completion_cache = completion_cache
+        self.max_tokens = max_tokens
+        self.stop_sequences = stop_sequences or []
         self.context: Dict[str, Any] = {}
     
     
     
-    async def generate_response(self, prompt: str, context: Optional[Dict[str, Any]] = None) -> str:
+    async def generate_response(
+        self,
+        prompt: str,
+        context: Optional[Dict[str, Any]] = None,
+        on_token: Optional[Callable[[str], None]] = None,
+        use_cache: bool = True,
+        history: str = ""
+    ) -> str:
         """
         Generate a response based on the prompt and context.
 
         Args:
-            prompt (str): The input prompt
+            prompt (str): The question for this turn
             context (Dict[str, Any], optional): Additional context for the response
+            on_token (Callable[[str], None], optional): Called from a worker thread with each
+                generated text delta; the response is streamed when given
+            use_cache (bool): Use the completion cache, if any; False always samples afresh
+            history (str): The debate so far; placed before the per-turn parts of the prompt
+                so consecutive turns share a prefix the model server can reuse
 
         Returns:
             str: The generated response
+
+        Raises:
+            asyncio.TimeoutError: If the LLM does not answer within request_timeout
         """
         # Update context with any new information
         if context:
             self.context.update(context)
 
-        # Combine prompt with relevant knowledge from knowledge base
-        enhanced_prompt = self.knowledge_base.enhance_prompt(prompt, self.domain)
+        # Retrieve relevant knowledge for this turn, in the light of the debate so far
+        query = f"{history}\n\n{prompt}" if history else prompt
+        knowledge = await self.knowledge_base.aquery(query)
+
+        # Reuse the shared client for this model
+        llm = self.registry.get_llm(
+            self.llm_type,
+            self.model_name,
+            temperature=0.7,
+            request_timeout=self.request_timeout
+        )
+
+        layout = self.build_prompt(prompt, knowledge, history)
+        messages = layout.messages()
+        limits = self.generation_limits()
+
+        # Generate response using LLM; the Ollama client only blocks, so run it
+        # on a worker thread to keep the event loop free for other agents
+        async def generate() -> Tuple[str, Dict[str, Any]]:
+            # The worker thread can't be cancelled, so the client gives up at the
+            # same deadline and frees its backend slot instead of finishing unobserved
+            call_limits = {**limits, "deadline": time.monotonic() + self.request_timeout}
+            if on_token is None:
+                response = await asyncio.wait_for(
+                    asyncio.to_thread(llm.chat, messages, **call_limits),
+                    timeout=self.request_timeout
+                )
+                return response.message.content or "", response.additional_kwargs
+            stop = threading.Event()
+            try:
+                return await asyncio.wait_for(
+                    asyncio.to_thread(self._stream_completion, llm, messages, on_token, stop, call_limits),
+                    timeout=self.request_timeout
+                )
+            finally:
+                # Ends the worker's stream if we timed out or were cancelled
+                stop.set()
 
-        # Initialize LLM based on type
-        if self.llm_type == "ollama":
-            llm = Ollama(model=self.model_name, temperature=0.7,request_timeout=300)
-        else:
-            raise ValueError(f"Unsupported LLM type: {self.llm_type}")
+        with span("generation") as info:
+            if self.completion_cache is not None and use_cache:
+                key = CompletionCache.make_key(
+                    self.llm_type, self.model_name, layout.render(), {"temperature": 0.7, **limits}
+                )
+                (response_text, details), source = await self.completion_cache.get_or_compute(key, generate)
+                info["completion_cache"] = source
+                if source != "miss" and on_token is not None:
+                    # Nothing was streamed for a replayed answer; deliver it in one piece
+                    on_token(response_text)
+            else:
+                response_text, details = await generate()
+            if info.get("completion_cache", "miss") == "miss":
+                # Ollama reports how many tokens it generated; count them otherwise
+                info["tokens"] = (details or {}).get("eval_count") or count_tokens(response_text)
+        return f"[{self.name}]: {response_text}"
 
-        # Create the full prompt with system prompt and context
-        full_prompt = f"""{self.system_prompt}
+    def generation_limits(self) -> Dict[str, Any]:
+        """
+        Get the max_tokens and stop sequences passed with each generation.
 
-        The current context includes:
-        - Topic: {self.context.get('topic', 'Unknown')}
-        - Round: {self.context.get('current_round', 0)} of {self.context.get('total_rounds', 0)}
+        A response ends where the model starts speaking as another participant,
+        which it otherwise tends to do once it has made its own point.
 
-        {enhanced_prompt}
+        Returns:
+            Dict[str, Any]: Keyword arguments for the LLM's chat calls; empty when unlimited
+        """
+        limits: Dict[str, Any] = {}
+        if self.max_tokens is not None:
+            limits["max_tokens"] = self.max_tokens
+        stop = list(self.stop_sequences) + [
+            f"[{name}]:" for name in self.context.get('participants', []) if name != self.name
+        ]
+        if stop:
+            limits["stop"] = stop
+        return limits
+
+    def build_prompt(self, question: str, knowledge: str, history: str = "") -> PromptLayout:
+        """
+        Lay out a turn's prompt with the parts that change least first.
+
+        Args:
+            question (str): The question for this turn
+            knowledge (str): Context retrieved from the knowledge base
+            history (str): The debate so far
+
+        Returns:
+            PromptLayout: The system prompt, debate header, history and turn
+        """
+        total_rounds = self.context.get('total_rounds', 0)
+        header = f"Debate topic: {self.context.get('topic', 'Unknown')}\nRounds: {total_rounds}"
+        participants = self.context.get('participants')
+        if participants:
+            header += f"\nParticipants: {', '.join(participants)}"
+        current_round = self.context.get('round', self.context.get('current_round', 0))
+        return PromptLayout(
+            system=self.system_prompt,
+            header=header,
+            history=f"Debate so far:\n{history}" if history else "",
+            turn=f"""Round {current_round} of {total_rounds}.
+
+Use the following domain knowledge to inform your response:
+{knowledge}
+
+{question}
 
 Provide your expert perspective, using the knowledge from your domain to support your arguments."""
+        )
 
-        # Generate response using LLM
-        response = llm.complete(full_prompt)
-        return f"[{self.name}]: {str(response)}"
+    @staticmethod
+    def _stream_completion(
+        llm,
+        messages: List[ChatMessage],
+        on_token: Callable[[str], None],
+        stop: threading.Event,
+        limits: Optional[Dict[str, Any]] = None
+    ) -> Tuple[str, Dict[str, Any]]:
+        """Stream a chat completion on a worker thread, forwarding each delta.
+
+        Returns the text and the backend's details from the final chunk.
+        """
+        text, details = "", {}
+        stream = llm.stream_chat(messages, **(limits or {}))
+        try:
+            for chunk in stream:
+                if stop.is_set():
+                    break
+                if chunk.delta:
+                    on_token(chunk.delta)
+                text, details = chunk.message.content or "", chunk.additional_kwargs
+        finally:
+            stream.close()
+        return text, details
 
     def reset_context(self):
         """Reset the agent's context."""
@@ -0,0 +1,162 @@
+import asyncio
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from .metrics import metrics
+
+COMPLETION_CACHE = metrics.counter("llm_completion_cache_total", "LLM completions by cache result")
+
+# (text, backend details such as eval_count)
+Completion = Tuple[str, Dict[str, Any]]
+
+_STAT_NAMES = {"hit": "hits", "miss": "misses", "coalesced": "coalesced"}
+
+
+class _GenerationCancelled(Exception):
+    """The call generating a completion was cancelled, so a waiting call takes over."""
+
+
+class CompletionCache:
+    """Persistent cache of LLM completions, shared by every debate in the process.
+
+    Completions are keyed on the backend, model, full prompt and sampling
+    parameters, so re-running an identical debate replays it without calling
+    the LLM. Identical calls made while one is generating wait for it instead
+    of starting their own. The least recently used entries are evicted once
+    the cache holds more than max_entries.
+    """
+
+    def __init__(self, path: str = "completions.db", max_entries: int = 10000):
+        """
+        Initialize a CompletionCache.
+
+        Args:
+            path (str): Path of the SQLite database file; ":memory:" keeps it in this process
+            max_entries (int): Completions kept before the least recently used are evicted
+        """
+        self.path = path
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._in_flight: Dict[str, Future] = {}
+        self._stats = {"hits": 0, "misses": 0, "coalesced": 0}
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        with self._lock, self._conn:
+            # WAL lets other worker processes read while one writes
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS completions (
+                    key TEXT PRIMARY KEY,
+                    text TEXT NOT NULL,
+                    details TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_completions_last_used ON completions (last_used);
+            """)
+
+    @staticmethod
+    def make_key(llm_type: str, model_name: str, prompt: str, params: Dict[str, Any]) -> str:
+        """Hash everything that determines a completion."""
+        payload = json.dumps([llm_type, model_name, prompt, params], sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Completion]:
+        """Get a cached completion, marking it recently used."""
+        with self._lock, self._conn:
+            row = self._conn.execute("SELECT text, details FROM completions WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE completions SET last_used = ? WHERE key = ?", (time.time(), key))
+        return row[0], json.loads(row[1])
+
+    def put(self, key: str, text: str, details: Optional[Dict[str, Any]] = None) -> None:
+        """Store a completion, evicting the least recently used ones over max_entries."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO completions (key, text, details, created_at, last_used) VALUES (?, ?, ?, ?, ?)",
+                (key, text, json.dumps(details or {}, default=str), now, now)
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM completions").fetchone()[0]
+            if count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM completions WHERE key IN "
+                    "(SELECT key FROM completions ORDER BY last_used ASC LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[Completion]]) -> Tuple[Completion, str]:
+        """
+        Get a completion from the cache, from an identical call in flight, or by computing it.
+
+        Args:
+            key (str): The key from make_key
+            compute (Callable): Generates the completion when nobody else has it
+
+        Returns:
+            Tuple: The completion and where it came from: "hit", "coalesced" or "miss"
+
+        Raises:
+            Exception: Whatever compute raised, here or in the identical call this one waited for
+        """
+        while True:
+            with self._lock:
+                future = self._in_flight.get(key)
+                owner = future is None
+                if owner:
+                    future = self._in_flight[key] = Future()
+
+            if not owner:
+                try:
+                    # Shielded so a waiter being cancelled does not cancel the shared generation
+                    return await asyncio.shield(asyncio.wrap_future(future)), self._count("coalesced")
+                except _GenerationCancelled:
+                    # Only the generating call's caller gave up; one waiter takes over, the rest wait for it
+                    continue
+
+            # The cache is read only once this call owns the key, so a completion
+            # stored by an earlier owner (which stores before releasing it) is seen.
+            # SQLite calls run in a thread so the lock and disk I/O never stall the event loop
+            try:
+                cached = await asyncio.to_thread(self.get, key)
+                completion = cached if cached is not None else await compute()
+            except BaseException as e:
+                with self._lock:
+                    self._in_flight.pop(key, None)
+                # Waiters fail with the same error rather than each retrying against a failing backend
+                future.set_exception(e if isinstance(e, Exception) else _GenerationCancelled())
+                raise
+            try:
+                if cached is None:
+                    await asyncio.to_thread(self.put, key, *completion)
+            except Exception as e:
+                print(f"Error caching completion: {e}")
+            finally:
+                # Waiters get the completion even if this call is cancelled while storing it
+                with self._lock:
+                    self._in_flight.pop(key, None)
+                future.set_result(completion)
+            return completion, self._count("hit" if cached is not None else "miss")
+
+    def _count(self, result: str) -> str:
+        with self._lock:
+            self._stats[_STAT_NAMES[result]] += 1
+        COMPLETION_CACHE.inc(result=result)
+        return result
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit, miss and coalesced counts and the number of cached completions."""
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats["entries"] = self._conn.execute("SELECT COUNT(*) FROM completions").fetchone()[0]
+        return stats
+
+    def clear(self) -> None:
+        """Remove every cached completion."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM completions")
@@ -0,0 +1,76 @@
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class DebateEventLog:
+    """Append-only, thread-safe log of debate events that readers can follow.
+
+    Event ids start at 1 and are never reused, so a reader that remembers the
+    last id it saw can resume from there (e.g. via SSE's Last-Event-ID).
+    """
+
+    def __init__(self):
+        self._events: List[Optional[Dict[str, Any]]] = []
+        self._turn_tokens: Dict[str, List[int]] = {}
+        self._cond = threading.Condition()
+        self._closed = False
+
+    def publish(self, event_type: str, data: Dict[str, Any], turn: Optional[str] = None) -> int:
+        """
+        Append an event and wake up waiting readers.
+
+        Args:
+            event_type (str): The event name, e.g. "token" or "turn_end"
+            data (Dict[str, Any]): JSON-serializable event payload
+            turn (str, optional): Groups token events so they can be compacted once the turn ends
+
+        Returns:
+            int: The id of the new event
+        """
+        with self._cond:
+            event_id = len(self._events) + 1
+            self._events.append({"id": event_id, "type": event_type, "data": data})
+            if turn is not None:
+                self._turn_tokens.setdefault(turn, []).append(event_id - 1)
+            self._cond.notify_all()
+            return event_id
+
+    def compact(self, turn: str) -> None:
+        """Drop a finished turn's token events; its turn_end event carries the full text."""
+        with self._cond:
+            for position in self._turn_tokens.pop(turn, []):
+                self._events[position] = None
+
+    def close(self) -> None:
+        """Mark the log as finished so readers stop waiting."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    @property
+    def last_id(self) -> int:
+        return len(self._events)
+
+    def read(self, after: int = 0, timeout: Optional[float] = None) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Get the events published after a given id, waiting for new ones if needed.
+
+        Args:
+            after (int): The last event id the reader has seen
+            timeout (float, optional): Seconds to wait when there is nothing new
+
+        Returns:
+            Tuple[List[Dict[str, Any]], int]: The new events and the id to resume from
+        """
+        with self._cond:
+            if len(self._events) <= after and not self._closed:
+                self._cond.wait_for(
+                    lambda: len(self._events) > after or self._closed,
+                    timeout=timeout
+                )
+            events = [event for event in self._events[after:] if event is not None]
+            return events, max(after, len(self._events))
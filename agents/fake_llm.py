@@ -0,0 +1,185 @@
+import hashlib
+import math
+import random
+import re
+import threading
+import time
+from typing import Any, List, Optional, Sequence
+
+from llama_index.core.base.embeddings.base import BaseEmbedding
+from llama_index.core.base.llms.types import (
+    CompletionResponse,
+    CompletionResponseGen,
+    LLMMetadata,
+)
+from llama_index.core.bridge.pydantic import Field, PrivateAttr
+from llama_index.core.llms.callbacks import llm_completion_callback
+from llama_index.core.llms.custom import CustomLLM
+
+# Words the fake LLM builds its answers from
+_VOCABULARY = (
+    "data model evidence risk cost scale users privacy accuracy bias training "
+    "deployment latency research design system analysis trade-off benefit "
+    "quality ethics automation insight pipeline feedback experiment metric "
+    "because however therefore moreover while the a of to and in for with"
+).split()
+
+
+def _seed(*parts: str) -> int:
+    return int.from_bytes(hashlib.sha256("\x00".join(parts).encode("utf-8")).digest()[:8], "big")
+
+
+class FakeLLM(CustomLLM):
+    """Deterministic local LLM for benchmarks and offline development.
+
+    The answer depends only on the model name and prompt, and is produced at a
+    configurable latency and token rate so timings are repeatable.
+    """
+
+    model_name: str = Field(default="fake", description="Name reported in the metadata.")
+    latency: float = Field(default=0.0, description="Seconds before the first token.")
+    tokens_per_second: Optional[float] = Field(
+        default=None, description="Generation speed; None returns every token at once."
+    )
+    response_tokens: int = Field(default=64, description="Words in every answer.")
+    context_window: int = Field(default=4096, description="Context window reported in the metadata.")
+
+    _limiter: Optional[threading.BoundedSemaphore] = PrivateAttr()
+
+    def __init__(self, limiter: Optional[threading.BoundedSemaphore] = None, **kwargs: Any):
+        super().__init__(**kwargs)
+        self._limiter = limiter
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "FakeLLM"
+
+    @property
+    def metadata(self) -> LLMMetadata:
+        return LLMMetadata(
+            context_window=self.context_window,
+            num_output=self.response_tokens,
+            model_name=self.model_name,
+        )
+
+    def _words(self, prompt: str, max_tokens: Optional[int] = None, stop: Optional[Sequence[str]] = None) -> List[str]:
+        """The answer's words, cut at max_tokens or before the first stop sequence, as a server would."""
+        rng = random.Random(_seed(self.model_name, prompt))
+        words = [rng.choice(_VOCABULARY) for _ in range(self.response_tokens)]
+        if max_tokens is not None:
+            words = words[:max_tokens]
+        for sequence in stop or ():
+            text = " ".join(words)
+            if sequence in text:
+                words = text[:text.index(sequence)].split()
+        return words
+
+    def _acquire(self, deadline: Optional[float] = None) -> None:
+        """Take an in-flight slot, giving up at the deadline like the Ollama client."""
+        if self._limiter is None:
+            return
+        timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+        if not self._limiter.acquire(timeout=timeout):
+            raise TimeoutError("No free slot for the LLM request before its deadline")
+
+    def _token_delay(self) -> float:
+        return 1.0 / self.tokens_per_second if self.tokens_per_second else 0.0
+
+    @llm_completion_callback()
+    def complete(
+        self,
+        prompt: str,
+        formatted: bool = False,
+        max_tokens: Optional[int] = None,
+        stop: Optional[Sequence[str]] = None,
+        **kwargs: Any
+    ) -> CompletionResponse:
+        words = self._words(prompt, max_tokens, stop)
+        self._acquire(kwargs.get("deadline"))
+        try:
+            time.sleep(self.latency + self._token_delay() * len(words))
+        finally:
+            if self._limiter is not None:
+                self._limiter.release()
+        return CompletionResponse(text=" ".join(words))
+
+    @llm_completion_callback()
+    def stream_complete(
+        self,
+        prompt: str,
+        formatted: bool = False,
+        max_tokens: Optional[int] = None,
+        stop: Optional[Sequence[str]] = None,
+        **kwargs: Any
+    ) -> CompletionResponseGen:
+        words = self._words(prompt, max_tokens, stop)
+        delay = self._token_delay()
+        self._acquire(kwargs.get("deadline"))
+        try:
+            time.sleep(self.latency)
+            text = ""
+            for i, word in enumerate(words):
+                if delay:
+                    time.sleep(delay)
+                delta = word if i == 0 else f" {word}"
+                text += delta
+                yield CompletionResponse(text=text, delta=delta)
+        finally:
+            if self._limiter is not None:
+                self._limiter.release()
+
+
+class FakeEmbedding(BaseEmbedding):
+    """Deterministic local embedding model for benchmarks and offline development.
+
+    Words are hashed into a fixed number of dimensions, so texts that share
+    words get similar vectors and retrieval still returns sensible chunks.
+    """
+
+    dimension: int = Field(default=256, description="Length of every embedding.")
+    latency: float = Field(default=0.0, description="Seconds spent on each request, batched or not.")
+
+    _limiter: Optional[threading.BoundedSemaphore] = PrivateAttr()
+
+    def __init__(self, limiter: Optional[threading.BoundedSemaphore] = None, **kwargs: Any):
+        super().__init__(**kwargs)
+        self._limiter = limiter
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "FakeEmbedding"
+
+    def _request(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts as one simulated request to the backend."""
+        if self._limiter is not None:
+            self._limiter.acquire()
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+        finally:
+            if self._limiter is not None:
+                self._limiter.release()
+        return [self._embed(text) for text in texts]
+
+    def _embed(self, text: str) -> List[float]:
+        vector = [0.0] * self.dimension
+        for word in re.findall(r"\w+", text.lower()):
+            seed = _seed(word)
+            vector[seed % self.dimension] += 1.0 if (seed >> 32) & 1 else -1.0
+        norm = math.sqrt(sum(x * x for x in vector))
+        if not norm:
+            # Keep empty texts comparable instead of returning a zero vector
+            vector[0], norm = 1.0, 1.0
+        return [x / norm for x in vector]
+
+    def _get_query_embedding(self, query: str) -> List[float]:
+        return self._request([query])[0]
+
+    async def _aget_query_embedding(self, query: str) -> List[float]:
+        return self._request([query])[0]
+
+    def _get_text_embedding(self, text: str) -> List[float]:
+        return self._request([text])[0]
+
+    def _get_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        return self._request(texts)
@@ -0,0 +1,451 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import httpx
+from llama_index.core.base.llms.types import (
+    ChatMessage,
+    ChatResponse,
+    ChatResponseGen,
+    CompletionResponse,
+    CompletionResponseGen,
+    MessageRole,
+)
+from llama_index.core.bridge.pydantic import Field, PrivateAttr
+from llama_index.core.llms.callbacks import llm_chat_callback, llm_completion_callback
+from llama_index.embeddings.ollama import OllamaEmbedding
+from llama_index.llms.ollama import Ollama
+from .fake_llm import FakeEmbedding, FakeLLM
+from .metrics import metrics
+
+LLM_DEADLINE_EXCEEDED = metrics.counter(
+    "llm_deadline_exceeded_total", "LLM requests given up because their caller's deadline passed"
+)
+
+DEFAULT_OLLAMA_URL = "http://localhost:11434"
+
+
+class PooledOllama(Ollama):
+    """Ollama LLM that reuses one HTTP connection pool and honours an in-flight limit.
+
+    Chat requests let the server apply the model's chat template, and
+    keep_alive keeps the model (and the KV cache of the prompt prefix it last
+    evaluated) loaded between turns.
+
+    Every call takes an optional deadline (a time.monotonic() value). The wait
+    for a free slot and the HTTP timeout both end at it, so a request whose
+    caller has stopped waiting does not keep holding, or later take, a slot.
+    """
+
+    keep_alive: Optional[str] = Field(
+        default=None, description="How long the server keeps the model loaded, e.g. '30m'; None uses its default."
+    )
+
+    _client: httpx.Client = PrivateAttr()
+    _limiter: threading.BoundedSemaphore = PrivateAttr()
+
+    def __init__(self, client: httpx.Client, limiter: threading.BoundedSemaphore, **kwargs: Any):
+        super().__init__(**kwargs)
+        self._client = client
+        self._limiter = limiter
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "PooledOllama_llm"
+
+    @contextmanager
+    def _slot(self, deadline: Optional[float] = None):
+        """Hold an in-flight slot, yielding the HTTP timeout left before the deadline."""
+        if deadline is None:
+            with self._limiter:
+                yield self.request_timeout
+            return
+        if not self._limiter.acquire(timeout=max(deadline - time.monotonic(), 0)):
+            LLM_DEADLINE_EXCEEDED.inc(stage="queued")
+            raise TimeoutError("No free slot for the LLM request before its deadline")
+        try:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                LLM_DEADLINE_EXCEEDED.inc(stage="queued")
+                raise TimeoutError("No free slot for the LLM request before its deadline")
+            try:
+                yield min(self.request_timeout, remaining)
+            except httpx.TimeoutException:
+                LLM_DEADLINE_EXCEEDED.inc(stage="request")
+                raise
+        finally:
+            self._limiter.release()
+
+    def _payload(
+        self,
+        stream: bool,
+        max_tokens: Optional[int] = None,
+        stop: Optional[Sequence[str]] = None,
+        **kwargs: Any
+    ) -> Dict[str, Any]:
+        options = dict(self._model_kwargs)
+        # Per-call limits; the server stops generating at either
+        if max_tokens is not None:
+            options["num_predict"] = max_tokens
+        if stop:
+            options["stop"] = list(stop)
+        payload = {
+            "model": self.model,
+            "options": options,
+            "stream": stream,
+        }
+        if self.keep_alive is not None:
+            payload["keep_alive"] = self.keep_alive
+        payload.update(kwargs)
+        return payload
+
+    @staticmethod
+    def _messages(messages: Sequence[ChatMessage]) -> List[Dict[str, Any]]:
+        return [
+            {"role": message.role.value, "content": message.content, **message.additional_kwargs}
+            for message in messages
+        ]
+
+    @staticmethod
+    def _chat_response(raw: Dict[str, Any], text: str, delta: Optional[str] = None) -> ChatResponse:
+        message = raw.get("message") or {}
+        return ChatResponse(
+            message=ChatMessage(role=MessageRole(message.get("role", "assistant")), content=text),
+            delta=delta,
+            raw=raw,
+            additional_kwargs={k: v for k, v in raw.items() if k != "message"},
+        )
+
+    @llm_chat_callback()
+    def chat(self, messages: Sequence[ChatMessage], deadline: Optional[float] = None, **kwargs: Any) -> ChatResponse:
+        with self._slot(deadline) as timeout:
+            response = self._client.post(
+                url=f"{self.base_url}/api/chat",
+                json=self._payload(stream=False, messages=self._messages(messages), **kwargs),
+                timeout=timeout,
+            )
+            response.raise_for_status()
+            raw = response.json()
+        return self._chat_response(raw, (raw.get("message") or {}).get("content") or "")
+
+    @llm_chat_callback()
+    def stream_chat(
+        self, messages: Sequence[ChatMessage], deadline: Optional[float] = None, **kwargs: Any
+    ) -> ChatResponseGen:
+        # The slot is held for as long as the caller keeps consuming the stream
+        with self._slot(deadline) as timeout:
+            with self._client.stream(
+                method="POST",
+                url=f"{self.base_url}/api/chat",
+                json=self._payload(stream=True, messages=self._messages(messages), **kwargs),
+                timeout=timeout,
+            ) as response:
+                response.raise_for_status()
+                text = ""
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    delta = (chunk.get("message") or {}).get("content") or ""
+                    text += delta
+                    yield self._chat_response(chunk, text, delta)
+
+    @llm_completion_callback()
+    def complete(
+        self, prompt: str, formatted: bool = False, deadline: Optional[float] = None, **kwargs: Any
+    ) -> CompletionResponse:
+        with self._slot(deadline) as timeout:
+            response = self._client.post(
+                url=f"{self.base_url}/api/generate",
+                json=self._payload(stream=False, **{self.prompt_key: prompt, **kwargs}),
+                timeout=timeout,
+            )
+            response.raise_for_status()
+            raw = response.json()
+        return CompletionResponse(
+            text=raw.get("response"),
+            raw=raw,
+            additional_kwargs={k: v for k, v in raw.items() if k != "response"},
+        )
+
+    @llm_completion_callback()
+    def stream_complete(
+        self, prompt: str, formatted: bool = False, deadline: Optional[float] = None, **kwargs: Any
+    ) -> CompletionResponseGen:
+        # The slot is held for as long as the caller keeps consuming the stream
+        with self._slot(deadline) as timeout:
+            with self._client.stream(
+                method="POST",
+                url=f"{self.base_url}/api/generate",
+                json=self._payload(stream=True, **{self.prompt_key: prompt, **kwargs}),
+                timeout=timeout,
+            ) as response:
+                response.raise_for_status()
+                text = ""
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    delta = chunk.get("response") or ""
+                    text += delta
+                    yield CompletionResponse(
+                        delta=delta,
+                        text=text,
+                        raw=chunk,
+                        additional_kwargs={k: v for k, v in chunk.items() if k != "response"},
+                    )
+
+
+class PooledOllamaEmbedding(OllamaEmbedding):
+    """Ollama embedding model that reuses one HTTP connection pool and honours an in-flight limit."""
+
+    _client: httpx.Client = PrivateAttr()
+    _limiter: threading.BoundedSemaphore = PrivateAttr()
+    _batch_supported: bool = PrivateAttr()
+
+    def __init__(self, client: httpx.Client, limiter: threading.BoundedSemaphore, **kwargs: Any):
+        super().__init__(**kwargs)
+        self._client = client
+        self._limiter = limiter
+        self._batch_supported = True
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "PooledOllamaEmbedding"
+
+    def _get_text_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Embed a batch in one request; servers without /api/embed get one request per text."""
+        if self._batch_supported:
+            with self._limiter:
+                response = self._client.post(
+                    url=f"{self.base_url}/api/embed",
+                    json={
+                        "input": texts,
+                        "model": self.model_name,
+                        "options": self.ollama_additional_kwargs,
+                    },
+                )
+            if response.status_code == 200:
+                return response.json()["embeddings"]
+            if response.status_code != 404:
+                raise ValueError(
+                    f"Ollama call failed with status code {response.status_code}."
+                    f" Details: {response.text}"
+                )
+            self._batch_supported = False
+        return [self.get_general_text_embedding(text) for text in texts]
+
+    def get_general_text_embedding(self, prompt: str) -> List[float]:
+        """Get Ollama embedding."""
+        with self._limiter:
+            response = self._client.post(
+                url=f"{self.base_url}/api/embeddings",
+                json={
+                    "prompt": prompt,
+                    "model": self.model_name,
+                    "options": self.ollama_additional_kwargs,
+                },
+            )
+        if response.status_code != 200:
+            raise ValueError(
+                f"Ollama call failed with status code {response.status_code}."
+                f" Details: {response.text}"
+            )
+        return response.json()["embedding"]
+
+
+class LLMRegistry:
+    """Shared LLM and embedding clients, reused across agents and debates.
+
+    Backends are looked up by llm_type: "ollama" talks to an Ollama server and
+    "fake" runs the deterministic local models from fake_llm. Others can be
+    added with register_backend.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = 4,
+        base_url: str = DEFAULT_OLLAMA_URL,
+        fake_options: Optional[Dict[str, Any]] = None,
+        fake_embed_options: Optional[Dict[str, Any]] = None,
+        embed_batch_size: int = 64,
+        ollama_options: Optional[Dict[str, Any]] = None
+    ):
+        """
+        Initialize an LLMRegistry.
+
+        Args:
+            max_in_flight (int): Maximum concurrent requests sent to one backend
+            base_url (str): URL of the Ollama server
+            fake_options (Dict[str, Any], optional): Settings for the "fake" backend's LLM,
+                e.g. latency and tokens_per_second
+            fake_embed_options (Dict[str, Any], optional): Settings for the "fake" backend's
+                embedding model, e.g. latency and dimension
+            embed_batch_size (int): Texts embedded per request when embedding in bulk
+            ollama_options (Dict[str, Any], optional): Extra settings for Ollama LLMs,
+                e.g. keep_alive and context_window
+        """
+        self.max_in_flight = max_in_flight
+        self.base_url = base_url
+        self.fake_options = fake_options or {}
+        self.fake_embed_options = fake_embed_options or {}
+        self.embed_batch_size = embed_batch_size
+        self.ollama_options = ollama_options or {}
+        self._lock = threading.Lock()
+        self._llms: Dict[Tuple[str, str, float, float], Any] = {}
+        self._embed_models: Dict[Tuple[str, str], Any] = {}
+        self._clients: Dict[str, httpx.Client] = {}
+        self._limiters: Dict[str, threading.BoundedSemaphore] = {}
+        self._llm_factories: Dict[str, Callable[..., Any]] = {}
+        self._embed_factories: Dict[str, Callable[..., Any]] = {}
+        self.register_backend("ollama", self._ollama_llm, self._ollama_embed_model)
+        self.register_backend("fake", self._fake_llm, self._fake_embed_model)
+
+    def register_backend(
+        self,
+        llm_type: str,
+        llm_factory: Optional[Callable[..., Any]] = None,
+        embed_factory: Optional[Callable[..., Any]] = None
+    ) -> None:
+        """
+        Add or replace the clients used for an llm_type.
+
+        Args:
+            llm_type (str): The name agents and knowledge bases select the backend by
+            llm_factory (Callable, optional): Called as (model_name, temperature,
+                request_timeout, limiter) to build an LLM. Its calls may be passed
+                max_tokens, stop and deadline (a time.monotonic() value) keywords
+            embed_factory (Callable, optional): Called as (model_name, limiter) to build
+                an embedding model
+        """
+        with self._lock:
+            if llm_factory is not None:
+                self._llm_factories[llm_type] = llm_factory
+            if embed_factory is not None:
+                self._embed_factories[llm_type] = embed_factory
+            # Clients built by a previous factory are stale
+            self._llms = {k: v for k, v in self._llms.items() if k[0] != llm_type}
+            self._embed_models = {k: v for k, v in self._embed_models.items() if k[0] != llm_type}
+
+    def _ollama_llm(self, model_name: str, temperature: float, request_timeout: float, limiter) -> PooledOllama:
+        return PooledOllama(
+            client=self._client("ollama"),
+            limiter=limiter,
+            model=model_name,
+            base_url=self.base_url,
+            temperature=temperature,
+            request_timeout=request_timeout,
+            **self.ollama_options
+        )
+
+    def _ollama_embed_model(self, model_name: str, limiter) -> PooledOllamaEmbedding:
+        return PooledOllamaEmbedding(
+            client=self._client("ollama"),
+            limiter=limiter,
+            model_name=model_name,
+            base_url=self.base_url,
+            embed_batch_size=self.embed_batch_size
+        )
+
+    def _fake_llm(self, model_name: str, temperature: float, request_timeout: float, limiter) -> FakeLLM:
+        return FakeLLM(limiter=limiter, model_name=model_name, **self.fake_options)
+
+    def _fake_embed_model(self, model_name: str, limiter) -> FakeEmbedding:
+        return FakeEmbedding(
+            limiter=limiter,
+            model_name=model_name,
+            embed_batch_size=self.embed_batch_size,
+            **self.fake_embed_options
+        )
+
+    def _backend_key(self, llm_type: str) -> str:
+        return f"{llm_type}@{self.base_url}"
+
+    def _client(self, llm_type: str) -> httpx.Client:
+        """Get the HTTP client shared by every model on a backend."""
+        key = self._backend_key(llm_type)
+        if key not in self._clients:
+            self._clients[key] = httpx.Client(
+                limits=httpx.Limits(
+                    max_connections=self.max_in_flight,
+                    max_keepalive_connections=self.max_in_flight
+                ),
+                timeout=httpx.Timeout(300.0)
+            )
+        return self._clients[key]
+
+    def limiter(self, llm_type: str) -> threading.BoundedSemaphore:
+        """Get the semaphore capping in-flight requests to a backend."""
+        key = self._backend_key(llm_type)
+        with self._lock:
+            if key not in self._limiters:
+                self._limiters[key] = threading.BoundedSemaphore(self.max_in_flight)
+            return self._limiters[key]
+
+    def get_llm(
+        self,
+        llm_type: str,
+        model_name: str,
+        temperature: float = 0.7,
+        request_timeout: float = 300.0
+    ):
+        """
+        Get a shared LLM client, creating it on first use.
+
+        Args:
+            llm_type (str): The type of LLM to use
+            model_name (str): The name of the model to use
+            temperature (float): Sampling temperature
+            request_timeout (float): Seconds to wait for a single request
+
+        Returns:
+            The LLM client for this configuration
+        """
+        key = (llm_type, model_name, temperature, request_timeout)
+        limiter = self.limiter(llm_type)
+        with self._lock:
+            llm = self._llms.get(key)
+            if llm is None:
+                factory = self._llm_factories.get(llm_type)
+                if factory is None:
+                    raise ValueError(f"Unsupported LLM type: {llm_type}")
+                llm = factory(model_name, temperature, request_timeout, limiter)
+                self._llms[key] = llm
+            return llm
+
+    def get_embed_model(self, llm_type: str, model_name: str):
+        """
+        Get a shared embedding model client, creating it on first use.
+
+        Args:
+            llm_type (str): The type of backend serving the embeddings
+            model_name (str): The name of the embedding model
+
+        Returns:
+            The embedding model client
+        """
+        key = (llm_type, model_name)
+        limiter = self.limiter(llm_type)
+        with self._lock:
+            embed_model = self._embed_models.get(key)
+            if embed_model is None:
+                factory = self._embed_factories.get(llm_type)
+                if factory is None:
+                    raise ValueError(f"Unsupported embedding type: {llm_type}")
+                embed_model = factory(model_name, limiter)
+                self._embed_models[key] = embed_model
+            return embed_model
+
+    def close(self) -> None:
+        """Close the shared HTTP connection pools."""
+        with self._lock:
+            for client in self._clients.values():
+                client.close()
+            self._clients.clear()
+            self._llms.clear()
+            self._embed_models.clear()
+
+
+default_registry = LLMRegistry()
@@ -0,0 +1,269 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Seconds; covers a cached retrieval up to a slow summary call
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+# (labels, value) pairs reported by a collector for one gauge
+GaugeSamples = List[Tuple[Dict[str, Any], float]]
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in sorted(labels.items())) + "}"
+
+
+class Counter:
+    """Monotonically increasing value per label set."""
+
+    def __init__(self, name: str, help_text: str):
+        self.name = name
+        self.help_text = help_text
+        self._lock = threading.Lock()
+        self._values: Dict[Tuple[Tuple[str, Any], ...], float] = {}
+
+    def inc(self, value: float = 1.0, **labels: Any) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(dict(key))} {value}")
+        return lines
+
+
+class Histogram:
+    """Cumulative bucket counts, sum and count per label set."""
+
+    def __init__(self, name: str, help_text: str, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        # label key -> [per-bucket counts, sum, count]
+        self._series: Dict[Tuple[Tuple[str, Any], ...], List[Any]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total, count) in sorted(self._series.items()):
+                labels = dict(key)
+                for bound, bucket_count in zip(self.buckets, counts):
+                    lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': bound})} {bucket_count}")
+                lines.append(f"{self.name}_bucket{_format_labels({**labels, 'le': '+Inf'})} {count}")
+                lines.append(f"{self.name}_sum{_format_labels(labels)} {total}")
+                lines.append(f"{self.name}_count{_format_labels(labels)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    """Process-wide metrics, rendered in the Prometheus text exposition format."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, Any] = {}
+        self._collectors: List[Callable[[], List[Tuple[str, str, GaugeSamples]]]] = []
+
+    def counter(self, name: str, help_text: str) -> Counter:
+        """Get a counter, creating it on first use."""
+        with self._lock:
+            return self._metrics.setdefault(name, Counter(name, help_text))
+
+    def histogram(self, name: str, help_text: str, buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        """Get a histogram, creating it on first use."""
+        with self._lock:
+            return self._metrics.setdefault(name, Histogram(name, help_text, buckets))
+
+    def add_collector(self, collector: Callable[[], List[Tuple[str, str, GaugeSamples]]]) -> None:
+        """
+        Report gauges that are read when metrics are rendered, e.g. cache statistics.
+
+        Args:
+            collector (Callable): Returns (name, help text, [(labels, value), ...]) per gauge
+        """
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        for collector in collectors:
+            try:
+                gauges = collector()
+            except Exception as e:
+                print(f"Error collecting metrics: {e}")
+                continue
+            for name, help_text, samples in gauges:
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} gauge")
+                for labels, value in samples:
+                    lines.append(f"{name}{_format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+
+metrics = MetricsRegistry()
+
+STAGE_SECONDS = metrics.histogram(
+    "debate_stage_seconds",
+    "Time spent in each stage of a debate (queue_wait, round, turn, retrieval, generation, summary, ...)"
+)
+GENERATED_TOKENS = metrics.counter("debate_generated_tokens_total", "Tokens generated by LLM calls, per stage")
+TOKENS_PER_SECOND = metrics.histogram(
+    "debate_tokens_per_second",
+    "Generation speed of LLM calls, per stage",
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000)
+)
+RETRIEVAL_CACHE = metrics.counter("kb_retrieval_cache_total", "Knowledge base lookups by cache result")
+
+
+class DebateTrace:
+    """Timing breakdown of one debate, filled in by the spans that run inside it."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # stage -> {"count", "errors", "total_s", "max_s"}
+        self._stages: Dict[str, Dict[str, float]] = {}
+        # (round, agent) -> per-turn timings
+        self._turns: Dict[Tuple[Any, Any], Dict[str, Any]] = {}
+        self._tokens = 0
+        self._cache = {"hits": 0, "misses": 0}
+        self._completions = {"hit": 0, "coalesced": 0, "miss": 0}
+
+    def record(self, stage: str, seconds: float, labels: Dict[str, Any], info: Dict[str, Any]) -> None:
+        """Add one finished span."""
+        tokens = info.get("tokens") or 0
+        with self._lock:
+            totals = self._stages.setdefault(stage, {"count": 0, "errors": 0, "total_s": 0.0, "max_s": 0.0})
+            totals["count"] += 1
+            if "error" in info:
+                totals["errors"] += 1
+            totals["total_s"] += seconds
+            totals["max_s"] = max(totals["max_s"], seconds)
+            self._tokens += tokens
+            if "cache" in info:
+                self._cache["hits" if info["cache"] != "miss" else "misses"] += 1
+            if "completion_cache" in info:
+                self._completions[info["completion_cache"]] += 1
+
+            if "round" in labels and "agent" in labels:
+                turn = self._turns.setdefault(
+                    (labels["round"], labels["agent"]),
+                    {"round": labels["round"], "agent": labels["agent"]}
+                )
+                turn[f"{stage}_s"] = turn.get(f"{stage}_s", 0.0) + seconds
+                if tokens:
+                    turn["tokens"] = turn.get("tokens", 0) + tokens
+                    if stage == "generation" and seconds > 0:
+                        turn["tokens_per_s"] = tokens / seconds
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get the per-stage totals, per-turn timings, token count and retrieval and completion cache hits."""
+        with self._lock:
+            return {
+                "stages": {stage: dict(totals) for stage, totals in self._stages.items()},
+                "turns": [dict(turn) for turn in self._turns.values()],
+                "tokens": self._tokens,
+                "retrieval_cache": dict(self._cache),
+                "completion_cache": dict(self._completions)
+            }
+
+
+_current_trace: ContextVar[Optional[DebateTrace]] = ContextVar("debate_trace", default=None)
+_current_labels: ContextVar[Dict[str, Any]] = ContextVar("span_labels", default={})
+
+
+def record_span(stage: str, seconds: float, info: Optional[Dict[str, Any]] = None,
+                trace: Optional[DebateTrace] = None, **labels: Any) -> None:
+    """
+    Record a timed stage in the process metrics and the current debate's trace.
+
+    Args:
+        stage (str): The stage name, used as the metric label
+        seconds (float): How long the stage took
+        info (Dict[str, Any], optional): Extra facts about the stage: "tokens" generated,
+            the "error" that ended it, for retrieval whether the "cache" was hit and, for
+            LLM calls, the "completion_cache" result
+        trace (DebateTrace, optional): The trace to add to; defaults to the current one
+        **labels: Round, agent and similar labels, added to those of enclosing spans
+    """
+    info = info or {}
+    STAGE_SECONDS.observe(seconds, stage=stage)
+    tokens = info.get("tokens")
+    if tokens:
+        GENERATED_TOKENS.inc(tokens, stage=stage)
+        if seconds > 0:
+            TOKENS_PER_SECOND.observe(tokens / seconds, stage=stage)
+    if "cache" in info:
+        RETRIEVAL_CACHE.inc(result=info["cache"])
+
+    trace = trace or _current_trace.get()
+    if trace is not None:
+        trace.record(stage, seconds, {**_current_labels.get(), **labels}, info)
+
+
+@contextmanager
+def span(stage: str, **labels: Any) -> Iterator[Dict[str, Any]]:
+    """
+    Time the enclosed block as one stage.
+
+    Labels are inherited by spans opened inside the block, including in worker
+    threads started with asyncio.to_thread, so a retrieval is attributed to the
+    turn that triggered it.
+
+    Args:
+        stage (str): The stage name
+        **labels: Round, agent and similar labels
+
+    Yields:
+        Dict[str, Any]: Info dict the block may fill in, see record_span
+    """
+    info: Dict[str, Any] = {}
+    reset = _current_labels.set({**_current_labels.get(), **labels})
+    start = time.perf_counter()
+    try:
+        yield info
+    except BaseException as e:
+        info.setdefault("error", type(e).__name__)
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        _current_labels.reset(reset)
+        record_span(stage, elapsed, info, **labels)
+
+
+@contextmanager
+def tracing(trace: DebateTrace) -> Iterator[DebateTrace]:
+    """Attribute spans in the enclosed block (and tasks it starts) to a debate's trace."""
+    reset = _current_trace.set(trace)
+    try:
+        yield trace
+    finally:
+        _current_trace.reset(reset)
@@ -1,8 +1,23 @@
 import asyncio
-from typing import List, Dict, Any
+import math
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Dict, Any, Callable, Optional, Tuple
 from .agent import Agent
-import markdown
-from llama_index.llms.ollama import Ollama
+from .completion_cache import CompletionCache
+from .events import DebateEventLog
+from .llm_registry import LLMRegistry, default_registry
+from .metrics import DebateTrace, span, tracing
+from .rendering import render_markdown
+from .tokens import TokenBudget, count_tokens, truncate_to_tokens
+import html
+
+# Allowance for the instructions the agent wraps around its prompt
+PROMPT_OVERHEAD_TOKENS = 100
+
+# Writes every debate's changes to its store, in order, so a slow or locked
+# database never stalls the event loop the debates share
+_store_writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="debate-store")
 
 class DebateOrchestrator:
     def __init__(
@@ -11,7 +26,20 @@ class DebateOrchestrator:
         agents: List[Agent],
         rounds: int = 3,
         summary_llm_type: str = "ollama",
-        summary_model_name: str = "qwen2.5:3b"
+        summary_model_name: str = "qwen2.5:3b",
+        summary_timeout: float = 300.0,
+        registry: Optional[LLMRegistry] = None,
+        concurrent_turns: bool = False,
+        max_concurrent_agents: Optional[int] = None,
+        context_window: int = 4096,
+        reserved_output_tokens: int = 512,
+        digest_tokens: int = 150,
+        completion_cache: Optional[CompletionCache] = None,
+        fresh_sampling: bool = False,
+        convergence_threshold: Optional[float] = None,
+        convergence_min_rounds: int = 2,
+        embed_model=None,
+        knowledge_base_loader: Optional[Callable[[str], Any]] = None
     ):
         """
         Initialize a DebateOrchestrator.
@@ -21,63 +49,434 @@ class DebateOrchestrator:
             agents (List[Agent]): List of agents participating in the debate
             rounds (int): Number of debate rounds
             summary_llm_type (str): LLM type for generating summaries
-            summary_model_name (str): Model name for generating summaries
+            summary_model_name (str): Model name for generating summaries, which may be a
+                smaller, faster model than the agents use
+            summary_timeout (float): Seconds to wait for the summary LLM call
+            registry (LLMRegistry, optional): Shared LLM clients; defaults to the process-wide registry
+            concurrent_turns (bool): Let all agents answer a round simultaneously; each agent
+                only sees the previous round, so the log is unchanged
+            max_concurrent_agents (int, optional): Cap on agents generating at once in concurrent mode
+            context_window (int): Tokens the agent and summary models accept per request
+            reserved_output_tokens (int): Tokens of each request kept free for the answer
+            digest_tokens (int): Length of the digest kept for each finished round
+            completion_cache (CompletionCache, optional): Replays identical summary and digest calls
+            fresh_sampling (bool): Bypass the completion caches, the orchestrator's and the agents',
+                so every answer in this debate is newly generated
+            convergence_threshold (float, optional): End the debate before rounds runs out once
+                every agent's response has at least this cosine similarity to its previous one;
+                None always runs every round
+            convergence_min_rounds (int): Rounds always run before the debate may end early
+            embed_model (BaseEmbedding, optional): Embeds responses for the convergence check;
+                defaults to the first agent's knowledge base embedding model
+            knowledge_base_loader (Callable[[str], Any], optional): Gets the knowledge base of a
+                domain for agents created without one. Called on worker threads when the debate
+                starts, so whoever creates the debate does not wait for index builds
         """
         self.topic = topic
         self.agents = agents
+        # Bumped on every change visible through get_status or the log, for cheap conditional requests
+        self.version = 0
+        # Optional durable store that mirrors every change (see attach_store)
+        self.store = None
+        self.debate_id: Optional[str] = None
+        self._store_write: Optional[Future] = None
         self.total_rounds = rounds
         self.current_round = 0
         self.debate_log: List[Dict[str, Any]] = []
+        # Quality metrics, updated once per appended entry rather than per status call
+        self._quality = {
+            "participation": {agent.name: 0 for agent in agents},
+            "knowledge_usage": {agent.name: 0 for agent in agents},
+            "cross_refs": 0,
+            "topic_mentions": 0
+        }
+        # Sanitized HTML of the summary, rendered once, and the markdown it came from
         self.summary = ""
+        self.summary_markdown = ""
+        # History older than the previous round is only kept as per-round digests,
+        # each written once in the background, then folded into one rolling digest
+        # when they no longer fit the budget
+        self.budget = TokenBudget(context_window, reserved_output_tokens)
+        self.digest_tokens = digest_tokens
+        self.round_digests: Dict[int, str] = {}
+        self._digest_tasks: Dict[int, "asyncio.Future[str]"] = {}
+        self._history_digest = ""
+        self._history_digest_upto = 0
+        self.context_tokens: Dict[str, int] = {}
+        # Per-stage timings of this debate, filled in by spans while it runs
+        self.trace = DebateTrace()
+        # Live feed of rounds, turns and tokens for streaming clients
+        self.events = DebateEventLog()
+        # initialized -> queued -> in_progress -> completed (or error/cancelled)
         self.status = "initialized"
-        self.summary_llm_type = "ollama"
-        self.summary_model_name = "qwen2.5:3b"
+        # pending -> in_progress -> completed (or error/cancelled); skipped when the rounds fail
+        self.summary_status = "pending"
+        self.summary_llm_type = summary_llm_type
+        self.summary_model_name = summary_model_name
+        self.summary_timeout = summary_timeout
+        self.registry = registry or default_registry
+        self.concurrent_turns = concurrent_turns
+        self.max_concurrent_agents = max_concurrent_agents
+        self.completion_cache = completion_cache
+        self.fresh_sampling = fresh_sampling
+        # Early stopping: each agent's latest response embedding and its similarity to the one before
+        self.convergence_threshold = convergence_threshold
+        self.convergence_min_rounds = convergence_min_rounds
+        self.embed_model = embed_model
+        self.knowledge_base_loader = knowledge_base_loader
+        self._last_embeddings: Dict[str, List[float]] = {}
+        self.similarities: Dict[str, float] = {}
+        self.converged = False
+
+    @property
+    def status(self) -> str:
+        return self._status
+
+    @status.setter
+    def status(self, value: str) -> None:
+        self._status = value
+        self._touch()
+        self.events.publish("status", {"status": value})
+
+    @property
+    def summary_status(self) -> str:
+        return self._summary_status
+
+    @summary_status.setter
+    def summary_status(self, value: str) -> None:
+        self._summary_status = value
+        self._touch()
+
+    def attach_store(self, store, debate_id: str) -> None:
+        """
+        Persist this debate in a store and keep it updated as the debate progresses.
+
+        Args:
+            store (DebateStore): The store to write to
+            debate_id (str): The ID to store the debate under
+        """
+        self.store = store
+        self.debate_id = debate_id
+        store.create(debate_id, self.snapshot())
+        for position, entry in enumerate(self.debate_log):
+            store.save(debate_id, self.snapshot(), entry=(position, entry))
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Get the debate state that is written to the store."""
+        return {
+            "topic": self.topic,
+            "summary": self.summary,
+            "summary_markdown": self.summary_markdown,
+            "agents": [
+                {
+                    "name": agent.name,
+                    "domain": agent.domain,
+                    "llm_type": getattr(agent, "llm_type", None),
+                    "model_name": getattr(agent, "model_name", None)
+                }
+                for agent in self.agents
+            ],
+            "status_info": self.get_status()
+        }
+
+    def _touch(self, entry: Optional[Any] = None) -> None:
+        """Record a state change, queueing it (and a new log entry) to be written to the store."""
+        self.version += 1
+        if self.store is None:
+            return
+        # The snapshot is taken now; readers of a running debate use this object, not the store
+        self._store_write = _store_writer.submit(self._save, self.snapshot(), entry)
+
+    def _save(self, snapshot: Dict[str, Any], entry: Optional[Any]) -> None:
+        try:
+            self.store.save(self.debate_id, snapshot, entry=entry)
+        except Exception as e:
+            print(f"Error saving debate {self.debate_id}: {e}")
+
+    async def flush_store(self) -> None:
+        """Wait until every change so far has been written to the store."""
+        if self._store_write is not None:
+            await asyncio.wrap_future(self._store_write)
 
     async def conduct_round(self) -> None:
         """Conduct a single round of debate."""
         self.current_round += 1
+        with span("round", round=self.current_round):
+            await self._conduct_round()
+
+    async def _conduct_round(self) -> None:
+        """Run every agent's turn for the current round and log the responses."""
+        self._touch()
         round_log = []
+        self.events.publish("round_start", {
+            "round": self.current_round,
+            "total_rounds": self.total_rounds
+        })
 
         # Generate context for this round
         context = {
             "topic": self.topic,
             "round": self.current_round,
             "total_rounds": self.total_rounds,
+            "participants": [agent.name for agent in self.agents],
             "previous_responses": self.debate_log
         }
 
-        # Each agent takes a turn
-        for agent in self.agents:
-            prompt = self._generate_prompt(agent, context)
-            response = await agent.generate_response(prompt, context)
+        # Prompts only depend on earlier rounds, so they can all be built up front
+        history = await self._build_history(self._history_budget())
+        prompts = [(agent, self._generate_prompt(agent, context)) for agent in self.agents]
+
+        if self.concurrent_turns:
+            responses = await self._take_turns_concurrently(prompts, context, history)
+        else:
+            # Each agent takes a turn
+            responses = []
+            for agent, prompt in prompts:
+                responses.append(await self._take_turn(agent, prompt, context, history))
+
+        # Log entries keep agent order regardless of which finished first
+        for agent, response in zip(self.agents, responses):
             round_log.append({
                 "agent": agent.name,
                 "response": response
             })
 
-        self.debate_log.extend(round_log)
+        for entry in round_log:
+            self._append_entry(entry)
+
+        if self.convergence_threshold is not None:
+            self.converged = await self._check_convergence(round_log)
+            self._touch()
+
+        # The last round is passed on in full, so only earlier ones need a digest
+        if self.current_round < self.total_rounds and not self.converged:
+            self._digest_tasks[self.current_round] = asyncio.ensure_future(
+                self._digest_round(self.current_round, round_log)
+            )
+
+    async def _check_convergence(self, round_log: List[Dict[str, Any]]) -> bool:
+        """Compare each agent's response with its previous one; True once none of them changed enough."""
+        embed_model = self.embed_model or getattr(self.agents[0].knowledge_base, "embed_model", None)
+        if embed_model is None:
+            return False
+
+        # Only the argument itself is compared, without the "[Name]: " tag
+        texts = [entry["response"].removeprefix(f"[{entry['agent']}]: ") for entry in round_log]
+        try:
+            with span("convergence"):
+                embeddings = await asyncio.to_thread(embed_model.get_text_embedding_batch, texts)
+        except Exception as e:
+            print(f"Error checking convergence: {e}")
+            return False
+
+        for entry, embedding in zip(round_log, embeddings):
+            previous = self._last_embeddings.get(entry["agent"])
+            if previous is not None:
+                self.similarities[entry["agent"]] = _cosine(previous, embedding)
+            self._last_embeddings[entry["agent"]] = embedding
+
+        return (
+            self.current_round >= self.convergence_min_rounds
+            and all(entry["agent"] in self.similarities for entry in round_log)
+            and all(self.similarities[entry["agent"]] >= self.convergence_threshold for entry in round_log)
+        )
+
+    async def _take_turn(self, agent: Agent, prompt: str, context: Dict[str, Any], history: str = "") -> str:
+        """Run one agent's turn, streaming its tokens to the event log."""
+        turn = f"{self.current_round}:{agent.name}"
+        self.events.publish("turn_start", {"round": self.current_round, "agent": agent.name})
+        with span("turn", round=self.current_round, agent=agent.name):
+            response = await agent.generate_response(
+                prompt,
+                context,
+                on_token=lambda delta: self.events.publish(
+                    "token", {"round": self.current_round, "agent": agent.name, "delta": delta}, turn=turn
+                ),
+                use_cache=not self.fresh_sampling,
+                history=history
+            )
+        self.events.publish("turn_end", {
+            "round": self.current_round,
+            "agent": agent.name,
+            "response": response
+        })
+        self.events.compact(turn)
+        return response
+
+    async def _take_turns_concurrently(
+        self,
+        prompts: List[Any],
+        context: Dict[str, Any],
+        history: str = ""
+    ) -> List[str]:
+        """Run every agent's turn at once, bounded by max_concurrent_agents."""
+        limit = asyncio.Semaphore(self.max_concurrent_agents or len(prompts))
+
+        async def bounded_turn(agent: Agent, prompt: str) -> str:
+            async with limit:
+                return await self._take_turn(agent, prompt, context, history)
+
+        tasks = [asyncio.ensure_future(bounded_turn(agent, prompt)) for agent, prompt in prompts]
+        try:
+            return await asyncio.gather(*tasks)
+        except BaseException:
+            # Don't leave the other agents generating after one has failed
+            for task in tasks:
+                task.cancel()
+            raise
 
     def _generate_prompt(self, agent: Agent, context: Dict[str, Any]) -> str:
-        """Generate a prompt for an agent based on context."""
+        """Generate this round's question for an agent; the history is passed to it separately."""
         if self.current_round == 1:
             return f"As an expert in {agent.domain}, what is your initial position on the topic: {self.topic}?"
         else:
-            # Include previous responses in the prompt
-            previous_responses = "\n".join([
-                f"{entry['agent']}: {entry['response']}"
-                for entry in self.debate_log[-len(self.agents):]
-            ])
-            return f"""Consider the previous responses:
+            return f"Consider the previous responses. As an expert in {agent.domain}, how do you respond to these points regarding {self.topic}?"
 
-            {previous_responses}
+    def _history_budget(self) -> int:
+        """Tokens left for debate history once the largest agent's fixed prompt parts are counted."""
+        system, retrieval = 0, 0
+        for agent in self.agents:
+            system = max(system, count_tokens(agent.system_prompt))
+            retrieval = max(retrieval, getattr(agent.knowledge_base, "context_token_budget", 0) or 0)
+        history = self.budget.remaining(reserved=system + retrieval + PROMPT_OVERHEAD_TOKENS)
+        self.context_tokens = {
+            "window": self.budget.context_window,
+            "output": self.budget.reserved_output,
+            "system": system,
+            "retrieval": retrieval,
+            "history": history
+        }
+        return history
 
-            As an expert in {agent.domain}, how do you respond to these points regarding {self.topic}?"""
+    async def _build_history(self, budget: int) -> str:
+        """
+        Render the debate so far within a token budget.
 
-    async def generate_summary(self) -> str:
-        """Generate a summary of the debate."""
-        points = "\n".join([f"- {entry['agent']}: {entry['response']}" 
-                           for entry in self.debate_log])
-        prompt = f"""As an expert debate analyzer, provide a comprehensive markdown-formatted summary of this AI debate:
+        The latest round is kept verbatim (each response trimmed to an equal share
+        of the budget) after one digest line per earlier round, oldest first. The
+        digest lines are append-only: the history of the next round starts with
+        this one's digest lines, so consecutive prompts share that prefix and only
+        the verbatim round at the end is replaced. The exception is when the
+        digests outgrow their budget and are condensed (see _older_rounds).
+
+        Args:
+            budget (int): Maximum tokens for the rendered history
+
+        Returns:
+            str: The history text, empty before the first round has finished
+        """
+        if not self.debate_log:
+            return ""
+        latest_round = len(self.debate_log) // len(self.agents)
+        latest = self.debate_log[-len(self.agents):]
+
+        older = ""
+        if latest_round > 1:
+            older = await self._older_rounds(latest_round - 1, budget // 3)
+
+        def render(per_response: Optional[int]) -> str:
+            responses = "\n".join(
+                f"{entry['agent']}: "
+                + (truncate_to_tokens(entry['response'], per_response) if per_response is not None else "")
+                for entry in latest
+            )
+            return f"{older}\nRound {latest_round}:\n{responses}" if older else f"Round {latest_round}:\n{responses}"
+
+        # Whatever the digests and labels leave is shared equally between the latest responses
+        remaining = budget - count_tokens(render(None))
+        return render(max(remaining // len(latest), 0))
+
+    async def _older_rounds(self, upto: int, budget: int) -> str:
+        """
+        Get the digests of rounds 1..upto, one line each, folding them into one when they outgrow the budget.
+
+        Every line ends with a newline, so the text for upto is a prefix of the
+        text for upto + 1 until a fold rewrites it.
+        """
+        text = self._history_digest
+        for round_number in range(self._history_digest_upto + 1, upto + 1):
+            digest = self.round_digests.get(round_number)
+            if digest is None:
+                digest = await self._digest_tasks[round_number]
+            # Newlines inside a digest would blur where its round ends
+            text += f"Round {round_number} (summary): {' '.join(digest.split())}\n"
+        if count_tokens(text) <= budget:
+            return text
+
+        # Fold the rolling digest and the new round digests into one, so each
+        # round is summarized once and never re-read from the full log. It is
+        # folded to half the budget, leaving room for several more rounds to be
+        # appended before the prefix changes again
+        budget //= 2
+        words = max(budget * 3 // 4, 20)
+        prompt = f"""Condense these summaries of earlier rounds of a debate on "{self.topic}" into one summary of at most {words} words, keeping each participant's main positions:
+
+{text}"""
+        try:
+            folded = await self._complete_summary_prompt(prompt, stage="history_condense")
+        except Exception as e:
+            print(f"Error condensing debate history: {e}")
+            folded = text
+        folded = " ".join(truncate_to_tokens(folded, budget).split())
+        self._history_digest = f"Rounds 1-{upto} (summary): {folded}\n"
+        self._history_digest_upto = upto
+        return self._history_digest
+
+    async def _digest_round(self, round_number: int, entries: List[Dict[str, Any]]) -> str:
+        """Summarize one finished round, falling back to its truncated transcript."""
+        per_response = self.budget.remaining(reserved=PROMPT_OVERHEAD_TOKENS) // len(entries)
+        transcript = "\n".join(
+            f"{entry['agent']}: {truncate_to_tokens(entry['response'], per_response)}"
+            for entry in entries
+        )
+        words = max(self.digest_tokens * 3 // 4, 20)
+        prompt = f"""Summarize round {round_number} of a debate on "{self.topic}" in at most {words} words. Keep each participant's main claims and who they were answering.
+
+{transcript}"""
+        try:
+            digest = await self._complete_summary_prompt(prompt, stage="round_digest")
+        except Exception as e:
+            print(f"Error digesting round {round_number}: {e}")
+            digest = transcript
+        digest = truncate_to_tokens(digest, self.digest_tokens)
+        self.round_digests[round_number] = digest
+        return digest
+
+    async def _complete_summary_prompt(self, prompt: str, stage: str = "summary") -> str:
+        """Run a prompt through the summary model, timed as the given stage."""
+        llm = self.registry.get_llm(
+            self.summary_llm_type,
+            self.summary_model_name,
+            temperature=0.7,
+            request_timeout=self.summary_timeout
+        )
+
+        async def generate() -> Tuple[str, Dict[str, Any]]:
+            # The client stops at the same deadline, freeing its backend slot
+            response = await asyncio.wait_for(
+                asyncio.to_thread(llm.complete, prompt, deadline=time.monotonic() + self.summary_timeout),
+                timeout=self.summary_timeout
+            )
+            # Clean the response and ensure it's a string
+            return str(response).strip(), response.additional_kwargs
+
+        with span(stage) as info:
+            if self.completion_cache is not None and not self.fresh_sampling:
+                key = CompletionCache.make_key(
+                    self.summary_llm_type, self.summary_model_name, prompt, {"temperature": 0.7}
+                )
+                (response_text, details), info["completion_cache"] = await self.completion_cache.get_or_compute(
+                    key, generate
+                )
+            else:
+                response_text, details = await generate()
+            if info.get("completion_cache", "miss") == "miss":
+                info["tokens"] = details.get("eval_count") or count_tokens(response_text)
+        return response_text
+
+    def _summary_prompt(self, points: str) -> str:
+        """Build the summary prompt around the (budgeted) debate history."""
+        return f"""As an expert debate analyzer, provide a comprehensive markdown-formatted summary of this AI debate:
 
         {self.topic}
 
@@ -99,89 +498,137 @@ class DebateOrchestrator:
         Note: dont give any debate agent respones in the summary, also give winner if possible,
         Format the response maintaining the markdown structure with proper headers, bullet points, and emphasis."""
 
-        # Use LLM to generate summary
-        if self.summary_llm_type == "ollama":
-            llm = Ollama(model=self.summary_model_name, temperature=0.7, request_timeout=300)
-        else:
-            raise ValueError(f"Unsupported LLM type: {self.summary_llm_type}")
-
+    async def generate_summary(self) -> str:
+        """Generate a summary of the debate from the round digests and the final round."""
         try:
-            response = llm.complete(prompt)
-            # Clean the response and ensure it's a string
-            response_text = str(response).strip()
-            
-            # Convert markdown to HTML with safe extensions
-            self.summary = markdown.markdown(
-                response_text,
-                extensions=['extra', 'nl2br'],
-                output_format='html5',
-                safe_mode='escape'
-            )
-            return self.summary
+            # Works from digests rather than the full log, so its size does not grow with rounds
+            budget = self.budget.remaining(self._summary_prompt(""))
+            points = await self._build_history(budget)
+            response_text = await self._complete_summary_prompt(self._summary_prompt(points))
+
+            # Rendered once here, so requests only ever send the stored HTML
+            with span("markdown"):
+                self.summary_markdown = response_text
+                self.summary = render_markdown(response_text)
+            self.summary_status = "completed"
         except Exception as e:
             error_msg = f"Error generating summary: {str(e)}"
             print(error_msg)
-            self.summary = f"<p class='error'>{error_msg}</p>"
-            return self.summary
+            self.summary = f"<p class='error'>{html.escape(error_msg)}</p>"
+            self.summary_status = "error"
+        self.events.publish("summary", {"summary": self.summary})
+        return self.summary
+
+    async def summarize(self) -> str:
+        """Run the summary stage of a completed debate, then close its event feed."""
+        self.summary_status = "in_progress"
+        try:
+            with tracing(self.trace):
+                return await self.generate_summary()
+        except asyncio.CancelledError:
+            self.summary_status = "cancelled"
+            raise
+        finally:
+            self._finish()
 
+    def _finish(self) -> None:
+        """Stop background digests and close the event feed once nothing more will happen."""
+        for task in self._digest_tasks.values():
+            task.cancel()
+        self.events.close()
 
-    async def conduct_debate(self) -> None:
-        """Conduct the entire debate synchronously."""
+    async def conduct_debate(self, summarize: bool = True) -> None:
+        """
+        Conduct the entire debate.
+
+        The debate is marked completed as soon as its last round finishes; the
+        summary then follows as a stage of its own.
+
+        Args:
+            summarize (bool): Also run the summary stage; callers that schedule it
+                themselves (see DebateRunner) call summarize() afterwards
+        """
         self.status = "in_progress"
-        
+
         try:
-            for _ in range(self.total_rounds):
-                await self.conduct_round()
-            
-            await self.generate_summary()
+            with tracing(self.trace):
+                await self._load_knowledge_bases()
+            with tracing(self.trace), span("debate"):
+                for _ in range(self.total_rounds):
+                    await self.conduct_round()
+                    # Further rounds would only repeat the same arguments
+                    if self.converged:
+                        break
             self.status = "completed"
+        except asyncio.CancelledError:
+            self.status = "cancelled"
+            self.summary_status = "skipped"
+            self._finish()
+            raise
         except Exception as e:
             self.status = "error"
+            self.summary_status = "skipped"
+            self._finish()
             raise e
 
-    def conduct_debate_async(self) -> None:
-        """Start the debate asynchronously."""
-        try:
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            loop.run_until_complete(self.conduct_debate())
-        except Exception as e:
-            self.status = "error"
-            raise e
-        finally:
-            loop.close()
+        if summarize:
+            await self.summarize()
+
+    async def _load_knowledge_bases(self) -> None:
+        """Attach the knowledge bases of agents created without one, building their indexes if needed."""
+        missing = [agent for agent in self.agents if agent.knowledge_base is None]
+        if not missing:
+            return
+        if self.knowledge_base_loader is None:
+            raise ValueError(f"No knowledge base for {', '.join(agent.name for agent in missing)}")
+        with span("knowledge_bases"):
+            knowledge_bases = await asyncio.gather(
+                *[asyncio.to_thread(self.knowledge_base_loader, agent.domain) for agent in missing]
+            )
+        for agent, knowledge_base in zip(missing, knowledge_bases):
+            if knowledge_base is None:
+                raise ValueError(f"No knowledge base for domain {agent.domain}")
+            agent.knowledge_base = knowledge_base
+
+    def _append_entry(self, entry: Dict[str, Any]) -> None:
+        """Append a response to the debate log and update the quality metrics for it."""
+        position = len(self.debate_log)
+        self.debate_log.append(entry)
+
+        response = entry["response"]
+        for agent in self.agents:
+            if agent.name == entry["agent"]:
+                self._quality["participation"][agent.name] += 1
+                # Count domain-specific references
+                if f"[{agent.domain}]" in response:
+                    self._quality["knowledge_usage"][agent.name] += 1
+
+        # Cross-references only count once every agent has spoken
+        if position >= len(self.agents) and any(agent.name in response for agent in self.agents):
+            self._quality["cross_refs"] += 1
+
+        if self.topic.lower() in response.lower():
+            self._quality["topic_mentions"] += 1
+
+        self._touch(entry=(position, entry))
 
     def _analyze_debate_quality(self) -> Dict[str, Any]:
         """Analyze the quality and progression of the debate."""
+        total_responses = len(self.debate_log)
         analysis = {
-            "participation": {},
+            "participation": dict(self._quality["participation"]),
             "interaction_score": 0,
-            "knowledge_usage": {},
+            "knowledge_usage": dict(self._quality["knowledge_usage"]),
             "topic_adherence": 0
         }
-        
-        # Analyze participation and knowledge usage for each agent
-        for agent in self.agents:
-            agent_responses = [entry for entry in self.debate_log if entry["agent"] == agent.name]
-            analysis["participation"][agent.name] = len(agent_responses)
-            
-            # Count domain-specific references
-            knowledge_refs = sum(1 for entry in agent_responses
-                              if f"[{agent.domain}]" in entry["response"])
-            analysis["knowledge_usage"][agent.name] = knowledge_refs
 
         # Calculate interaction score based on cross-references
-        total_responses = len(self.debate_log)
-        cross_refs = sum(1 for entry in self.debate_log[len(self.agents):]
-                        if any(agent.name in entry["response"]
-                              for agent in self.agents))
         if total_responses > len(self.agents):
-            analysis["interaction_score"] = cross_refs / (total_responses - len(self.agents))
+            analysis["interaction_score"] = self._quality["cross_refs"] / (total_responses - len(self.agents))
 
         # Calculate topic adherence
-        topic_mentions = sum(1 for entry in self.debate_log
-                           if self.topic.lower() in entry["response"].lower())
-        analysis["topic_adherence"] = topic_mentions / total_responses if total_responses > 0 else 0
+        if total_responses > 0:
+            analysis["topic_adherence"] = self._quality["topic_mentions"] / total_responses
 
         return analysis
 
@@ -193,11 +640,33 @@ class DebateOrchestrator:
             "total_rounds": self.total_rounds,
             "agents": [agent.name for agent in self.agents],
             "log_length": len(self.debate_log),
-            "has_summary": bool(self.summary)
+            "has_summary": bool(self.summary),
+            "summary_status": self.summary_status,
+            "version": self.version
         }
 
+        # Where this debate's time went, per stage and per turn
+        status["timings"] = self.trace.snapshot()
+
+        # How much each agent's last response still differed from the one before
+        if self.convergence_threshold is not None:
+            status["convergence"] = {
+                "threshold": self.convergence_threshold,
+                "similarity": {agent: round(value, 4) for agent, value in self.similarities.items()},
+                "stopped_early": self.converged and self.current_round < self.total_rounds
+            }
+
+        # How the last prompt's context window was split between its sections
+        if self.context_tokens:
+            status["context_tokens"] = dict(self.context_tokens)
+
         # Add debate quality analysis if debate has started
         if self.debate_log:
             status["analysis"] = self._analyze_debate_quality()
 
-        return status
\ No newline at end of file
+        return status
+
+
+def _cosine(a: List[float], b: List[float]) -> float:
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return sum(x * y for x, y in zip(a, b)) / norm if norm else 0.0
@@ -0,0 +1,45 @@
+from typing import List
+
+from llama_index.core.base.llms.types import ChatMessage, MessageRole
+
+
+class PromptLayout:
+    """A prompt assembled from its parts in order of how rarely they change.
+
+    The system prompt and header stay the same for an agent throughout a
+    debate. The history only grows at its end between rounds, and the
+    retrieved knowledge and question come last. Consecutive requests from one
+    agent therefore share a long prefix, which model servers such as Ollama
+    keep in their KV cache instead of evaluating again.
+    """
+
+    def __init__(self, system: str, header: str = "", history: str = "", turn: str = ""):
+        """
+        Initialize a PromptLayout.
+
+        Args:
+            system (str): The agent's system prompt
+            header (str): Facts fixed for the whole debate, such as the topic and participants
+            history (str): The debate so far, oldest first
+            turn (str): This turn's round counter, retrieved knowledge and question
+        """
+        self.system = system
+        self.header = header
+        self.history = history
+        self.turn = turn
+
+    @property
+    def user_content(self) -> str:
+        """The header, history and turn as one message, most stable part first."""
+        return "\n\n".join(part for part in (self.header, self.history, self.turn) if part)
+
+    def messages(self) -> List[ChatMessage]:
+        """The prompt as chat messages: the system prompt, then everything else."""
+        return [
+            ChatMessage(role=MessageRole.SYSTEM, content=self.system),
+            ChatMessage(role=MessageRole.USER, content=self.user_content),
+        ]
+
+    def render(self) -> str:
+        """The prompt as a single text, in the same order as the messages."""
+        return f"{self.system}\n\n{self.user_content}"
@@ -0,0 +1,69 @@
+import html
+import re
+from functools import lru_cache
+from urllib.parse import urlparse
+from xml.etree import ElementTree
+
+import markdown
+from markdown.extensions import Extension
+from markdown.treeprocessors import Treeprocessor
+
+# Link and image targets allowed in rendered summaries; relative URLs have no scheme
+SAFE_URL_SCHEMES = ("", "http", "https", "mailto")
+
+# Browsers ignore ASCII whitespace and control characters in a URL scheme, so "java\tscript:" still runs
+_IGNORED_URL_CHARACTERS = re.compile(r"[\x00-\x20\x7f]+")
+
+# Markdown extensions used for summaries. "extra" is not used as a whole since
+# its attr_list and md_in_html extensions let the text set raw attributes
+SUMMARY_EXTENSIONS = ["abbr", "def_list", "fenced_code", "footnotes", "tables", "sane_lists", "nl2br"]
+
+
+class _SafeUrlTreeprocessor(Treeprocessor):
+    """Drop link and image targets with a scheme that could run script."""
+
+    def run(self, root: ElementTree.Element) -> None:
+        for element in root.iter():
+            for attribute in ("href", "src"):
+                url = element.get(attribute)
+                if url is not None and _url_scheme(url) not in SAFE_URL_SCHEMES:
+                    del element.attrib[attribute]
+
+
+def _url_scheme(url: str) -> str:
+    """The scheme a browser would see, after decoding entities such as "&#106;" the serializer leaves in place."""
+    return urlparse(_IGNORED_URL_CHARACTERS.sub("", html.unescape(url))).scheme.lower()
+
+
+class EscapeHtmlExtension(Extension):
+    """Escape raw HTML in the source instead of passing it through.
+
+    Replaces the safe_mode="escape" option that Markdown 3 removed, so
+    LLM output cannot inject markup into the page that displays it.
+    """
+
+    def extendMarkdown(self, md: markdown.Markdown) -> None:
+        # Without these, HTML blocks and inline tags are left as text, which the serializer escapes
+        md.preprocessors.deregister("html_block", strict=False)
+        md.inlinePatterns.deregister("html", strict=False)
+        md.treeprocessors.register(_SafeUrlTreeprocessor(md), "safe_urls", 1)
+
+
+@lru_cache(maxsize=256)
+def render_markdown(text: str) -> str:
+    """
+    Render markdown to sanitized HTML.
+
+    Results are cached, so replayed summaries are not rendered again.
+
+    Args:
+        text (str): Markdown, typically written by an LLM
+
+    Returns:
+        str: HTML safe to insert into a page
+    """
+    return markdown.markdown(
+        text,
+        extensions=[*SUMMARY_EXTENSIONS, EscapeHtmlExtension()],
+        output_format="html"
+    )
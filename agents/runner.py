@@ -0,0 +1,134 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, Optional
+from .metrics import record_span
+from .orchestrator import DebateOrchestrator
+
+
+class DebateQueueFull(Exception):
+    """Raised when the runner has no room left for another debate."""
+
+
+class DebateRunner:
+    """Runs debates in the background on one shared event loop."""
+
+    def __init__(self, max_concurrent: int = 2, max_queued: int = 8):
+        """
+        Initialize a DebateRunner.
+
+        Args:
+            max_concurrent (int): Number of debates that run at the same time
+            max_queued (int): Number of debates allowed to wait for a free slot
+        """
+        self.max_concurrent = max_concurrent
+        self.max_queued = max_queued
+        # One slot per running or queued debate; submit() fails once they are taken
+        self._slots = threading.BoundedSemaphore(max_concurrent + max_queued)
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._summarizing = 0
+
+        # All debates share this loop; blocking LLM and retrieval calls are
+        # pushed to worker threads so debates and agents overlap
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever,
+            name="debate-runner",
+            daemon=True
+        )
+        self._thread.start()
+        self._running_limit: Optional[asyncio.Semaphore] = None
+
+    def submit(self, orchestrator: DebateOrchestrator) -> Future:
+        """
+        Queue a debate for background execution.
+
+        Args:
+            orchestrator (DebateOrchestrator): The debate to run
+
+        Returns:
+            Future: Completes when the debate has finished; cancelling it
+                cancels the debate and any LLM call it is waiting on
+
+        Raises:
+            DebateQueueFull: If all running and queued slots are taken
+        """
+        if not self._slots.acquire(blocking=False):
+            raise DebateQueueFull(
+                f"{self.max_concurrent} debates running and {self.max_queued} queued"
+            )
+
+        orchestrator.status = "queued"
+        with self._lock:
+            self._queued += 1
+        try:
+            return asyncio.run_coroutine_threadsafe(
+                self._run(orchestrator, time.perf_counter()), self._loop
+            )
+        except Exception:
+            with self._lock:
+                self._queued -= 1
+            self._slots.release()
+            raise
+
+    async def _run(self, orchestrator: DebateOrchestrator, submitted_at: float) -> None:
+        """Run a debate once a slot is free, summarize it, then release its slot."""
+        if self._running_limit is None:
+            self._running_limit = asyncio.Semaphore(self.max_concurrent)
+        try:
+            async with self._running_limit:
+                record_span("queue_wait", time.perf_counter() - submitted_at, trace=orchestrator.trace)
+                with self._lock:
+                    self._queued -= 1
+                    self._running += 1
+                try:
+                    await orchestrator.conduct_debate(summarize=False)
+                finally:
+                    with self._lock:
+                        self._running -= 1
+            # The summary runs outside the running limit, so the next debate
+            # starts its rounds while this one is summarized
+            with self._lock:
+                self._summarizing += 1
+            try:
+                await orchestrator.summarize()
+            finally:
+                with self._lock:
+                    self._summarizing -= 1
+        except asyncio.CancelledError:
+            if orchestrator.status == "queued":
+                with self._lock:
+                    self._queued -= 1
+                orchestrator.status = "cancelled"
+                orchestrator.events.close()
+            raise
+        except Exception as e:
+            print(f"Error running debate on '{orchestrator.topic}': {e}")
+        finally:
+            self._slots.release()
+            # Callers drop a finished debate and read it back from the store, so it must be up to date
+            await orchestrator.flush_store()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get the number of running, summarizing and queued debates."""
+        with self._lock:
+            return {
+                "running": self._running,
+                "summarizing": self._summarizing,
+                "queued": self._queued,
+                "max_concurrent": self.max_concurrent,
+                "max_queued": self.max_queued
+            }
+
+    def shutdown(self) -> None:
+        """Cancel outstanding debates and stop the event loop."""
+        def _cancel_all() -> None:
+            for task in asyncio.all_tasks(self._loop):
+                task.cancel()
+            self._loop.call_soon(self._loop.stop)
+
+        self._loop.call_soon_threadsafe(_cancel_all)
+        self._thread.join()
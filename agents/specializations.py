@@ -1,6 +1,17 @@
+from typing import Optional
 from .agent import Agent
+from .completion_cache import CompletionCache
+from .llm_registry import LLMRegistry
 
-def create_agent_for_domain(domain: str, knowledge_base, llm_type: str = "ollama", model_name: str = "llama2") -> Agent:
+def create_agent_for_domain(
+    domain: str,
+    knowledge_base,
+    llm_type: str = "ollama",
+    model_name: str = "llama2",
+    registry: Optional[LLMRegistry] = None,
+    completion_cache: Optional[CompletionCache] = None,
+    max_tokens: Optional[int] = None
+) -> Agent:
     """
     Create a specialized agent for a specific domain.
     
@@ -9,6 +20,9 @@ def create_agent_for_domain(domain: str, knowledge_base, llm_type: str = "ollama
         knowledge_base: The knowledge base for the domain
         llm_type (str): The type of LLM to use (default: "ollama")
         model_name (str): The name of the model to use (default: "llama2")
+        registry (LLMRegistry, optional): Shared LLM clients for the agent
+        completion_cache (CompletionCache, optional): Cache of the agent's generations
+        max_tokens (int, optional): Hard limit on tokens generated per response
     
     Returns:
         Agent: A specialized agent for the domain
@@ -22,7 +36,10 @@ def create_agent_for_domain(domain: str, knowledge_base, llm_type: str = "ollama
         domain=domain,
         knowledge_base=knowledge_base,
         llm_type=llm_type,
-        model_name=model_name
+        model_name=model_name,
+        registry=registry,
+        completion_cache=completion_cache,
+        max_tokens=max_tokens
     )
     
     return agent
\ No newline at end of file
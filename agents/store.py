@@ -0,0 +1,372 @@
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional, Tuple
+
+# Debates in these states no longer change and may be evicted, except a
+# completed debate whose summary is still to be written
+FINISHED_STATUSES = ("completed", "error", "cancelled")
+
+# Summary states of a completed debate that is still being summarized
+UNFINISHED_SUMMARY_STATUSES = ("pending", "in_progress")
+
+
+def _is_finished(record: Dict[str, Any]) -> bool:
+    """Whether a stored debate will not be written to again."""
+    summary_status = record["details"]["status_info"].get("summary_status")
+    return record["status"] in FINISHED_STATUSES and not (
+        record["status"] == "completed" and summary_status in UNFINISHED_SUMMARY_STATUSES
+    )
+
+
+class DebateStore(ABC):
+    """Interface for persisting debates so any worker process can serve them.
+
+    A debate is stored as one record (topic, status, rounds, summary, version
+    and a JSON details blob) plus its log entries, appended one row at a time.
+    """
+
+    def __init__(self, max_finished: Optional[int] = 500, retention_seconds: Optional[float] = 7 * 24 * 3600):
+        """
+        Initialize a DebateStore.
+
+        Args:
+            max_finished (int, optional): Finished debates kept before the oldest are evicted
+            retention_seconds (float, optional): Age after which finished debates are evicted
+        """
+        self.max_finished = max_finished
+        self.retention_seconds = retention_seconds
+
+    @staticmethod
+    def new_id() -> str:
+        """Generate a unique debate ID."""
+        return f"debate_{uuid.uuid4().hex[:12]}"
+
+    @abstractmethod
+    def create(self, debate_id: str, state: Dict[str, Any]) -> None:
+        """Store a new debate."""
+
+    @abstractmethod
+    def save(self, debate_id: str, state: Dict[str, Any], entry: Optional[Tuple[int, Dict[str, Any]]] = None) -> None:
+        """Update a debate's record, appending the (position, entry) log row if given."""
+
+    @abstractmethod
+    def get(self, debate_id: str) -> Optional[Dict[str, Any]]:
+        """Get a debate's record, or None if it does not exist."""
+
+    @abstractmethod
+    def delete(self, debate_id: str) -> None:
+        """Remove a debate and its log entries."""
+
+    @abstractmethod
+    def get_entries(self, debate_id: str, since: int = 0) -> List[Dict[str, Any]]:
+        """Get a debate's log entries from position `since` onwards."""
+
+    @abstractmethod
+    def list(self, limit: int = 20, offset: int = 0) -> Tuple[List[Dict[str, Any]], int]:
+        """Get a page of debate records, newest first, and the total number of debates."""
+
+    @abstractmethod
+    def prune(self) -> int:
+        """Evict finished debates past the retention limits, never one still being summarized; returns how many were removed."""
+
+    @staticmethod
+    def _record(debate_id: str, state: Dict[str, Any], created_at: float, updated_at: float) -> Dict[str, Any]:
+        """Flatten an orchestrator snapshot into a stored record."""
+        status_info = state["status_info"]
+        return {
+            "id": debate_id,
+            "topic": state["topic"],
+            "status": status_info["status"],
+            "current_round": status_info["current_round"],
+            "total_rounds": status_info["total_rounds"],
+            "log_length": status_info["log_length"],
+            "version": status_info["version"],
+            "summary": state["summary"],
+            "details": {k: v for k, v in state.items() if k not in ("topic", "summary")},
+            "created_at": created_at,
+            "updated_at": updated_at
+        }
+
+
+class InMemoryDebateStore(DebateStore):
+    """Process-local debate store, for tests and single-process development."""
+
+    def __init__(self, **kwargs: Any):
+        super().__init__(**kwargs)
+        self._lock = threading.Lock()
+        self._records: Dict[str, Dict[str, Any]] = {}
+        self._entries: Dict[str, List[Dict[str, Any]]] = {}
+
+    def create(self, debate_id: str, state: Dict[str, Any]) -> None:
+        now = time.time()
+        with self._lock:
+            if debate_id in self._records:
+                raise ValueError(f"Debate {debate_id} already exists")
+            self._records[debate_id] = self._record(debate_id, state, now, now)
+            self._entries[debate_id] = []
+        self.prune()
+
+    def save(self, debate_id: str, state: Dict[str, Any], entry: Optional[Tuple[int, Dict[str, Any]]] = None) -> None:
+        with self._lock:
+            if debate_id not in self._records:
+                return
+            created_at = self._records[debate_id]["created_at"]
+            self._records[debate_id] = self._record(debate_id, state, created_at, time.time())
+            if entry is not None:
+                position, log_entry = entry
+                entries = self._entries[debate_id]
+                if position == len(entries):
+                    entries.append(dict(log_entry))
+
+    def get(self, debate_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            record = self._records.get(debate_id)
+            return dict(record) if record else None
+
+    def delete(self, debate_id: str) -> None:
+        with self._lock:
+            self._records.pop(debate_id, None)
+            self._entries.pop(debate_id, None)
+
+    def get_entries(self, debate_id: str, since: int = 0) -> List[Dict[str, Any]]:
+        with self._lock:
+            return [dict(entry) for entry in self._entries.get(debate_id, [])[since:]]
+
+    def list(self, limit: int = 20, offset: int = 0) -> Tuple[List[Dict[str, Any]], int]:
+        with self._lock:
+            records = sorted(self._records.values(), key=lambda r: r["created_at"], reverse=True)
+            return [dict(r) for r in records[offset:offset + limit]], len(records)
+
+    def prune(self) -> int:
+        with self._lock:
+            finished = sorted(
+                (r for r in self._records.values() if _is_finished(r)),
+                key=lambda r: r["updated_at"],
+                reverse=True
+            )
+            cutoff = time.time() - self.retention_seconds if self.retention_seconds is not None else None
+            evict = [
+                r["id"] for i, r in enumerate(finished)
+                if (self.max_finished is not None and i >= self.max_finished)
+                or (cutoff is not None and r["updated_at"] < cutoff)
+            ]
+            for debate_id in evict:
+                del self._records[debate_id]
+                del self._entries[debate_id]
+            return len(evict)
+
+
+class SQLiteDebateStore(DebateStore):
+    """Debate store backed by a SQLite file that several worker processes can share.
+
+    Each debate records the process that created it. When the store is opened,
+    debates left unfinished by a process on this host that no longer runs are
+    marked as failed, so they are neither followed nor kept forever.
+    """
+
+    def __init__(self, path: str = "debates.db", **kwargs: Any):
+        """
+        Initialize a SQLiteDebateStore.
+
+        Args:
+            path (str): Path of the SQLite database file
+            **kwargs: Retention limits, see DebateStore
+        """
+        super().__init__(**kwargs)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.row_factory = sqlite3.Row
+        with self._lock, self._conn:
+            # WAL lets readers in other processes proceed while a debate is being written
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS debates (
+                    id TEXT PRIMARY KEY,
+                    topic TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    current_round INTEGER NOT NULL,
+                    total_rounds INTEGER NOT NULL,
+                    log_length INTEGER NOT NULL,
+                    version INTEGER NOT NULL,
+                    summary TEXT NOT NULL,
+                    details TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL,
+                    owner TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_debates_created_at ON debates (created_at);
+                CREATE INDEX IF NOT EXISTS idx_debates_status_updated_at ON debates (status, updated_at);
+                CREATE TABLE IF NOT EXISTS debate_entries (
+                    debate_id TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    agent TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    PRIMARY KEY (debate_id, position)
+                );
+            """)
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(debates)")}
+            if "owner" not in columns:
+                self._conn.execute("ALTER TABLE debates ADD COLUMN owner TEXT")
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._recover_orphans()
+
+    def _owner_alive(self, owner: Optional[str]) -> bool:
+        """Whether the process that created a debate may still be running it."""
+        if not owner:
+            return False
+        host, _, pid = owner.rpartition(":")
+        if host != socket.gethostname():
+            # Processes on other hosts cannot be checked; they recover their own debates
+            return True
+        if owner == self.owner:
+            # This process has not run any debates yet, so a debate it owns is
+            # from an earlier process that had the same PID, e.g. PID 1 in a container
+            return False
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            return False
+        except (PermissionError, ValueError):
+            return True
+        return True
+
+    def _recover_orphans(self) -> int:
+        """
+        Mark debates whose process died before finishing them as failed; only run on open.
+
+        A debate that is queued or running becomes "error". A completed debate
+        still waiting for its summary gets summary_status "error".
+
+        Returns:
+            int: How many debates were marked
+        """
+        placeholders = ", ".join("?" for _ in FINISHED_STATUSES)
+        summary_placeholders = ", ".join("?" for _ in UNFINISHED_SUMMARY_STATUSES)
+        recovered = 0
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                f"""SELECT id, status, version, details, owner FROM debates
+                    WHERE status NOT IN ({placeholders})
+                       OR (status = 'completed'
+                           AND json_extract(details, '$.status_info.summary_status') IN ({summary_placeholders}))""",
+                (*FINISHED_STATUSES, *UNFINISHED_SUMMARY_STATUSES)
+            ).fetchall()
+            for row in rows:
+                if self._owner_alive(row["owner"]):
+                    continue
+                details = json.loads(row["details"])
+                status_info = details["status_info"]
+                status = row["status"] if row["status"] in FINISHED_STATUSES else "error"
+                status_info["status"] = status
+                if status_info.get("summary_status") in UNFINISHED_SUMMARY_STATUSES:
+                    status_info["summary_status"] = "error" if status == "completed" else "skipped"
+                # A new version, so clients holding an ETag see the change
+                status_info["version"] = row["version"] + 1
+                self._conn.execute(
+                    "UPDATE debates SET status = ?, version = ?, details = ?, updated_at = ? WHERE id = ?",
+                    (status, row["version"] + 1, json.dumps(details), time.time(), row["id"])
+                )
+                recovered += 1
+        if recovered:
+            print(f"Marked {recovered} debate(s) left unfinished by a stopped process as failed")
+        return recovered
+
+    @staticmethod
+    def _from_row(row: sqlite3.Row) -> Dict[str, Any]:
+        record = dict(row)
+        record["details"] = json.loads(record["details"])
+        return record
+
+    def create(self, debate_id: str, state: Dict[str, Any]) -> None:
+        now = time.time()
+        record = self._record(debate_id, state, now, now)
+        with self._lock, self._conn:
+            self._conn.execute(
+                """INSERT INTO debates (id, topic, status, current_round, total_rounds, log_length,
+                                        version, summary, details, created_at, updated_at, owner)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (record["id"], record["topic"], record["status"], record["current_round"],
+                 record["total_rounds"], record["log_length"], record["version"], record["summary"],
+                 json.dumps(record["details"]), record["created_at"], record["updated_at"], self.owner)
+            )
+        self.prune()
+
+    def save(self, debate_id: str, state: Dict[str, Any], entry: Optional[Tuple[int, Dict[str, Any]]] = None) -> None:
+        record = self._record(debate_id, state, 0, time.time())
+        with self._lock, self._conn:
+            if entry is not None:
+                position, log_entry = entry
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO debate_entries (debate_id, position, agent, response) VALUES (?, ?, ?, ?)",
+                    (debate_id, position, log_entry["agent"], log_entry["response"])
+                )
+            self._conn.execute(
+                """UPDATE debates SET status = ?, current_round = ?, total_rounds = ?, log_length = ?,
+                                      version = ?, summary = ?, details = ?, updated_at = ?
+                   WHERE id = ?""",
+                (record["status"], record["current_round"], record["total_rounds"], record["log_length"],
+                 record["version"], record["summary"], json.dumps(record["details"]),
+                 record["updated_at"], debate_id)
+            )
+
+    def get(self, debate_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM debates WHERE id = ?", (debate_id,)).fetchone()
+        return self._from_row(row) if row else None
+
+    def get_entries(self, debate_id: str, since: int = 0) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT agent, response FROM debate_entries WHERE debate_id = ? AND position >= ? ORDER BY position",
+                (debate_id, since)
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def list(self, limit: int = 20, offset: int = 0) -> Tuple[List[Dict[str, Any]], int]:
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT * FROM debates ORDER BY created_at DESC LIMIT ? OFFSET ?", (limit, offset)
+            ).fetchall()
+            total = self._conn.execute("SELECT COUNT(*) FROM debates").fetchone()[0]
+        return [self._from_row(row) for row in rows], total
+
+    def prune(self) -> int:
+        # Same rule as _is_finished; debates stored before summary_status was tracked count as summarized
+        finished = f"""status IN ({", ".join("?" for _ in FINISHED_STATUSES)})
+            AND NOT (status = 'completed'
+                     AND COALESCE(json_extract(details, '$.status_info.summary_status'), 'completed')
+                         IN ({", ".join("?" for _ in UNFINISHED_SUMMARY_STATUSES)}))"""
+        finished_params = (*FINISHED_STATUSES, *UNFINISHED_SUMMARY_STATUSES)
+        evict = set()
+        with self._lock, self._conn:
+            if self.retention_seconds is not None:
+                rows = self._conn.execute(
+                    f"SELECT id FROM debates WHERE {finished} AND updated_at < ?",
+                    (*finished_params, time.time() - self.retention_seconds)
+                ).fetchall()
+                evict.update(row["id"] for row in rows)
+            if self.max_finished is not None:
+                rows = self._conn.execute(
+                    f"""SELECT id FROM debates WHERE {finished}
+                        ORDER BY updated_at DESC LIMIT -1 OFFSET ?""",
+                    (*finished_params, self.max_finished)
+                ).fetchall()
+                evict.update(row["id"] for row in rows)
+            for debate_id in evict:
+                self._delete(debate_id)
+        return len(evict)
+
+    def delete(self, debate_id: str) -> None:
+        with self._lock, self._conn:
+            self._delete(debate_id)
+
+    def _delete(self, debate_id: str) -> None:
+        self._conn.execute("DELETE FROM debate_entries WHERE debate_id = ?", (debate_id,))
+        self._conn.execute("DELETE FROM debates WHERE id = ?", (debate_id,))
@@ -0,0 +1,65 @@
+from llama_index.core.utils import get_tokenizer
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens with the same tokenizer llama-index uses for budgeting."""
+    if not text:
+        return 0
+    return len(get_tokenizer()(text))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    Cut text down to at most max_tokens tokens on a word boundary.
+
+    Args:
+        text (str): The text to shorten
+        max_tokens (int): The token budget
+
+    Returns:
+        str: The longest word prefix of text that fits the budget
+    """
+    if max_tokens <= 0:
+        return ""
+    if count_tokens(text) <= max_tokens:
+        return text
+
+    # Binary search for the longest prefix of words that fits
+    words = text.split(" ")
+    low, high = 0, len(words)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if count_tokens(" ".join(words[:mid])) <= max_tokens:
+            low = mid
+        else:
+            high = mid - 1
+    return " ".join(words[:low])
+
+
+class TokenBudget:
+    """Splits a model's context window between the fixed parts of a prompt and the rest."""
+
+    def __init__(self, context_window: int = 4096, reserved_output: int = 512):
+        """
+        Initialize a TokenBudget.
+
+        Args:
+            context_window (int): Tokens the model accepts in one request
+            reserved_output (int): Tokens kept free for the model's answer
+        """
+        self.context_window = context_window
+        self.reserved_output = reserved_output
+
+    def remaining(self, *sections: str, reserved: int = 0) -> int:
+        """
+        Get the tokens left once the given prompt sections are counted.
+
+        Args:
+            *sections (str): Prompt text that is always sent
+            reserved (int): Further tokens already promised elsewhere, e.g. retrieved context
+
+        Returns:
+            int: The tokens still available, never negative
+        """
+        used = self.reserved_output + reserved + sum(count_tokens(section) for section in sections)
+        return max(self.context_window - used, 0)
@@ -1,39 +1,219 @@
 import os
 import json
-from flask import Flask, render_template, request, jsonify, redirect, url_for
+import threading
+import time
+from flask import Flask, Response, render_template, request, jsonify, redirect, url_for, stream_with_context
 from knowledge_base.rag import DomainKnowledgeBaseManager
 from agents.specializations import create_agent_for_domain
 from agents.orchestrator import DebateOrchestrator
+from agents.runner import DebateRunner, DebateQueueFull
+from agents.completion_cache import CompletionCache
+from agents.llm_registry import LLMRegistry, DEFAULT_OLLAMA_URL
+from agents.store import InMemoryDebateStore, SQLiteDebateStore, FINISHED_STATUSES
+from agents.metrics import metrics
 
 app = Flask(__name__)
 
 # Disable static file caching during development
 app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 0
 
-# Initialize knowledge base manager
-kb_manager = DomainKnowledgeBaseManager(base_dir="knowledge_base/domains")
+# Largest document accepted by the upload API
+app.config['MAX_CONTENT_LENGTH'] = int(os.environ.get("KB_MAX_UPLOAD_MB", 50)) * 1024 * 1024
 
-# Store active debates
+# Shared LLM and embedding clients, capped per backend so a single Ollama
+# host is not flooded by concurrent debates
+llm_registry = LLMRegistry(
+    max_in_flight=int(os.environ.get("LLM_MAX_IN_FLIGHT", 4)),
+    base_url=os.environ.get("OLLAMA_BASE_URL", DEFAULT_OLLAMA_URL),
+    embed_batch_size=int(os.environ.get("KB_EMBED_BATCH_SIZE", 64)),
+    # Keeping models loaded lets Ollama reuse the cached prompt prefix between turns
+    ollama_options={
+        "context_window": int(os.environ.get("LLM_CONTEXT_WINDOW", 4096)),
+        **({"keep_alive": os.environ["OLLAMA_KEEP_ALIVE"]} if os.environ.get("OLLAMA_KEEP_ALIVE") else {}),
+    },
+    # Settings for the offline "fake" backend used by benchmarks
+    fake_options={
+        "latency": float(os.environ.get("FAKE_LLM_LATENCY", 0.0)),
+        "tokens_per_second": (
+            float(os.environ["FAKE_LLM_TOKENS_PER_SECOND"])
+            if os.environ.get("FAKE_LLM_TOKENS_PER_SECOND") else None
+        ),
+    }
+)
+
+# Initialize knowledge base manager; domains load on first use while a
+# background warm-up builds them all without blocking startup
+kb_manager = DomainKnowledgeBaseManager(
+    base_dir="knowledge_base/domains",
+    storage_dir=os.environ.get("KB_STORAGE_DIR", "knowledge_base/storage"),
+    lazy=True,
+    llm_type=os.environ.get("KB_LLM_TYPE", "ollama"),
+    registry=llm_registry,
+    knowledge_base_options={
+        "retrieval_mode": os.environ.get("KB_RETRIEVAL_MODE", "retrieve"),
+        "similarity_top_k": int(os.environ.get("KB_TOP_K", 3)),
+        "context_token_budget": int(os.environ.get("KB_CONTEXT_TOKENS", 512)),
+        "cache_size": int(os.environ.get("KB_CACHE_SIZE", 256)),
+        "semantic_cache_threshold": (
+            float(os.environ["KB_SEMANTIC_CACHE_THRESHOLD"])
+            if os.environ.get("KB_SEMANTIC_CACHE_THRESHOLD") else None
+        ),
+        "vector_store": os.environ.get("KB_VECTOR_STORE", "numpy"),
+        "vector_dtype": os.environ.get("KB_VECTOR_DTYPE", "float32"),
+        "ann_threshold": (
+            int(os.environ["KB_ANN_THRESHOLD"]) if os.environ.get("KB_ANN_THRESHOLD") else None
+        ),
+    },
+    ingestion_options={
+        "batch_size": int(os.environ.get("KB_EMBED_BATCH_SIZE", 64)),
+        "max_concurrency": int(os.environ.get("KB_EMBED_CONCURRENCY", 4)),
+        "process_workers": (
+            int(os.environ["KB_INGEST_WORKERS"]) if os.environ.get("KB_INGEST_WORKERS") else None
+        ),
+    }
+)
+# Document ingestion spawns worker processes, which re-import this module as
+# __mp_main__; only the real app process should start building domains
+if __name__ != "__mp_main__":
+    kb_manager.warm_up()
+    # Optionally pick up documents added to, changed in or removed from the domain directories
+    if os.environ.get("KB_WATCH_INTERVAL"):
+        kb_manager.start_watching(float(os.environ["KB_WATCH_INTERVAL"]))
+
+# Display names for the bundled domains; other domains are title-cased
+DOMAIN_LABELS = {
+    "ai": "Artificial Intelligence",
+    "data_science": "Data Science",
+    "ml": "Machine Learning",
+    "data_analytics": "Data Analytics",
+    "programming": "Programming",
+    "ui_ux": "UI/UX Design",
+}
+
+# The debate store, completion cache and runner are created on first use, so
+# the ingestion workers that re-import this module never open them
+_singletons = {}
+_singletons_lock = threading.Lock()
+
+def _singleton(name, factory):
+    """Create a process-wide object on first use."""
+    with _singletons_lock:
+        if name not in _singletons:
+            _singletons[name] = factory()
+        return _singletons[name]
+
+def _open_debate_store():
+    options = {
+        "max_finished": int(os.environ.get("DEBATE_MAX_FINISHED", 500)),
+        "retention_seconds": float(os.environ.get("DEBATE_RETENTION_DAYS", 7)) * 24 * 3600,
+    }
+    if os.environ.get("DEBATE_STORE", "sqlite") == "memory":
+        return InMemoryDebateStore(**options)
+    return SQLiteDebateStore(os.environ.get("DEBATE_DB_PATH", "debates.db"), **options)
+
+def get_debate_store():
+    """Durable record of every debate, shared by all worker processes."""
+    return _singleton("debate_store", _open_debate_store)
+
+def get_completion_cache():
+    """Opt-in cache of LLM completions that replays identical debates; None when disabled."""
+    return _singleton("completion_cache", lambda: (
+        CompletionCache(
+            os.environ["COMPLETION_CACHE_PATH"],
+            max_entries=int(os.environ.get("COMPLETION_CACHE_SIZE", 10000))
+        )
+        if os.environ.get("COMPLETION_CACHE_PATH") else None
+    ))
+
+def get_debate_runner():
+    """Runs debates in the background; extra submissions wait in a bounded queue."""
+    return _singleton("debate_runner", lambda: DebateRunner(
+        max_concurrent=int(os.environ.get("MAX_CONCURRENT_DEBATES", 2)),
+        max_queued=int(os.environ.get("MAX_QUEUED_DEBATES", 8))
+    ))
+
+# Hard cap on tokens per agent response; AGENT_MAX_TOKENS=0 leaves it to the model
+AGENT_MAX_TOKENS = int(os.environ.get("AGENT_MAX_TOKENS", 256)) or None
+
+# Debates end before their last round once every agent's response is at least
+# this similar to its previous one; unset always runs every round
+CONVERGENCE_THRESHOLD = (
+    float(os.environ["DEBATE_CONVERGENCE_THRESHOLD"])
+    if os.environ.get("DEBATE_CONVERGENCE_THRESHOLD") else None
+)
+
+# Backend and model for round digests and summaries, which may be smaller and
+# faster than the agents'; unset uses the model the debate was started with
+SUMMARY_LLM_TYPE = os.environ.get("SUMMARY_LLM_TYPE") or None
+SUMMARY_MODEL_NAME = os.environ.get("SUMMARY_MODEL_NAME") or None
+
+# Debates running in this process, kept only until they finish; everything
+# else is read back from the debate store
 active_debates = {}
 
+# Seconds between keep-alive comments on idle event streams
+SSE_KEEPALIVE_SECONDS = 15
+
+# Seconds between store polls when streaming a debate run by another worker
+STORE_POLL_SECONDS = 1
+
+# Debates per page on /debates
+DEBATES_PAGE_SIZE = 20
+
+def collect_gauges():
+    """Report runner occupancy and cache statistics on each /metrics scrape."""
+    runner_stats = get_debate_runner().get_stats()
+    completion_cache = get_completion_cache()
+    cache_stats = kb_manager.get_cache_stats()
+    gauges = [
+        ("debates_running", "Debates currently running in this process", [({}, runner_stats["running"])]),
+        ("debates_summarizing", "Finished debates whose summary is being generated",
+         [({}, runner_stats["summarizing"])]),
+        ("debates_queued", "Debates waiting for a free runner slot", [({}, runner_stats["queued"])]),
+        ("kb_cache_hit_rate", "Retrieval cache hit rate per domain",
+         [({"domain": domain}, stats["hit_rate"]) for domain, stats in cache_stats.items()]),
+        ("kb_cache_entries", "Retrieval results cached per domain",
+         [({"domain": domain}, stats["size"]) for domain, stats in cache_stats.items()]),
+    ]
+    if completion_cache is not None:
+        gauges.append(("llm_completion_cache_entries", "Completions in the persistent completion cache",
+                       [({}, completion_cache.get_stats()["entries"])]))
+    return gauges
+
+metrics.add_collector(collect_gauges)
+
+def render_index(**kwargs):
+    """Render the home page with the currently discovered domains."""
+    domains = [
+        {"id": domain, "label": DOMAIN_LABELS.get(domain, domain.replace('_', ' ').title())}
+        for domain in kb_manager.refresh_domains()
+    ]
+    return render_template('index.html', domains=domains, **kwargs)
+
 @app.route('/')
 def index():
     """Home page with form to start a new debate."""
-    return render_template('index.html')
+    return render_index()
 
 @app.route('/debates', methods=['GET'])
 def list_debates():
-    """List all active debates."""
+    """List debates, newest first, one page at a time."""
+    page = max(request.args.get('page', default=1, type=int), 1)
+    records, total = get_debate_store().list(
+        limit=DEBATES_PAGE_SIZE,
+        offset=(page - 1) * DEBATES_PAGE_SIZE
+    )
     debates_info = []
-    for debate_id, debate in active_debates.items():
+    for record in records:
         debates_info.append({
-            'id': debate_id,
-            'topic': debate.topic,
-            'status': debate.status,
-            'agents': [agent.name for agent in debate.agents],
-            'rounds': debate.total_rounds
+            'id': record['id'],
+            'topic': record['topic'],
+            'status': record['status'],
+            'agents': record['details']['status_info']['agents'],
+            'rounds': record['total_rounds']
         })
-    return render_template('debates.html', debates=debates_info)
+    pages = max((total + DEBATES_PAGE_SIZE - 1) // DEBATES_PAGE_SIZE, 1)
+    return render_template('debates.html', debates=debates_info, page=page, pages=pages)
 
 @app.route('/start_debate', methods=['POST'])
 def start_debate():
@@ -43,83 +223,140 @@ def start_debate():
     rounds = int(request.form.get('rounds', 3))
     llm_type = request.form.get('llm_type', 'ollama')
     model_name = request.form.get('model_name', 'llama2')
+    concurrent_turns = request.form.get('concurrent_turns') == 'on'
+    fresh_sampling = request.form.get('fresh_sampling') == 'on'
 
     # Ensure at least 2 domains are selected
     if len(selected_domains) < 2:
-        return render_template('index.html',
-                             error="Please select at least 2 domains for the debate")
+        return render_index(error="Please select at least 2 domains for the debate")
 
-    # Create agents for selected domains
+    # Create agents for selected domains. Their knowledge bases are attached
+    # when the debate starts, so a domain still being indexed doesn't hold up
+    # this request
+    completion_cache = get_completion_cache()
+    known_domains = kb_manager.refresh_domains()
     agents = []
     for domain in selected_domains:
-        kb = kb_manager.get_knowledge_base(domain)
-        if kb:
-            agent = create_agent_for_domain(domain, kb, llm_type, model_name)
+        if domain in known_domains:
+            agent = create_agent_for_domain(
+                domain, kb_manager.knowledge_bases.get(domain), llm_type, model_name,
+                registry=llm_registry,
+                completion_cache=completion_cache,
+                max_tokens=AGENT_MAX_TOKENS
+            )
             agents.append(agent)
 
     # Create a debate ID
-    debate_id = f"debate_{len(active_debates) + 1}"
+    debate_id = get_debate_store().new_id()
 
     # Create and start the debate
     orchestrator = DebateOrchestrator(
         topic=topic,
         agents=agents,
         rounds=rounds,
-        summary_llm_type=llm_type,
-        summary_model_name=model_name
+        summary_llm_type=SUMMARY_LLM_TYPE or llm_type,
+        summary_model_name=SUMMARY_MODEL_NAME or model_name,
+        registry=llm_registry,
+        concurrent_turns=concurrent_turns,
+        context_window=int(os.environ.get("LLM_CONTEXT_WINDOW", 4096)),
+        digest_tokens=int(os.environ.get("DEBATE_DIGEST_TOKENS", 150)),
+        completion_cache=completion_cache,
+        fresh_sampling=fresh_sampling,
+        convergence_threshold=CONVERGENCE_THRESHOLD,
+        convergence_min_rounds=int(os.environ.get("DEBATE_MIN_ROUNDS", 2)),
+        embed_model=kb_manager.ingestion.embed_model,
+        knowledge_base_loader=kb_manager.get_knowledge_base
     )
 
     # Store the debate
-    active_debates[debate_id] = orchestrator
+    orchestrator.attach_store(get_debate_store(), debate_id)
 
     # Start the debate in the background
-    orchestrator.conduct_debate_async()
+    try:
+        future = get_debate_runner().submit(orchestrator)
+    except DebateQueueFull:
+        get_debate_store().delete(debate_id)
+        return render_index(error="Too many debates are in progress. Please try again shortly."), 429
+
+    active_debates[debate_id] = orchestrator
+    future.add_done_callback(lambda _: active_debates.pop(debate_id, None))
 
     return redirect(url_for('view_debate', debate_id=debate_id))
 
 @app.route('/debate/<debate_id>')
 def view_debate(debate_id):
     """View a specific debate."""
-    if debate_id not in active_debates:
+    record = get_debate_store().get(debate_id)
+    if record is None:
         return render_template('error.html', message=f"Debate {debate_id} not found")
 
-    debate = active_debates[debate_id]
     return render_template('debate.html',
                          debate_id=debate_id,
-                         topic=debate.topic,
-                         status=debate.status)
+                         topic=record['topic'],
+                         status=record['status'])
+
+def conditional_json(etag, build_payload):
+    """Answer 304 when the client already has this version, otherwise build the JSON body."""
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = jsonify(build_payload())
+    response.set_etag(etag)
+    # Clients may keep the body but must revalidate before reusing it
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 @app.route('/api/debate/<debate_id>/status')
 def debate_status(debate_id):
     """Get the current status of a debate."""
-    if debate_id not in active_debates:
+    record = get_debate_store().get(debate_id)
+    if record is None:
         return jsonify({"error": f"Debate {debate_id} not found"}), 404
 
-    debate = active_debates[debate_id]
-    return jsonify(debate.get_status())
+    return conditional_json(
+        f"{debate_id}-{record['version']}",
+        lambda: record['details']['status_info']
+    )
 
 @app.route('/api/debate/<debate_id>/log')
 def debate_log(debate_id):
-    """Get the debate log and summary."""
-    if debate_id not in active_debates:
+    """Get the debate log and summary; ?since=<index> returns only newer log entries."""
+    record = get_debate_store().get(debate_id)
+    if record is None:
         return jsonify({"error": f"Debate {debate_id} not found"}), 404
 
-    debate = active_debates[debate_id]
+    since = max(request.args.get('since', default=0, type=int), 0)
+    return conditional_json(
+        f"{debate_id}-{record['version']}-{since}",
+        lambda: build_log_data(record, since)
+    )
+
+def build_log_data(record, since):
+    """Build the /log payload with the log entries from index `since` onwards."""
+    status_info = record['details']['status_info']
     # Get debate analysis
-    analysis = debate._analyze_debate_quality()
-    
+    analysis = status_info.get('analysis') or {
+        "participation": {},
+        "interaction_score": 0,
+        "knowledge_usage": {},
+        "topic_adherence": 0
+    }
+
     # Structure the response data
     log_data = {
-        "status": debate.status,
+        "status": record['status'],
         "debate_info": {
-            "topic": debate.topic,
-            "total_rounds": debate.total_rounds,
-            "current_round": debate.current_round,
-            "participants": [agent.name for agent in debate.agents]
+            "topic": record['topic'],
+            "total_rounds": record['total_rounds'],
+            "current_round": record['current_round'],
+            "participants": status_info['agents']
         },
         "debate_content": {
-            "log": debate.debate_log,
-            "summary": debate.summary
+            "log": get_debate_store().get_entries(record['id'], since),
+            "log_offset": since,
+            "log_length": record['log_length'],
+            "summary": record['summary'],
+            "summary_status": summary_status(record)
         },
         "debate_analysis": {
             "participation_metrics": analysis["participation"],
@@ -128,7 +365,181 @@ def debate_log(debate_id):
             "topic_adherence": round(analysis["topic_adherence"] * 100, 2)
         }
     }
-    return jsonify(log_data)
+    return log_data
+
+def summary_status(record):
+    """Get a stored debate's summary status, treating debates stored before it was tracked as summarized."""
+    return record['details']['status_info'].get('summary_status', 'completed')
+
+@app.route('/api/debate/<debate_id>/summary')
+def debate_summary(debate_id):
+    """Get the rendered summary and its markdown; ?format=markdown returns only the markdown."""
+    record = get_debate_store().get(debate_id)
+    if record is None:
+        return jsonify({"error": f"Debate {debate_id} not found"}), 404
+
+    if request.args.get('format') == 'markdown':
+        response = Response(record['details'].get('summary_markdown', ''), mimetype='text/markdown')
+        response.set_etag(f"{debate_id}-{record['version']}-md")
+        response.headers['Cache-Control'] = 'no-cache'
+        return response.make_conditional(request)
+
+    return conditional_json(
+        f"{debate_id}-{record['version']}-summary",
+        lambda: {
+            "summary_status": summary_status(record),
+            "summary": record['summary'],
+            "summary_markdown": record['details'].get('summary_markdown', '')
+        }
+    )
+
+def sse_event(event_type, data, event_id=None):
+    """Format one Server-Sent Event."""
+    prefix = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{prefix}event: {event_type}\ndata: {json.dumps(data)}\n\n"
+
+def stream_local_debate(debate, cursor):
+    """Follow the live event log of a debate running in this process."""
+    while True:
+        events, cursor = debate.events.read(cursor, timeout=SSE_KEEPALIVE_SECONDS)
+        for event in events:
+            yield sse_event(event['type'], event['data'], event['id'])
+        if not events:
+            if debate.events.closed:
+                break
+            # Comment line keeps proxies from closing an idle connection
+            yield ": keep-alive\n\n"
+    yield sse_event("end", {})
+
+def stream_stored_debate(debate_id):
+    """Follow a debate through the store when another worker is running it.
+
+    Tokens are not available this way, so whole turns are sent as they are logged.
+    """
+    sent_entries = 0
+    sent_version = None
+    sent_summary = False
+    last_write = time.monotonic()
+    while True:
+        record = get_debate_store().get(debate_id)
+        if record is None:
+            break
+        if record['version'] != sent_version:
+            sent_version = record['version']
+            yield sse_event("status", {"status": record['status']})
+            agent_count = max(len(record['details']['agents']), 1)
+            for entry in get_debate_store().get_entries(debate_id, sent_entries):
+                yield sse_event("turn_end", {
+                    "round": sent_entries // agent_count + 1,
+                    "agent": entry['agent'],
+                    "response": entry['response']
+                })
+                sent_entries += 1
+            if record['summary'] and not sent_summary:
+                sent_summary = True
+                yield sse_event("summary", {"summary": record['summary']})
+            last_write = time.monotonic()
+        # A completed debate may still be generating its summary
+        if record['status'] in FINISHED_STATUSES and summary_status(record) not in ('pending', 'in_progress'):
+            break
+        if time.monotonic() - last_write >= SSE_KEEPALIVE_SECONDS:
+            last_write = time.monotonic()
+            yield ": keep-alive\n\n"
+        time.sleep(STORE_POLL_SECONDS)
+    yield sse_event("end", {})
+
+@app.route('/api/debate/<debate_id>/stream')
+def debate_stream(debate_id):
+    """Stream debate events (rounds, turns, tokens, summary) as Server-Sent Events."""
+    debate = active_debates.get(debate_id)
+    if debate is None:
+        if get_debate_store().get(debate_id) is None:
+            return jsonify({"error": f"Debate {debate_id} not found"}), 404
+        events = stream_stored_debate(debate_id)
+    else:
+        # EventSource sends Last-Event-ID when it reconnects
+        last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id', '0')
+        cursor = int(last_event_id) if last_event_id.isdigit() else 0
+        events = stream_local_debate(debate, cursor)
+
+    return Response(
+        stream_with_context(events),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+def get_domain_knowledge_base(domain):
+    """Get a domain's knowledge base, or None if the domain does not exist."""
+    if domain not in kb_manager.refresh_domains():
+        return None
+    return kb_manager.get_knowledge_base(domain)
+
+@app.route('/api/domains/<domain>/documents', methods=['GET'])
+def list_documents(domain):
+    """List the documents indexed for a domain."""
+    kb = get_domain_knowledge_base(domain)
+    if kb is None:
+        return jsonify({"error": f"Domain {domain} not found"}), 404
+    return jsonify({"domain": domain, "documents": kb.list_documents()})
+
+def is_document_name(name):
+    """Whether a name can be used as-is for a file in a domain directory, e.g. "UI UX.pdf"."""
+    # The same rule as KnowledgeBase.add_document; names are not rewritten, so
+    # a document can be replaced and deleted under the name it is listed with
+    return bool(name) and os.path.basename(name) == name and not name.startswith(".")
+
+@app.route('/api/domains/<domain>/documents', methods=['POST'])
+def upload_document(domain):
+    """Add or replace a document; only that file is chunked and embedded."""
+    kb = get_domain_knowledge_base(domain)
+    if kb is None:
+        return jsonify({"error": f"Domain {domain} not found"}), 404
+    upload = request.files.get('file')
+    name = upload.filename if upload else ""
+    if not name:
+        return jsonify({"error": "Expected a multipart 'file' upload with a file name"}), 400
+    if not is_document_name(name):
+        return jsonify({"error": f"Invalid document name: {name}"}), 400
+    if not kb.add_document(upload.read(), name):
+        return jsonify({"error": f"Could not index {name}; no text could be read from it"}), 422
+    return jsonify({"domain": domain, "document": name, "documents": kb.list_documents()}), 201
+
+@app.route('/api/domains/<domain>/documents/<name>', methods=['DELETE'])
+def delete_document(domain, name):
+    """Remove a document and its chunks from a domain."""
+    kb = get_domain_knowledge_base(domain)
+    if kb is None:
+        return jsonify({"error": f"Domain {domain} not found"}), 404
+    if not is_document_name(name):
+        return jsonify({"error": f"Invalid document name: {name}"}), 400
+    if not kb.remove_document(name):
+        return jsonify({"error": f"Document {name} not found in {domain}"}), 404
+    return jsonify({"domain": domain, "documents": kb.list_documents()})
+
+@app.route('/api/search')
+def federated_search():
+    """Search several domains at once and return the merged, ranked chunks with their sources."""
+    query_text = request.args.get('q', '').strip()
+    if not query_text:
+        return jsonify({"error": "Expected a 'q' query parameter"}), 400
+    # Accept both ?domains=a&domains=b and ?domains=a,b
+    domains = [d for value in request.args.getlist('domains') for d in value.split(',') if d] or None
+    top_k = min(max(request.args.get('top_k', 10, type=int), 1), 50)
+    max_per_domain = request.args.get('max_per_domain', type=int)
+    if 'max_per_domain' in request.args and (max_per_domain is None or max_per_domain < 1):
+        return jsonify({"error": "'max_per_domain' must be a whole number of at least 1"}), 400
+    results = kb_manager.federated_search(
+        query_text,
+        domains=domains,
+        top_k=top_k,
+        max_per_domain=max_per_domain
+    )
+    return jsonify({"query": query_text, "results": results})
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Stage latency histograms, token counters and gauges in the Prometheus text format."""
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
 
 if __name__ == '__main__':
     app.run(debug=True)
@@ -0,0 +1,304 @@
+"""Run a batch of debates from the command line, e.g. for nightly evaluations.
+
+Every topic in the topics file (one per line, blank lines and lines starting
+with "#" are skipped) is debated by every domain combination. Debates run in
+parallel on one DebateRunner and share the LLM clients, knowledge base
+indexes and caches, with the backend capped at --max-in-flight requests.
+
+Each finished debate is appended to the output JSONL file as soon as it
+completes, so the file doubles as the checkpoint: running the same command
+again skips debates that already completed and retries the rest.
+
+    python batch.py --topics topics.txt --domains ai,ml --domains ai,programming \\
+        --rounds 3 --parallel 8 --output results.jsonl
+"""
+import argparse
+import contextlib
+import hashlib
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import Future, as_completed
+from typing import Any, Dict, List, Set, Tuple
+
+from agents.completion_cache import CompletionCache
+from agents.llm_registry import LLMRegistry, DEFAULT_OLLAMA_URL
+from agents.orchestrator import DebateOrchestrator
+from agents.runner import DebateRunner
+from agents.specializations import create_agent_for_domain
+from knowledge_base.rag import DomainKnowledgeBaseManager
+
+DOMAINS_DIR = "knowledge_base/domains"
+
+
+def read_topics(path: str) -> List[str]:
+    """Read one topic per line, skipping blank lines and comments."""
+    with open(path, encoding="utf-8") as f:
+        topics = [line.strip() for line in f]
+    return [topic for topic in topics if topic and not topic.startswith("#")]
+
+
+def job_key(job: Dict[str, Any]) -> str:
+    """Identify a debate by everything that determines its outcome."""
+    payload = json.dumps(
+        [job["topic"], job["domains"], job["rounds"], job["llm_type"], job["model_name"],
+         job["summary_llm_type"], job["summary_model_name"], job["max_tokens"], job["convergence_threshold"]],
+        sort_keys=True
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def load_checkpoint(path: str) -> Set[str]:
+    """
+    Read the keys of completed debates from an earlier run's output.
+
+    A line cut short by an interrupted write is truncated away, so new
+    results are appended after the last complete one.
+    """
+    completed: Set[str] = set()
+    if not os.path.exists(path):
+        return completed
+
+    valid_bytes = 0
+    with open(path, "rb") as f:
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break
+            valid_bytes += len(line)
+            if record.get("status") == "completed":
+                completed.add(record["key"])
+
+    if valid_bytes < os.path.getsize(path):
+        print(f"Discarding an incomplete record at the end of {path}", file=sys.stderr)
+        with open(path, "r+b") as f:
+            f.truncate(valid_bytes)
+    return completed
+
+
+def make_registry(args: argparse.Namespace) -> LLMRegistry:
+    return LLMRegistry(
+        max_in_flight=args.max_in_flight,
+        base_url=args.ollama_url,
+        ollama_options={"context_window": args.context_window}
+    )
+
+
+def make_manager(registry: LLMRegistry, args: argparse.Namespace) -> DomainKnowledgeBaseManager:
+    return DomainKnowledgeBaseManager(
+        base_dir=DOMAINS_DIR,
+        storage_dir=args.storage_dir,
+        lazy=True,
+        llm_type=args.kb_llm_type,
+        registry=registry,
+        knowledge_base_options={"vector_store": args.vector_store}
+    )
+
+
+def make_jobs(topics: List[str], pairings: List[List[str]], args: argparse.Namespace) -> List[Dict[str, Any]]:
+    jobs = []
+    for topic in topics:
+        for domains in pairings:
+            job = {
+                "topic": topic,
+                "domains": domains,
+                "rounds": args.rounds,
+                "llm_type": args.llm_type,
+                "model_name": args.model_name,
+                "summary_llm_type": args.summary_llm_type or args.llm_type,
+                "summary_model_name": args.summary_model or args.model_name,
+                "max_tokens": args.max_tokens or None,
+                "convergence_threshold": args.convergence_threshold
+            }
+            job["key"] = job_key(job)
+            jobs.append(job)
+    return jobs
+
+
+def make_debate(
+    job: Dict[str, Any],
+    manager: DomainKnowledgeBaseManager,
+    registry: LLMRegistry,
+    completion_cache: CompletionCache,
+    args: argparse.Namespace
+) -> DebateOrchestrator:
+    agents = [
+        create_agent_for_domain(
+            domain, manager.get_knowledge_base(domain), job["llm_type"], job["model_name"],
+            registry=registry,
+            completion_cache=completion_cache,
+            max_tokens=job["max_tokens"]
+        )
+        for domain in job["domains"]
+    ]
+    return DebateOrchestrator(
+        topic=job["topic"],
+        agents=agents,
+        rounds=job["rounds"],
+        summary_llm_type=job["summary_llm_type"],
+        summary_model_name=job["summary_model_name"],
+        registry=registry,
+        concurrent_turns=args.concurrent_turns,
+        context_window=args.context_window,
+        completion_cache=completion_cache,
+        fresh_sampling=args.fresh_sampling,
+        convergence_threshold=job["convergence_threshold"],
+        convergence_min_rounds=args.min_rounds,
+        embed_model=manager.ingestion.embed_model
+    )
+
+
+def debate_record(job: Dict[str, Any], debate: DebateOrchestrator, error: str = "") -> Dict[str, Any]:
+    """The JSONL line written for a finished debate."""
+    status = debate.get_status()
+    # Time spent debating, excluding the wait for a free runner slot
+    wall_s = status["timings"]["stages"].get("debate", {}).get("total_s", 0.0)
+    record = dict(job)
+    record.update({
+        "status": debate.status,
+        "log": debate.debate_log,
+        "summary": debate.summary,
+        "summary_markdown": debate.summary_markdown,
+        "summary_status": debate.summary_status,
+        "analysis": status.get("analysis", {}),
+        "timings": status["timings"],
+        "rounds_run": debate.current_round,
+        "convergence": status.get("convergence"),
+        "wall_s": wall_s,
+        "finished_at": time.time()
+    })
+    if error:
+        record["error"] = error
+    return record
+
+
+def run_batch(
+    jobs: List[Dict[str, Any]],
+    manager: DomainKnowledgeBaseManager,
+    registry: LLMRegistry,
+    args: argparse.Namespace
+) -> Dict[str, int]:
+    """Run the debates, appending each result to the output as it finishes."""
+    completion_cache = (
+        CompletionCache(args.completion_cache, max_entries=args.completion_cache_size)
+        if args.completion_cache else None
+    )
+    counts = {"completed": 0, "failed": 0}
+
+    # Build or load every index once before debates start sharing them
+    domains = sorted({domain for job in jobs for domain in job["domains"]})
+    missing = [domain for domain in domains if manager.get_knowledge_base(domain) is None]
+    if missing:
+        raise SystemExit(f"No knowledge base for: {', '.join(missing)}")
+
+    runner = DebateRunner(max_concurrent=args.parallel, max_queued=len(jobs))
+    pending: Dict[Future, Tuple[Dict[str, Any], DebateOrchestrator]] = {}
+    try:
+        with open(args.output, "a", encoding="utf-8") as out:
+            for job in jobs:
+                debate = make_debate(job, manager, registry, completion_cache, args)
+                pending[runner.submit(debate)] = (job, debate)
+
+            for done, future in enumerate(as_completed(pending), 1):
+                job, debate = pending[future]
+                error = ""
+                try:
+                    future.result()
+                except Exception as e:
+                    error = str(e)
+                if error or debate.status != "completed":
+                    error = error or f"Debate ended with status {debate.status}"
+                    counts["failed"] += 1
+                else:
+                    counts["completed"] += 1
+
+                record = debate_record(job, debate, error)
+                # One write per line, flushed to disk, so an interrupted batch loses at most this debate
+                out.write(json.dumps(record, default=str) + "\n")
+                out.flush()
+                os.fsync(out.fileno())
+                print(
+                    f"[{done}/{len(jobs)}] {record['status']} {'+'.join(job['domains'])}: "
+                    f"{job['topic']} ({record['wall_s']:.1f}s)",
+                    file=sys.stderr
+                )
+    finally:
+        runner.shutdown()
+    return counts
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--topics", required=True, help="File with one debate topic per line")
+    parser.add_argument("--domains", action="append", default=[],
+                        help="Comma-separated domains of one debate; repeat for more pairings. "
+                             "Defaults to every combination of --agents domains")
+    parser.add_argument("--agents", type=int, default=2, help="Domains per debate when --domains is not given")
+    parser.add_argument("--output", required=True, help="JSONL file results are appended to; also the checkpoint")
+    parser.add_argument("--rounds", type=int, default=3, help="Rounds per debate, or at most with --convergence-threshold")
+    parser.add_argument("--convergence-threshold", type=float,
+                        help="End a debate early once every agent's response is at least this similar to its previous one")
+    parser.add_argument("--min-rounds", type=int, default=2, help="Rounds run before a debate may end early")
+    parser.add_argument("--max-tokens", type=int, default=256, help="Tokens per agent response; 0 leaves it to the model")
+    parser.add_argument("--llm-type", default="ollama", help="LLM backend for the agents")
+    parser.add_argument("--model-name", default="llama2", help="Model for the agents")
+    parser.add_argument("--summary-llm-type", help="LLM backend for round digests and summaries; defaults to --llm-type")
+    parser.add_argument("--summary-model", help="Model for round digests and summaries, e.g. a smaller one; defaults to --model-name")
+    parser.add_argument("--parallel", type=int, default=4, help="Debates run at once")
+    parser.add_argument("--max-in-flight", type=int, default=4,
+                        help="Concurrent requests to the LLM backend across all debates")
+    parser.add_argument("--ollama-url", default=DEFAULT_OLLAMA_URL, help="URL of the Ollama server")
+    parser.add_argument("--context-window", type=int, default=4096, help="Tokens the models accept per request")
+    parser.add_argument("--kb-llm-type", default="ollama", help="Backend used to embed the knowledge bases")
+    parser.add_argument("--storage-dir", default="knowledge_base/storage", help="Where built indexes are persisted")
+    parser.add_argument("--vector-store", choices=("numpy", "simple"), default="numpy", help="Knowledge base vector store")
+    parser.add_argument("--completion-cache", help="SQLite file caching completions across runs")
+    parser.add_argument("--completion-cache-size", type=int, default=10000, help="Completions kept in the cache")
+    parser.add_argument("--fresh-sampling", action="store_true", help="Bypass the completion cache")
+    parser.add_argument("--concurrent-turns", action="store_true", help="Let agents answer a round simultaneously")
+    args = parser.parse_args()
+
+    topics = read_topics(args.topics)
+    if not topics:
+        parser.error(f"No topics in {args.topics}")
+
+    registry = make_registry(args)
+    manager = make_manager(registry, args)
+    known = manager.domains
+    if args.domains:
+        pairings = [[domain.strip() for domain in value.split(",") if domain.strip()] for value in args.domains]
+    else:
+        pairings = [list(combination) for combination in itertools.combinations(known, args.agents)]
+    for domains in pairings:
+        if len(domains) < 2:
+            parser.error(f"A debate needs at least 2 domains, got {','.join(domains)}")
+        unknown = [domain for domain in domains if domain not in known]
+        if unknown:
+            parser.error(f"Unknown domains {', '.join(unknown)}; available: {', '.join(known)}")
+
+    jobs = make_jobs(topics, pairings, args)
+    completed = load_checkpoint(args.output)
+    remaining = [job for job in jobs if job["key"] not in completed]
+    print(f"{len(jobs)} debates, {len(jobs) - len(remaining)} already completed", file=sys.stderr)
+    if not remaining:
+        registry.close()
+        return
+
+    # Progress messages from the knowledge bases go to stderr with ours
+    try:
+        with contextlib.redirect_stdout(sys.stderr):
+            counts = run_batch(remaining, manager, registry, args)
+    finally:
+        registry.close()
+    print(f"{counts['completed']} completed, {counts['failed']} failed", file=sys.stderr)
+    if counts["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""Benchmarks for the debate simulator, run against the offline "fake" backend.
+
+Measures knowledge base build and load time, per-turn latency, full-debate
+wall time, concurrent-debate throughput and /status and /log latency under
+simulated viewers, then prints the results as JSON so runs can be compared
+between versions:
+
+    python benchmark.py --output results.json
+"""
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import wait
+from typing import Any, Dict, List
+
+from agents.llm_registry import LLMRegistry
+from agents.orchestrator import DebateOrchestrator
+from agents.runner import DebateRunner
+from agents.specializations import create_agent_for_domain
+from knowledge_base.rag import DomainKnowledgeBaseManager
+
+DOMAINS_DIR = "knowledge_base/domains"
+TOPIC = "Should machine learning models be retrained continuously?"
+
+
+def summarize(samples: List[float]) -> Dict[str, Any]:
+    """Reduce latency samples (in seconds) to summary statistics in milliseconds."""
+    if not samples:
+        return {"count": 0}
+    ordered = sorted(samples)
+
+    def percentile(p: float) -> float:
+        return ordered[min(int(p * len(ordered)), len(ordered) - 1)] * 1000
+
+    return {
+        "count": len(ordered),
+        "mean_ms": statistics.mean(ordered) * 1000,
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+        "max_ms": ordered[-1] * 1000
+    }
+
+
+def git_version() -> str:
+    try:
+        return subprocess.run(
+            ["git", "describe", "--always", "--dirty"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def make_registry(args: argparse.Namespace) -> LLMRegistry:
+    return LLMRegistry(
+        max_in_flight=args.max_in_flight,
+        fake_options={"latency": args.latency, "tokens_per_second": args.tokens_per_second},
+        fake_embed_options={"latency": args.embed_latency}
+    )
+
+
+def make_manager(registry: LLMRegistry, storage_dir: str, args: argparse.Namespace) -> DomainKnowledgeBaseManager:
+    return DomainKnowledgeBaseManager(
+        base_dir=DOMAINS_DIR,
+        storage_dir=storage_dir,
+        lazy=True,
+        llm_type="fake",
+        registry=registry,
+        knowledge_base_options={"vector_store": args.vector_store}
+    )
+
+
+def make_debate(manager: DomainKnowledgeBaseManager, registry: LLMRegistry, args: argparse.Namespace) -> DebateOrchestrator:
+    agents = [
+        create_agent_for_domain(domain, manager.get_knowledge_base(domain), "fake", "fake", registry=registry)
+        for domain in manager.domains[:args.agents]
+    ]
+    return DebateOrchestrator(
+        topic=TOPIC,
+        agents=agents,
+        rounds=args.rounds,
+        summary_llm_type="fake",
+        summary_model_name="fake",
+        registry=registry,
+        concurrent_turns=args.concurrent_turns
+    )
+
+
+def bench_startup(registry: LLMRegistry, storage_dir: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """Time building every domain's index from scratch, then loading it back from disk."""
+    start = time.perf_counter()
+    make_manager(registry, storage_dir, args).warm_up(background=False)
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    manager = make_manager(registry, storage_dir, args)
+    manager.warm_up(background=False)
+    load = time.perf_counter() - start
+    return {"domains": len(manager.domains), "index_build_s": build, "index_load_s": load}
+
+
+def bench_turns(manager: DomainKnowledgeBaseManager, registry: LLMRegistry, args: argparse.Namespace) -> Dict[str, Any]:
+    """Time single agent turns (retrieval plus generation)."""
+    agent = make_debate(manager, registry, args).agents[0]
+    context = {"topic": TOPIC, "round": 1, "total_rounds": 1}
+
+    async def run() -> List[float]:
+        samples = []
+        for i in range(args.turns):
+            start = time.perf_counter()
+            await agent.generate_response(f"{TOPIC} (turn {i})", context)
+            samples.append(time.perf_counter() - start)
+        return samples
+
+    return summarize(asyncio.run(run()))
+
+
+def bench_debate(manager: DomainKnowledgeBaseManager, registry: LLMRegistry, args: argparse.Namespace) -> Dict[str, Any]:
+    """Time one full debate, including the summary."""
+    debate = make_debate(manager, registry, args)
+    start = time.perf_counter()
+    asyncio.run(debate.conduct_debate())
+    return {
+        "status": debate.status,
+        "rounds": args.rounds,
+        "agents": len(debate.agents),
+        "wall_s": time.perf_counter() - start
+    }
+
+
+def bench_throughput(manager: DomainKnowledgeBaseManager, registry: LLMRegistry, args: argparse.Namespace) -> Dict[str, Any]:
+    """Run several debates through a DebateRunner and measure completed debates per second."""
+    runner = DebateRunner(max_concurrent=args.concurrency, max_queued=args.debates)
+    debates = [make_debate(manager, registry, args) for _ in range(args.debates)]
+    start = time.perf_counter()
+    futures = [runner.submit(debate) for debate in debates]
+    wait(futures)
+    elapsed = time.perf_counter() - start
+    runner.shutdown()
+    return {
+        "debates": args.debates,
+        "max_concurrent": args.concurrency,
+        "completed": sum(debate.status == "completed" for debate in debates),
+        "wall_s": elapsed,
+        "debates_per_s": args.debates / elapsed if elapsed else 0.0
+    }
+
+
+def bench_viewers(args: argparse.Namespace, storage_dir: str) -> Dict[str, Any]:
+    """Poll /status and /log from simulated viewers while a debate runs."""
+    # app configures itself from the environment at import time
+    os.environ.setdefault("DEBATE_STORE", "memory")
+    os.environ.setdefault("KB_LLM_TYPE", "fake")
+    os.environ.setdefault("KB_STORAGE_DIR", storage_dir)
+    os.environ.setdefault("KB_VECTOR_STORE", args.vector_store)
+    os.environ.setdefault("FAKE_LLM_LATENCY", str(args.latency))
+    if args.tokens_per_second:
+        os.environ.setdefault("FAKE_LLM_TOKENS_PER_SECOND", str(args.tokens_per_second))
+    import app as web
+
+    web.kb_manager.warm_up(background=False)
+    client = web.app.test_client()
+    response = client.post("/start_debate", data={
+        "topic": TOPIC,
+        "domains": web.kb_manager.domains[:args.agents],
+        "rounds": args.rounds,
+        "llm_type": "fake",
+        "model_name": "fake"
+    })
+    debate_id = response.headers["Location"].rstrip("/").split("/")[-1]
+
+    samples: Dict[str, List[float]] = {"status": [], "log": []}
+    lock = threading.Lock()
+
+    def viewer() -> None:
+        viewer_client = web.app.test_client()
+        local: Dict[str, List[float]] = {"status": [], "log": []}
+        for _ in range(args.requests):
+            for name in local:
+                start = time.perf_counter()
+                viewer_client.get(f"/api/debate/{debate_id}/{name}")
+                local[name].append(time.perf_counter() - start)
+        with lock:
+            for name, values in local.items():
+                samples[name].extend(values)
+
+    threads = [threading.Thread(target=viewer) for _ in range(args.viewers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    web.get_debate_runner().shutdown()
+
+    total = sum(len(values) for values in samples.values())
+    return {
+        "viewers": args.viewers,
+        "requests_per_s": total / elapsed if elapsed else 0.0,
+        "status": summarize(samples["status"]),
+        "log": summarize(samples["log"])
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rounds", type=int, default=3, help="Rounds per debate")
+    parser.add_argument("--agents", type=int, default=2, help="Agents per debate")
+    parser.add_argument("--turns", type=int, default=20, help="Agent turns timed by the per-turn benchmark")
+    parser.add_argument("--debates", type=int, default=8, help="Debates run by the throughput benchmark")
+    parser.add_argument("--concurrency", type=int, default=4, help="Debates the runner runs at once")
+    parser.add_argument("--viewers", type=int, default=8, help="Simulated viewers polling the API")
+    parser.add_argument("--requests", type=int, default=50, help="Polls of each endpoint per viewer")
+    parser.add_argument("--latency", type=float, default=0.05, help="Fake LLM seconds before the first token")
+    parser.add_argument("--tokens-per-second", type=float, default=500.0, help="Fake LLM generation speed")
+    parser.add_argument("--embed-latency", type=float, default=0.0, help="Fake embedding seconds per text")
+    parser.add_argument("--max-in-flight", type=int, default=4, help="Concurrent requests per backend")
+    parser.add_argument("--vector-store", choices=("numpy", "simple"), default="numpy", help="Knowledge base vector store")
+    parser.add_argument("--concurrent-turns", action="store_true", help="Let agents answer a round simultaneously")
+    parser.add_argument("--output", help="Write the JSON results to this file instead of stdout")
+    args = parser.parse_args()
+
+    results: Dict[str, Any] = {
+        "version": git_version(),
+        "timestamp": time.time(),
+        "python": platform.python_version(),
+        "config": vars(args),
+        "results": {}
+    }
+
+    registry = make_registry(args)
+    # Progress messages go to stderr so stdout is only the JSON
+    with contextlib.redirect_stdout(sys.stderr), tempfile.TemporaryDirectory() as storage_dir:
+        results["results"]["startup"] = bench_startup(registry, storage_dir, args)
+        manager = make_manager(registry, storage_dir, args)
+        manager.warm_up(background=False)
+        results["results"]["turn"] = bench_turns(manager, registry, args)
+        results["results"]["debate"] = bench_debate(manager, registry, args)
+        results["results"]["throughput"] = bench_throughput(manager, registry, args)
+        results["results"]["viewers"] = bench_viewers(args, storage_dir)
+    registry.close()
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+
+
+if __name__ == "__main__":
+    main()
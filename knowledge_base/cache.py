@@ -0,0 +1,124 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+
+class RetrievalCache:
+    """LRU cache with expiry for knowledge base query results.
+
+    Entries are looked up by exact (normalized) query text first and, when a
+    similarity threshold is set, by cosine similarity of query embeddings.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        ttl_seconds: Optional[float] = 3600.0,
+        similarity_threshold: Optional[float] = None
+    ):
+        """
+        Initialize a RetrievalCache.
+
+        Args:
+            max_entries (int): Entries kept before the least recently used is evicted
+            ttl_seconds (float, optional): Seconds an entry stays valid; None keeps entries until evicted
+            similarity_threshold (float, optional): Minimum cosine similarity for a semantic hit;
+                None only serves exact matches
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+        self._lock = threading.Lock()
+        # key -> (value, unit-length embedding or None, scope, expires_at)
+        self._entries: "OrderedDict[str, Tuple[str, Optional[List[float]], str, float]]" = OrderedDict()
+        self._stats = {"hits": 0, "semantic_hits": 0, "misses": 0, "evictions": 0, "expirations": 0}
+
+    @property
+    def semantic(self) -> bool:
+        """Whether lookups may match on embedding similarity."""
+        return self.similarity_threshold is not None
+
+    @staticmethod
+    def _key(query: str, scope: str) -> str:
+        return f"{scope}\x00{' '.join(query.lower().split())}"
+
+    @staticmethod
+    def _unit(embedding: List[float]) -> Optional[List[float]]:
+        norm = math.sqrt(sum(x * x for x in embedding))
+        return [x / norm for x in embedding] if norm else None
+
+    def _expired(self, expires_at: float, now: float) -> bool:
+        return self.ttl_seconds is not None and now >= expires_at
+
+    def get(self, query: str, scope: str = "") -> Optional[str]:
+        """Look up a result by exact query text."""
+        with self._lock:
+            key = self._key(query, scope)
+            entry = self._entries.get(key)
+            if entry is not None:
+                if self._expired(entry[3], time.monotonic()):
+                    del self._entries[key]
+                    self._stats["expirations"] += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return entry[0]
+            if not self.semantic:
+                self._stats["misses"] += 1
+            return None
+
+    def get_similar(self, embedding: List[float], scope: str = "") -> Optional[str]:
+        """Look up the most similar cached query above the similarity threshold."""
+        if not self.semantic:
+            return None
+        query = self._unit(embedding)
+        with self._lock:
+            now = time.monotonic()
+            best_key, best_score = None, self.similarity_threshold
+            for key, (_, cached, entry_scope, expires_at) in list(self._entries.items()):
+                if self._expired(expires_at, now):
+                    del self._entries[key]
+                    self._stats["expirations"] += 1
+                    continue
+                if cached is None or query is None or entry_scope != scope:
+                    continue
+                score = sum(a * b for a, b in zip(query, cached))
+                if score >= best_score:
+                    best_key, best_score = key, score
+
+            if best_key is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(best_key)
+            self._stats["semantic_hits"] += 1
+            return self._entries[best_key][0]
+
+    def put(self, query: str, value: str, embedding: Optional[List[float]] = None, scope: str = "") -> None:
+        """Store a result, evicting the least recently used entries beyond max_entries."""
+        if self.max_entries <= 0:
+            return
+        expires_at = time.monotonic() + (self.ttl_seconds or 0)
+        unit = self._unit(embedding) if embedding is not None else None
+        with self._lock:
+            key = self._key(query, scope)
+            self._entries[key] = (value, unit, scope, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def invalidate(self) -> None:
+        """Drop every entry, e.g. after the underlying index was rebuilt."""
+        with self._lock:
+            self._entries.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit, miss and eviction counters."""
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats["size"] = len(self._entries)
+            lookups = stats["hits"] + stats["semantic_hits"] + stats["misses"]
+            stats["hit_rate"] = (stats["hits"] + stats["semantic_hits"]) / lookups if lookups else 0.0
+            return stats
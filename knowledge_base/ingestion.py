@@ -0,0 +1,211 @@
+import hashlib
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from llama_index.core import SimpleDirectoryReader
+from llama_index.core.node_parser import SentenceSplitter
+from llama_index.core.schema import BaseNode, MetadataMode
+
+# Bumped whenever the chunks or the text embedded for them change, so persisted
+# indexes built by an older pipeline are rebuilt
+INGESTION_VERSION = 1
+
+# Metadata that differs between copies of the same page; leaving it out of the
+# embedded text lets repeated pages share one vector
+UNEMBEDDED_METADATA = ("file_path", "page_label")
+
+
+def split_file(path: str, chunk_size: int) -> List[BaseNode]:
+    """Extract one file and split it into chunks. Runs in a worker process."""
+    documents = SimpleDirectoryReader(input_files=[path]).load_data()
+    nodes = SentenceSplitter(chunk_size=chunk_size).get_nodes_from_documents(documents)
+    for node in nodes:
+        node.excluded_embed_metadata_keys = sorted(
+            set(node.excluded_embed_metadata_keys) | set(UNEMBEDDED_METADATA)
+        )
+    return nodes
+
+
+def content_hash(node: BaseNode) -> str:
+    """Hash the exact text that gets embedded for a chunk."""
+    return hashlib.sha256(node.get_content(metadata_mode=MetadataMode.EMBED).encode("utf-8")).hexdigest()
+
+
+class EmbeddingCache:
+    """Chunk vectors by content hash, shared by every index built with one embedding model.
+
+    Keys being embedded by one build are marked pending, so a concurrent build
+    of another domain waits for that vector instead of requesting it again.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._vectors: Dict[str, List[float]] = {}
+        self._pending: Dict[str, Future] = {}
+
+    def claim(self, keys: List[str]) -> Tuple[Dict[str, List[float]], Dict[str, Future], List[str]]:
+        """
+        Sort keys by who provides their vector.
+
+        Args:
+            keys (List[str]): Content hashes needed by the caller
+
+        Returns:
+            Tuple: Vectors already known, futures for keys another build is embedding,
+                and the keys the caller must now embed and then fulfil or fail
+        """
+        known, waiting, mine = {}, {}, []
+        with self._lock:
+            for key in keys:
+                if key in self._vectors:
+                    known[key] = self._vectors[key]
+                elif key in self._pending:
+                    waiting[key] = self._pending[key]
+                else:
+                    self._pending[key] = Future()
+                    mine.append(key)
+        return known, waiting, mine
+
+    def fulfil(self, vectors: Dict[str, List[float]]) -> None:
+        """Store embedded vectors and wake up builds waiting for them."""
+        with self._lock:
+            self._vectors.update(vectors)
+            futures = [(self._pending.pop(key), key) for key in vectors if key in self._pending]
+        for future, key in futures:
+            future.set_result(vectors[key])
+
+    def fail(self, keys: List[str], error: BaseException) -> None:
+        """Release claimed keys that could not be embedded."""
+        with self._lock:
+            futures = [self._pending.pop(key) for key in keys if key in self._pending]
+        for future in futures:
+            future.set_exception(error)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._vectors)
+
+
+class IngestionPipeline:
+    """Turns document files into embedded chunks for VectorStoreIndex.
+
+    Files are extracted and split in a process pool, identical chunks are
+    embedded once (also across domains sharing the pipeline), and the unique
+    texts are embedded in large batches with several requests in flight.
+    """
+
+    def __init__(
+        self,
+        embed_model,
+        batch_size: int = 64,
+        max_concurrency: int = 4,
+        process_workers: Optional[int] = None
+    ):
+        """
+        Initialize an IngestionPipeline.
+
+        Args:
+            embed_model: The embedding model every chunk is embedded with
+            batch_size (int): Texts sent per embedding request
+            max_concurrency (int): Embedding requests in flight at once
+            process_workers (int, optional): Processes used for extraction and splitting;
+                None uses one per CPU, 0 splits on the calling thread
+        """
+        self.embed_model = embed_model
+        self.batch_size = batch_size
+        self.max_concurrency = max_concurrency
+        self.process_workers = process_workers
+        self.cache = EmbeddingCache()
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._pool_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self._stats = {"chunks": 0, "embedded": 0, "reused": 0}
+
+    def _get_pool(self) -> Optional[ProcessPoolExecutor]:
+        if self.process_workers == 0:
+            return None
+        with self._pool_lock:
+            if self._pool is None:
+                # Spawned rather than forked: the app process runs threads (event
+                # loop, HTTP pools) that must not be duplicated into children
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.process_workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._pool
+
+    def split(self, paths: List[str], chunk_size: int) -> List[BaseNode]:
+        """Extract and split files into chunks, in file order."""
+        pool = self._get_pool()
+        if pool is not None:
+            try:
+                futures = [pool.submit(split_file, path, chunk_size) for path in paths]
+                return [node for future in futures for node in future.result()]
+            except Exception as e:
+                print(f"Error splitting documents in worker processes, splitting in-process: {e}")
+        return [node for path in paths for node in split_file(path, chunk_size)]
+
+    def embed(self, nodes: List[BaseNode]) -> None:
+        """Set the embedding of every chunk, only embedding texts not seen before."""
+        keys = [content_hash(node) for node in nodes]
+        texts: Dict[str, str] = {}
+        for key, node in zip(keys, nodes):
+            texts.setdefault(key, node.get_content(metadata_mode=MetadataMode.EMBED))
+
+        vectors, waiting, mine = self.cache.claim(list(texts))
+        if mine:
+            batches = [mine[i:i + self.batch_size] for i in range(0, len(mine), self.batch_size)]
+            try:
+                with ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(batches))) as executor:
+                    results = executor.map(
+                        lambda batch: self.embed_model.get_text_embedding_batch([texts[key] for key in batch]),
+                        batches
+                    )
+                    for batch, embeddings in zip(batches, results):
+                        embedded = dict(zip(batch, embeddings))
+                        self.cache.fulfil(embedded)
+                        vectors.update(embedded)
+            except BaseException as e:
+                self.cache.fail(mine, e)
+                raise
+        for key, future in waiting.items():
+            vectors[key] = future.result()
+
+        for key, node in zip(keys, nodes):
+            node.embedding = vectors[key]
+        with self._stats_lock:
+            self._stats["chunks"] += len(nodes)
+            self._stats["embedded"] += len(mine)
+            self._stats["reused"] += len(nodes) - len(mine)
+
+    def run(self, paths: List[str], chunk_size: int = 1024) -> List[BaseNode]:
+        """
+        Build embedded chunks for a set of files.
+
+        Args:
+            paths (List[str]): The document files
+            chunk_size (int): Chunk size for the sentence splitter
+
+        Returns:
+            List[BaseNode]: Chunks with their embeddings set, ready for VectorStoreIndex
+        """
+        nodes = self.split(paths, chunk_size)
+        if nodes:
+            self.embed(nodes)
+        return nodes
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get how many chunks were ingested, embedded and served from earlier vectors."""
+        with self._stats_lock:
+            stats: Dict[str, Any] = dict(self._stats)
+        stats["cached_vectors"] = len(self.cache)
+        return stats
+
+    def close(self) -> None:
+        """Shut down the worker processes."""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.shutdown()
+                self._pool = None
@@ -1,9 +1,25 @@
 import os
-from typing import List, Dict, Any, Optional
-from llama_index.core import VectorStoreIndex, SimpleDirectoryReader, Settings
-from llama_index.embeddings.ollama import OllamaEmbedding
-from llama_index.llms.ollama import Ollama
-from llama_index.core.node_parser import SentenceSplitter
+import json
+import shutil
+import asyncio
+import hashlib
+import threading
+from contextvars import copy_context
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import List, Dict, Any, Optional, Tuple, Union
+from llama_index.core import (
+    VectorStoreIndex,
+    StorageContext,
+    load_index_from_storage,
+)
+from llama_index.core.postprocessor import SimilarityPostprocessor
+from llama_index.core.schema import NodeWithScore, QueryBundle
+from agents.llm_registry import LLMRegistry, default_registry
+from agents.metrics import span
+from agents.tokens import count_tokens, truncate_to_tokens
+from .cache import RetrievalCache
+from .ingestion import INGESTION_VERSION, IngestionPipeline
+from .vector_store import NumpyVectorStore
 
 class KnowledgeBase:
     """RAG knowledge base for debate agents"""
@@ -13,142 +29,639 @@ class KnowledgeBase:
         domain_name: str,
         documents_dir: str,
         embedding_model: str = "nomic-embed-text:latest",
-        llm_model: str = "qwen2.5:3b"
+        llm_model: str = "qwen2.5:3b",
+        persist_dir: Optional[str] = None,
+        chunk_size: int = 1024,
+        llm_type: str = "ollama",
+        registry: Optional[LLMRegistry] = None,
+        retrieval_mode: str = "retrieve",
+        similarity_top_k: int = 3,
+        similarity_cutoff: Optional[float] = None,
+        context_token_budget: int = 512,
+        cache_size: int = 256,
+        cache_ttl: Optional[float] = 3600.0,
+        semantic_cache_threshold: Optional[float] = None,
+        ingestion: Optional[IngestionPipeline] = None,
+        vector_store: str = "simple",
+        vector_dtype: str = "float32",
+        ann_threshold: Optional[int] = None
     ):
+        if retrieval_mode not in ("retrieve", "summarize"):
+            raise ValueError(f"Unsupported retrieval mode: {retrieval_mode}")
+        if vector_store not in ("simple", "numpy"):
+            raise ValueError(f"Unsupported vector store: {vector_store}")
+
         self.domain_name = domain_name
         self.documents_dir = documents_dir
         self.embedding_model = embedding_model
         self.llm_model = llm_model
+        self.persist_dir = persist_dir
+        self.chunk_size = chunk_size
+        self.llm_type = llm_type
+        self.registry = registry or default_registry
+        # "retrieve" returns raw chunks; "summarize" adds an LLM tree_summarize pass
+        self.retrieval_mode = retrieval_mode
+        self.similarity_top_k = similarity_top_k
+        self.similarity_cutoff = similarity_cutoff
+        self.context_token_budget = context_token_budget
+        # "numpy" keeps embeddings in one memory-mapped matrix, shared by worker processes
+        self.vector_store = vector_store
+        self.vector_dtype = vector_dtype
+        self.ann_threshold = ann_threshold
         self.index = None
+        # Retrievers for the current index snapshot, by top-k
+        self._retrievers: Dict[int, Any] = {}
+        self._query_engine = None
+        # Bumped on every index swap; results cached under an older generation never match
+        self._generation = 0
+        self._swap_lock = threading.Lock()
+        # Serializes syncs; name -> {"sha256", "size", "mtime_ns", "nodes"} of indexed files
+        self._update_lock = threading.Lock()
+        self._manifest: Dict[str, Dict[str, Any]] = {}
+        # Repeated prompts skip retrieval; similar ones too when a threshold is set
+        self.cache = RetrievalCache(
+            max_entries=cache_size,
+            ttl_seconds=cache_ttl,
+            similarity_threshold=semantic_cache_threshold
+        )
+
+        # Use shared clients instead of overwriting the global Settings,
+        # so domains can be built concurrently
+        self.embed_model = self.registry.get_embed_model(llm_type, embedding_model)
+        self.llm = self.registry.get_llm(llm_type, llm_model)
+        # Shared with other domains by DomainKnowledgeBaseManager so repeated chunks are embedded once
+        self.ingestion = ingestion or IngestionPipeline(self.embed_model, process_workers=0)
 
         # Initialize the knowledge base
         self._initialize()
 
     def _initialize(self) -> None:
-        """Initialize the vector database with documents."""
+        """Initialize the vector database, then bring it up to date with the documents."""
         try:
-            # Configure settings
-            Settings.embed_model = OllamaEmbedding(model_name=self.embedding_model)
-            Settings.llm = Ollama(model=self.llm_model)
-            Settings.node_parser = SentenceSplitter(chunk_size=1024)
-
             # Check if documents directory exists
             if not os.path.exists(self.documents_dir):
                 print(f"Warning: Documents directory {self.documents_dir} does not exist.")
                 # Create an empty index
-                self.index = VectorStoreIndex([])
-                return
-
-            # Load documents
-            documents = SimpleDirectoryReader(self.documents_dir).load_data()
-
-            if not documents:
-                print(f"Warning: No documents found in {self.documents_dir}")
-                # Create an empty index
-                self.index = VectorStoreIndex([])
+                self._swap_index(self._new_index([]))
                 return
 
-            print(f"Loaded {len(documents)} documents for domain: {self.domain_name}")
-
-            # Create index
-            self.index = VectorStoreIndex.from_documents(documents)
+            # Start from the persisted index if it was built with the same settings,
+            # so only files added, changed or removed since are processed
+            index, manifest = self._load_persisted_index()
+            if index is not None:
+                print(f"Loaded persisted index for domain: {self.domain_name}")
+            else:
+                index, manifest = self._new_index([]), {}
+            self._manifest = manifest
+            self._swap_index(index)
+            self.sync()
 
         except Exception as e:
             print(f"Error initializing knowledge base for {self.domain_name}: {e}")
             # Create an empty index as fallback
-            self.index = VectorStoreIndex([])
+            self._manifest = {}
+            self._swap_index(self._new_index([]))
+
+    def _vector_store_options(self) -> Dict[str, Any]:
+        return {"dtype": self.vector_dtype, "ann_threshold": self.ann_threshold}
+
+    def _new_index(self, nodes: List[Any]) -> VectorStoreIndex:
+        """Build an index over embedded nodes in the configured vector store."""
+        if self.vector_store == "numpy":
+            storage_context = StorageContext.from_defaults(
+                vector_store=NumpyVectorStore(**self._vector_store_options())
+            )
+            return VectorStoreIndex(nodes, storage_context=storage_context, embed_model=self.embed_model)
+        return VectorStoreIndex(nodes, embed_model=self.embed_model)
+
+    def _swap_index(self, index: VectorStoreIndex) -> None:
+        """Make a new index snapshot current; queries already running keep the old one."""
+        with self._swap_lock:
+            self.index = index
+            self._generation += 1
+            # Cached retriever, query engine and results belong to the previous index
+            self._retrievers = {}
+            self._query_engine = None
+        self.cache.invalidate()
+
+    def _source_files(self) -> List[str]:
+        """List the document files to ingest, skipping hidden ones like .gitkeep."""
+        return sorted(
+            name for name in os.listdir(self.documents_dir)
+            if not name.startswith(".")
+            and os.path.isfile(os.path.join(self.documents_dir, name))
+        )
+
+    def _hash_file(self, name: str) -> str:
+        digest = hashlib.sha256()
+        with open(os.path.join(self.documents_dir, name), "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        return digest.hexdigest()
 
-    def enhance_prompt(self, prompt: str, domain: str) -> str:
+    def _settings_key(self) -> str:
+        """Hash the settings that decide how files are chunked, embedded and stored."""
+        # The dtype only decides how the numpy store keeps its matrix
+        store = f"{self.vector_store}|{self.vector_dtype}" if self.vector_store == "numpy" else self.vector_store
+        return hashlib.sha256(
+            f"{INGESTION_VERSION}|{self.llm_type}|{self.embedding_model}|{self.chunk_size}|{store}".encode("utf-8")
+        ).hexdigest()
+
+    def _manifest_path(self) -> str:
+        return os.path.join(self.persist_dir, "manifest.json")
+
+    def sync(self) -> Dict[str, List[str]]:
         """
-        Enhance a prompt with relevant knowledge from the knowledge base.
-        
-        Args:
-            prompt (str): The original prompt
-            domain (str): The domain of expertise
-            
+        Apply document files added, changed or removed since the last sync.
+
+        Only changed files are re-chunked and re-embedded. The result is built as a
+        new index snapshot and swapped in, so running queries are never affected.
+
         Returns:
-            str: The enhanced prompt with relevant context
+            Dict[str, List[str]]: The file names "added", "updated" and "removed"
         """
+        with self._update_lock:
+            files = self._source_files() if os.path.isdir(self.documents_dir) else []
+            added, updated, touched = [], [], False
+            stats = {}
+            for name in files:
+                stat = os.stat(os.path.join(self.documents_dir, name))
+                stats[name] = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+                entry = self._manifest.get(name)
+                if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+                    continue
+                stats[name]["sha256"] = self._hash_file(name)
+                if entry and entry["sha256"] == stats[name]["sha256"]:
+                    # Touched but unchanged
+                    entry.update(stats[name])
+                    touched = True
+                    continue
+                (updated if entry else added).append(name)
+            removed = [name for name in self._manifest if name not in stats]
+            changes = {"added": added, "updated": updated, "removed": removed}
+
+            if not (added or updated or removed):
+                if touched:
+                    self._persist_index()
+                return changes
+
+            # Copy-on-write: the unchanged chunks keep their vectors, only new files are embedded
+            kept_ids = [
+                node_id for name, entry in self._manifest.items()
+                if name not in updated + removed for node_id in entry["nodes"]
+            ]
+            kept = self.index.docstore.get_nodes(kept_ids) if kept_ids else []
+            for node in kept:
+                node.embedding = self.index.vector_store.get(node.node_id)
+
+            new_nodes = self.ingestion.run(
+                [os.path.join(self.documents_dir, name) for name in added + updated],
+                chunk_size=self.chunk_size
+            )
+            manifest = {name: entry for name, entry in self._manifest.items() if name not in updated + removed}
+            for name in added + updated:
+                manifest[name] = dict(stats[name], nodes=[])
+            for node in new_nodes:
+                manifest[node.metadata["file_name"]]["nodes"].append(node.node_id)
+
+            index = self._new_index(kept + new_nodes)
+            self._manifest = manifest
+            self._swap_index(index)
+            self._persist_index()
+            print(
+                f"Synced documents for domain {self.domain_name}: "
+                f"{len(added)} added, {len(updated)} updated, {len(removed)} removed"
+            )
+            return changes
+
+    def _load_persisted_index(self) -> Tuple[Optional[VectorStoreIndex], Dict[str, Any]]:
+        """Load the persisted index and its file manifest if they were built with the current settings."""
+        if not self.persist_dir or not os.path.exists(self._manifest_path()):
+            return None, {}
+        try:
+            with open(self._manifest_path(), "r", encoding="utf-8") as f:
+                stored = json.load(f)
+            if stored.get("settings") != self._settings_key():
+                return None, {}
+            if self.vector_store == "numpy":
+                # Memory-mapped, so processes loading the same index share the embeddings
+                storage_context = StorageContext.from_defaults(
+                    persist_dir=self.persist_dir,
+                    vector_store=NumpyVectorStore.from_persist_dir(self.persist_dir, **self._vector_store_options())
+                )
+            else:
+                storage_context = StorageContext.from_defaults(persist_dir=self.persist_dir)
+            index = load_index_from_storage(storage_context, embed_model=self.embed_model)
+            return index, stored["files"]
+        except Exception as e:
+            print(f"Error loading persisted index for {self.domain_name}: {e}")
+            return None, {}
+
+    def _persist_index(self) -> None:
+        """Persist the index and the manifest of files it was built from."""
+        if not self.persist_dir:
+            return
         try:
-            # Query the knowledge base for relevant information
-            context = self.query(prompt)
-            
-            # Combine the original prompt with retrieved context
-            enhanced_prompt = f"""Use the following domain knowledge to inform your response:
-{context}
-
-Original prompt:
-{prompt}"""
-            
-            return enhanced_prompt
+            os.makedirs(self.persist_dir, exist_ok=True)
+            self.index.storage_context.persist(persist_dir=self.persist_dir)
+            # Written last so an interrupted persist is never mistaken for a valid one
+            with open(self._manifest_path(), "w", encoding="utf-8") as f:
+                json.dump({
+                    "settings": self._settings_key(),
+                    "embedding_model": self.embedding_model,
+                    "chunk_size": self.chunk_size,
+                    "files": self._manifest
+                }, f, indent=2)
         except Exception as e:
-            print(f"Error enhancing prompt: {e}")
-            return prompt  # Return original prompt if enhancement fails
-            
-    def query(self, query_text: str, max_tokens: int = 1024) -> str:
+            print(f"Error persisting index for {self.domain_name}: {e}")
+
+    async def aquery(self, query_text: str, max_tokens: Optional[int] = None) -> str:
+        """Query the knowledge base without blocking the event loop."""
+        return await asyncio.to_thread(self.query, query_text, max_tokens)
+
+    def _get_retriever(self, top_k: Optional[int] = None):
+        """Get the cached retriever for the current index snapshot, building it on first use."""
+        top_k = top_k or self.similarity_top_k
+        with self._swap_lock:
+            if top_k not in self._retrievers:
+                self._retrievers[top_k] = self.index.as_retriever(similarity_top_k=top_k)
+            return self._retrievers[top_k]
+
+    def _get_query_engine(self):
+        """Get the cached summarizing query engine for the current index snapshot."""
+        with self._swap_lock:
+            if self._query_engine is None:
+                postprocessors = []
+                if self.similarity_cutoff is not None:
+                    postprocessors.append(SimilarityPostprocessor(similarity_cutoff=self.similarity_cutoff))
+                self._query_engine = self.index.as_query_engine(
+                    response_mode="tree_summarize",
+                    similarity_top_k=self.similarity_top_k,
+                    node_postprocessors=postprocessors,
+                    llm=self.llm
+                )
+            return self._query_engine
+
+    def retrieve(self, query: Union[str, QueryBundle], top_k: Optional[int] = None) -> List[NodeWithScore]:
+        """Retrieve the top-k chunks for a query, dropping those below the similarity cutoff."""
+        if not self.index:
+            return []
+        nodes = self._get_retriever(top_k).retrieve(query)
+        if self.similarity_cutoff is not None:
+            nodes = [n for n in nodes if n.score is not None and n.score >= self.similarity_cutoff]
+        return nodes
+
+    def search(self, query: Union[str, QueryBundle], top_k: Optional[int] = None) -> List[Dict[str, Any]]:
+        """
+        Retrieve raw chunks with their source, without formatting or summarizing them.
+
+        Args:
+            query (Union[str, QueryBundle]): The query, optionally with its embedding already set
+            top_k (int, optional): Chunks to return; defaults to similarity_top_k
+
+        Returns:
+            List[Dict[str, Any]]: Best first, each with the domain, text, similarity score,
+                source file, page and node id
+        """
+        with span("retrieval", domain=self.domain_name):
+            nodes = self.retrieve(query, top_k)
+        return [
+            {
+                "domain": self.domain_name,
+                "text": node.node.get_content(),
+                "score": node.score,
+                "file_name": node.node.metadata.get("file_name"),
+                "page_label": node.node.metadata.get("page_label"),
+                "node_id": node.node.node_id
+            }
+            for node in nodes
+        ]
+
+    def _format_chunks(self, nodes: List[NodeWithScore], max_tokens: int) -> str:
+        """Join retrieved chunks, best first, until the token budget is spent."""
+        parts = []
+        remaining = max_tokens
+        for node in nodes:
+            text = node.node.get_content().strip()
+            if not text:
+                continue
+            tokens = count_tokens(text)
+            if tokens > remaining:
+                marker = " [truncated]"
+                text = truncate_to_tokens(text, remaining - count_tokens(marker))
+                if text:
+                    parts.append(text + marker)
+                break
+            parts.append(text)
+            remaining -= tokens
+        return "\n\n".join(parts)
+
+    def query(self, query_text: str, max_tokens: Optional[int] = None) -> str:
         """Query the knowledge base for information relevant to the query."""
         try:
             if not self.index:
                 return f"[No knowledge base available for {self.domain_name}]"
 
-            query_engine = self.index.as_query_engine(response_mode="tree_summarize",)
-            response = query_engine.query(query_text)
+            max_tokens = max_tokens or self.context_token_budget
+            # Results depend on the index snapshot, mode and budget as well as the query text
+            scope = f"{self._generation}:{self.retrieval_mode}:{max_tokens}"
+
+            with span("retrieval", domain=self.domain_name) as info:
+                cached = self.cache.get(query_text, scope)
+                if cached is not None:
+                    info["cache"] = "hit"
+                    return cached
 
-            # Limit response length
-            response_text = str(response)
-            if len(response_text) > max_tokens:
-                response_text = response_text[:max_tokens] + " [truncated]"
+                # The query embedding serves both the semantic lookup and retrieval
+                query = QueryBundle(query_text)
+                if self.cache.semantic:
+                    query.embedding = self.embed_model.get_query_embedding(query_text)
+                    cached = self.cache.get_similar(query.embedding, scope)
+                    if cached is not None:
+                        info["cache"] = "semantic_hit"
+                        return cached
 
-            return response_text
+                info["cache"] = "miss"
+                response_text = self._run_query(query, max_tokens)
+                self.cache.put(query_text, response_text, embedding=query.embedding, scope=scope)
+                return response_text
         except Exception as e:
             print(f"Error querying knowledge base: {e}")
             return f"[Error retrieving information: {e}]"
 
-    def add_document(self, content: str, doc_id: str) -> bool:
-        """Add a new document to the knowledge base."""
+    def _run_query(self, query: QueryBundle, max_tokens: int) -> str:
+        """Run retrieval (and summarization in summarize mode) without the cache."""
+        # Default hot path: raw chunks, no LLM call
+        if self.retrieval_mode == "retrieve":
+            nodes = self.retrieve(query)
+            if not nodes:
+                return f"[No relevant information found in {self.domain_name}]"
+            return self._format_chunks(nodes, max_tokens)
+
+        with span("tree_summarize", domain=self.domain_name):
+            response = self._get_query_engine().query(query)
+
+        # Limit response length
+        response_text = str(response)
+        if count_tokens(response_text) > max_tokens:
+            response_text = truncate_to_tokens(response_text, max_tokens) + " [truncated]"
+
+        return response_text
+
+    def add_document(self, content: Union[str, bytes], doc_id: str) -> bool:
+        """
+        Add a document to the knowledge base, or replace the one with the same name.
+
+        The document is saved in the domain directory, so it survives restarts,
+        and then indexed without rebuilding the rest of the index.
+
+        Args:
+            content (Union[str, bytes]): The document text or file contents (e.g. a PDF)
+            doc_id (str): The file name to store the document under
+
+        Returns:
+            bool: True if the document was indexed. A document no text could be
+                read from (e.g. a corrupt PDF) is not kept, and the one it would
+                have replaced is restored
+        """
         try:
-            # Not implementing for this simple version
+            name = os.path.basename(doc_id)
+            if not name or name.startswith("."):
+                raise ValueError(f"Invalid document name: {doc_id!r}")
+            os.makedirs(self.documents_dir, exist_ok=True)
+            data = content.encode("utf-8") if isinstance(content, str) else content
+            # Written under a temporary name so a sync never indexes a partial file
+            path = os.path.join(self.documents_dir, name)
+            tmp_path = os.path.join(self.documents_dir, f".{name}.tmp")
+            backup_path = os.path.join(self.documents_dir, f".{name}.previous")
+            replaced = os.path.isfile(path)
+            if replaced:
+                shutil.copy2(path, backup_path)
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            try:
+                self.sync()
+                with self._update_lock:
+                    indexed = bool(self._manifest.get(name, {}).get("nodes"))
+            except Exception as e:
+                print(f"Error indexing {name}: {e}")
+                indexed = False
+            if indexed:
+                if replaced:
+                    os.remove(backup_path)
+                return True
+
+            print(f"No text could be read from {name}; it was not added")
+            if replaced:
+                os.replace(backup_path, path)
+            else:
+                os.remove(path)
+            self.sync()
             return False
         except Exception as e:
             print(f"Error adding document: {e}")
             return False
 
+    def remove_document(self, doc_id: str) -> bool:
+        """Delete a document from the domain directory and drop its chunks from the index."""
+        try:
+            path = os.path.join(self.documents_dir, os.path.basename(doc_id))
+            if not os.path.isfile(path):
+                return False
+            os.remove(path)
+            self.sync()
+            return True
+        except Exception as e:
+            print(f"Error removing document: {e}")
+            return False
+
+    def list_documents(self) -> List[Dict[str, Any]]:
+        """List the indexed documents with their size and number of chunks."""
+        with self._update_lock:
+            return [
+                {"name": name, "size": entry["size"], "sha256": entry["sha256"], "chunks": len(entry["nodes"])}
+                for name, entry in sorted(self._manifest.items())
+            ]
+
+
+def _min_max(scores: List[Optional[float]]) -> List[float]:
+    """Rescale one domain's scores to [0, 1]; raw similarities differ in range between corpora."""
+    values = [score or 0.0 for score in scores]
+    if not values:
+        return []
+    low, high = min(values), max(values)
+    if high == low:
+        return [1.0] * len(values)
+    return [(value - low) / (high - low) for value in values]
+
 
 class DomainKnowledgeBaseManager:
     """Manager for multiple domain-specific knowledge bases"""
 
-    def __init__(self, base_dir: str = "knowledge_base/domains", embedding_model: str = "nomic-embed-text:latest"):
+    def __init__(
+        self,
+        base_dir: str = "knowledge_base/domains",
+        embedding_model: str = "nomic-embed-text:latest",
+        storage_dir: Optional[str] = "knowledge_base/storage",
+        lazy: bool = False,
+        llm_type: str = "ollama",
+        registry: Optional[LLMRegistry] = None,
+        knowledge_base_options: Optional[Dict[str, Any]] = None,
+        ingestion_options: Optional[Dict[str, Any]] = None
+    ):
         self.base_dir = base_dir
         self.embedding_model = embedding_model
-        self.knowledge_bases = {}
+        self.storage_dir = storage_dir
+        self.llm_type = llm_type
+        self.registry = registry or default_registry
+        # Extra KnowledgeBase arguments (retrieval mode, top-k, ...) applied to every domain
+        self.knowledge_base_options = knowledge_base_options or {}
+        # One pipeline for every domain: identical chunks are embedded once and
+        # documents are split in a shared process pool (batch size, concurrency, workers)
+        self.ingestion = IngestionPipeline(
+            self.registry.get_embed_model(llm_type, embedding_model),
+            **(ingestion_options or {})
+        )
+        self.knowledge_bases: Dict[str, KnowledgeBase] = {}
+        self.domains: List[str] = []
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+        self._warm_up_executor: Optional[ThreadPoolExecutor] = None
+        self._search_executor: Optional[ThreadPoolExecutor] = None
+        self._watcher: Optional[threading.Thread] = None
+        self._stop_watching = threading.Event()
+
+        self.refresh_domains()
+
+        # Build every domain up front unless they should load on first use
+        if not lazy:
+            self._initialize_domains()
 
-        # Initialize knowledge bases for each domain
-        self._initialize_domains()
+    def refresh_domains(self) -> List[str]:
+        """Discover domains from the subdirectories of base_dir."""
+        os.makedirs(self.base_dir, exist_ok=True)
+        self.domains = sorted(
+            name for name in os.listdir(self.base_dir)
+            if not name.startswith(".")
+            and os.path.isdir(os.path.join(self.base_dir, name))
+        )
+        return self.domains
 
     def _initialize_domains(self) -> None:
         """Initialize knowledge bases for all domains."""
-        # Define our domains
-        domains = ["ai", "data_science", "ml", "data_analytics", "programming", "ui_ux"]
+        for domain in self.domains:
+            self.get_knowledge_base(domain)
 
-        for domain in domains:
-            domain_dir = os.path.join(self.base_dir, domain)
+    def _domain_lock(self, domain: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(domain, threading.Lock())
 
-            # Create directory if it doesn't exist
-            if not os.path.exists(domain_dir):
-                os.makedirs(domain_dir, exist_ok=True)
+    def _build_knowledge_base(self, domain: str) -> KnowledgeBase:
+        """Build (or load from storage) the knowledge base for one domain."""
+        kb = KnowledgeBase(
+            domain_name=domain,
+            documents_dir=os.path.join(self.base_dir, domain),
+            embedding_model=self.embedding_model,
+            persist_dir=os.path.join(self.storage_dir, domain) if self.storage_dir else None,
+            llm_type=self.llm_type,
+            registry=self.registry,
+            ingestion=self.ingestion,
+            **self.knowledge_base_options
+        )
+        print(f"Initialized knowledge base for {domain}")
+        return kb
 
-            # Initialize knowledge base for this domain
-            self.knowledge_bases[domain] = KnowledgeBase(
-                domain_name=domain,
-                documents_dir=domain_dir,
-                embedding_model=self.embedding_model
-            )
+    def warm_up(self, max_workers: Optional[int] = None, background: bool = True) -> Dict[str, Future]:
+        """
+        Build all discovered domains concurrently on a thread pool.
+
+        Args:
+            max_workers (int, optional): Number of domains to build at once
+            background (bool): Return immediately instead of waiting for the builds
 
-            print(f"Initialized knowledge base for {domain}")
+        Returns:
+            Dict[str, Future]: The pending build for each domain
+        """
+        if self._warm_up_executor is None:
+            self._warm_up_executor = ThreadPoolExecutor(
+                max_workers=max_workers or max(1, len(self.domains)),
+                thread_name_prefix="kb-warm-up"
+            )
+        futures = {
+            domain: self._warm_up_executor.submit(self.get_knowledge_base, domain)
+            for domain in self.domains
+        }
+        if not background:
+            wait(futures.values())
+        return futures
 
     def get_knowledge_base(self, domain: str) -> Optional[KnowledgeBase]:
-        """Get the knowledge base for a specific domain."""
-        return self.knowledge_bases.get(domain)
+        """Get the knowledge base for a specific domain, building it on first use."""
+        kb = self.knowledge_bases.get(domain)
+        if kb is not None:
+            return kb
+
+        if domain not in self.domains and domain not in self.refresh_domains():
+            return None
+
+        # Only one thread builds a given domain; others wait for its result
+        with self._domain_lock(domain):
+            kb = self.knowledge_bases.get(domain)
+            if kb is None:
+                kb = self._build_knowledge_base(domain)
+                self.knowledge_bases[domain] = kb
+        return kb
+
+    def sync_all(self) -> Dict[str, Dict[str, List[str]]]:
+        """
+        Apply document changes on disk to every loaded domain and discover new domains.
+
+        Returns:
+            Dict[str, Dict[str, List[str]]]: The files added, updated and removed per domain
+                that changed
+        """
+        self.refresh_domains()
+        results = {}
+        for domain, kb in list(self.knowledge_bases.items()):
+            try:
+                changes = kb.sync()
+            except Exception as e:
+                print(f"Error syncing documents for domain {domain}: {e}")
+                continue
+            if any(changes.values()):
+                results[domain] = changes
+        return results
+
+    def start_watching(self, interval: float = 5.0) -> None:
+        """
+        Poll the domain directories in the background and apply document changes.
+
+        Args:
+            interval (float): Seconds between polls; unchanged files are only stat-ed
+        """
+        if self._watcher is not None:
+            return
+        self._stop_watching.clear()
+
+        def watch() -> None:
+            while not self._stop_watching.wait(interval):
+                self.sync_all()
+
+        self._watcher = threading.Thread(target=watch, name="kb-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watching(self) -> None:
+        """Stop the background directory watcher."""
+        if self._watcher is None:
+            return
+        self._stop_watching.set()
+        self._watcher.join()
+        self._watcher = None
+
+    def get_cache_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get retrieval cache statistics for every loaded domain."""
+        return {domain: kb.cache.get_stats() for domain, kb in list(self.knowledge_bases.items())}
 
     def query_domain(self, domain: str, query_text: str) -> str:
         """Query a specific domain knowledge base."""
@@ -159,9 +672,90 @@ class DomainKnowledgeBaseManager:
         return kb.query(query_text)
 
     def query_all_domains(self, query_text: str) -> Dict[str, str]:
-        """Query all domain knowledge bases and return combined results."""
-        results = {}
-        for domain, kb in self.knowledge_bases.items():
-            results[domain] = kb.query(query_text)
+        """Query all domain knowledge bases concurrently and return combined results."""
+        executor = self._get_search_executor()
+        futures = {
+            domain: executor.submit(copy_context().run, self.query_domain, domain, query_text)
+            for domain in self.domains
+        }
+        return {domain: future.result() for domain, future in futures.items()}
+
+    def _get_search_executor(self) -> ThreadPoolExecutor:
+        with self._locks_guard:
+            if self._search_executor is None:
+                self._search_executor = ThreadPoolExecutor(
+                    max_workers=max(4, len(self.domains)),
+                    thread_name_prefix="kb-search"
+                )
+            return self._search_executor
+
+    def _search_domain(self, domain: str, query: QueryBundle, top_k: int) -> List[Dict[str, Any]]:
+        try:
+            kb = self.get_knowledge_base(domain)
+            return kb.search(query, top_k) if kb else []
+        except Exception as e:
+            print(f"Error searching domain {domain}: {e}")
+            return []
+
+    def federated_search(
+        self,
+        query_text: str,
+        domains: Optional[List[str]] = None,
+        top_k: int = 10,
+        per_domain_k: Optional[int] = None,
+        max_per_domain: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Retrieve evidence from several domains at once as one ranked list of raw chunks.
+
+        The query is embedded once and every domain is searched concurrently. Each
+        domain's scores are min-max normalized before merging, and no domain
+        contributes more than its quota.
+
+        Args:
+            query_text (str): The query
+            domains (List[str], optional): Domains to search; defaults to all of them
+            top_k (int): Chunks in the merged list
+            per_domain_k (int, optional): Chunks retrieved from each domain; defaults to top_k
+            max_per_domain (int, optional): Quota per domain in the merged list; defaults to
+                an even share of top_k, rounded up
+
+        Returns:
+            List[Dict[str, Any]]: Chunks as returned by KnowledgeBase.search, best first,
+                each with the "normalized_score" it was ranked by
+        """
+        if domains is None:
+            domains = self.domains
+        else:
+            known = set(self.refresh_domains())
+            domains = [domain for domain in dict.fromkeys(domains) if domain in known]
+        if not domains or top_k <= 0:
+            return []
+        quota = max_per_domain or -(-top_k // len(domains))
+
+        with span("federated_retrieval"):
+            # Every domain is embedded with the pipeline's model, so one query embedding serves all
+            query = QueryBundle(query_text)
+            query.embedding = self.ingestion.embed_model.get_query_embedding(query_text)
+            executor = self._get_search_executor()
+            futures = [
+                executor.submit(copy_context().run, self._search_domain, domain, query, per_domain_k or top_k)
+                for domain in domains
+            ]
+            candidates = []
+            for future in futures:
+                results = future.result()
+                for result, normalized in zip(results, _min_max([r["score"] for r in results])):
+                    candidates.append(dict(result, normalized_score=normalized))
 
-        return results
\ No newline at end of file
+        # Raw scores break ties, e.g. between the best chunks of each domain
+        candidates.sort(key=lambda r: (r["normalized_score"], r["score"] or 0.0), reverse=True)
+        merged: List[Dict[str, Any]] = []
+        taken: Dict[str, int] = {}
+        for result in candidates:
+            if taken.get(result["domain"], 0) < quota:
+                taken[result["domain"]] = taken.get(result["domain"], 0) + 1
+                merged.append(result)
+                if len(merged) == top_k:
+                    break
+        return merged
@@ -0,0 +1,283 @@
+import json
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from llama_index.core.bridge.pydantic import Field, PrivateAttr
+from llama_index.core.schema import BaseNode
+from llama_index.core.vector_stores.types import (
+    BasePydanticVectorStore,
+    VectorStoreQuery,
+    VectorStoreQueryMode,
+    VectorStoreQueryResult,
+)
+
+# Same file name StorageContext.persist gives the default vector store; the
+# embedding matrix is written next to it as a .npy file
+DEFAULT_PERSIST_FNAME = "default__vector_store.json"
+
+# Rows scored per block when the matrix is float16, which numpy multiplies slowly
+_SCORE_BLOCK_ROWS = 8192
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """Scale rows to unit length so a dot product is their cosine similarity."""
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return np.divide(vectors, norms, out=np.zeros_like(vectors), where=norms > 0)
+
+
+def _matrix_path(persist_path: str) -> str:
+    return os.path.splitext(persist_path)[0] + ".npy"
+
+
+def _scores(matrix: np.ndarray, query: np.ndarray, rows: Optional[np.ndarray] = None) -> np.ndarray:
+    """Cosine similarity of the query to every row (or the given rows) of the matrix."""
+    if rows is not None:
+        return matrix[rows].astype(np.float32, copy=False) @ query
+    if matrix.dtype == np.float32:
+        return matrix @ query
+    return np.concatenate([
+        matrix[start:start + _SCORE_BLOCK_ROWS].astype(np.float32) @ query
+        for start in range(0, len(matrix), _SCORE_BLOCK_ROWS)
+    ])
+
+
+def _top_k(scores: np.ndarray, k: int) -> np.ndarray:
+    """Positions of the k highest scores, best first."""
+    if k < len(scores):
+        top = np.argpartition(-scores, k - 1)[:k]
+    else:
+        top = np.arange(len(scores))
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+class _InvertedFileIndex:
+    """Approximate search: rows are clustered around k-means centroids and a query
+    only scores the rows of its nearest clusters."""
+
+    def __init__(self, matrix: np.ndarray, seed: int = 0, iterations: int = 10):
+        count = len(matrix)
+        n_lists = max(1, int(np.sqrt(count)))
+        rng = np.random.default_rng(seed)
+        # Centroids are trained on a sample; every row is then assigned to one
+        sample = matrix[np.sort(rng.choice(count, size=min(count, n_lists * 64), replace=False))]
+        sample = sample.astype(np.float32, copy=False)
+        centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)]
+        for _ in range(iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            for i in range(n_lists):
+                members = sample[assignment == i]
+                if len(members):
+                    centroids[i] = members.sum(axis=0)
+            centroids = _normalize(centroids)
+        self.centroids = centroids
+
+        assignment = np.concatenate([
+            np.argmax(matrix[start:start + _SCORE_BLOCK_ROWS].astype(np.float32) @ centroids.T, axis=1)
+            for start in range(0, count, _SCORE_BLOCK_ROWS)
+        ])
+        order = np.argsort(assignment, kind="stable")
+        bounds = np.searchsorted(assignment[order], np.arange(n_lists + 1))
+        self.lists = [order[bounds[i]:bounds[i + 1]] for i in range(n_lists)]
+
+    def candidates(self, query: np.ndarray, n_probe: int) -> np.ndarray:
+        """Rows in the n_probe clusters closest to the query."""
+        nearest = _top_k(self.centroids @ query, min(n_probe, len(self.lists)))
+        return np.sort(np.concatenate([self.lists[i] for i in nearest]))
+
+
+class NumpyVectorStore(BasePydanticVectorStore):
+    """Vector store keeping every embedding in one contiguous numpy matrix.
+
+    Rows are unit-normalized, so top-k cosine similarity is a single matrix
+    product. The matrix is persisted as a .npy file and loaded memory-mapped,
+    so worker processes serving the same index share its pages instead of each
+    holding a copy. Above `ann_threshold` rows, queries use an inverted file
+    index and only score the rows of the clusters nearest the query.
+
+    Texts stay in the docstore; this store only holds vectors and node ids.
+    """
+
+    stores_text: bool = False
+    dtype: str = Field(default="float32", description="Storage type of the embeddings: float32 or float16.")
+    ann_threshold: Optional[int] = Field(
+        default=None, description="Rows from which queries are approximate; None always searches exactly."
+    )
+    n_probe: int = Field(default=8, description="Clusters scored per approximate query.")
+
+    _lock: threading.Lock = PrivateAttr()
+    _matrix: np.ndarray = PrivateAttr()
+    _pending: List[np.ndarray] = PrivateAttr()
+    _ids: List[str] = PrivateAttr()
+    _ref_doc_ids: List[str] = PrivateAttr()
+    _rows: Dict[str, int] = PrivateAttr()
+    _ann: Optional[_InvertedFileIndex] = PrivateAttr()
+
+    def __init__(
+        self,
+        matrix: Optional[np.ndarray] = None,
+        ids: Optional[List[str]] = None,
+        ref_doc_ids: Optional[List[str]] = None,
+        **kwargs: Any
+    ):
+        super().__init__(**kwargs)
+        if self.dtype not in ("float32", "float16"):
+            raise ValueError(f"Unsupported embedding dtype: {self.dtype}")
+        self._lock = threading.Lock()
+        self._matrix = matrix if matrix is not None else np.zeros((0, 0), dtype=self.dtype)
+        self._pending = []
+        self._ids = list(ids or [])
+        self._ref_doc_ids = list(ref_doc_ids or [None] * len(self._ids))
+        self._rows = {node_id: row for row, node_id in enumerate(self._ids)}
+        self._ann = None
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "NumpyVectorStore"
+
+    @property
+    def client(self) -> Any:
+        return None
+
+    def _fold_pending(self) -> None:
+        """Append rows added since the last query to the matrix. Call with the lock held."""
+        if self._pending:
+            parts = [self._matrix] if len(self._matrix) else []
+            self._matrix = np.concatenate(parts + self._pending)
+            self._pending = []
+
+    def _snapshot(self) -> Tuple[np.ndarray, List[str], Optional[_InvertedFileIndex]]:
+        """Get the current matrix and ids, building the approximate index if due."""
+        with self._lock:
+            self._fold_pending()
+            if self._ann is None and self.ann_threshold is not None and len(self._ids) >= self.ann_threshold:
+                self._ann = _InvertedFileIndex(self._matrix)
+            return self._matrix, self._ids, self._ann
+
+    def add(self, nodes: List[BaseNode], **add_kwargs: Any) -> List[str]:
+        """Add nodes' embeddings as new rows."""
+        if not nodes:
+            return []
+        vectors = _normalize(np.asarray([node.get_embedding() for node in nodes], dtype=np.float32))
+        with self._lock:
+            # Copied rather than appended to, so a snapshot held by a query never changes
+            self._ids = self._ids + [node.node_id for node in nodes]
+            self._ref_doc_ids = self._ref_doc_ids + [node.ref_doc_id for node in nodes]
+            self._rows = {node_id: row for row, node_id in enumerate(self._ids)}
+            self._pending.append(vectors.astype(self.dtype))
+            self._ann = None
+        return [node.node_id for node in nodes]
+
+    def delete(self, ref_doc_id: str, **delete_kwargs: Any) -> None:
+        """Drop the rows of every node from a document."""
+        with self._lock:
+            self._fold_pending()
+            keep = [row for row, doc_id in enumerate(self._ref_doc_ids) if doc_id != ref_doc_id]
+            if len(keep) == len(self._ids):
+                return
+            self._matrix = np.ascontiguousarray(self._matrix[keep])
+            self._ids = [self._ids[row] for row in keep]
+            self._ref_doc_ids = [self._ref_doc_ids[row] for row in keep]
+            self._rows = {node_id: row for row, node_id in enumerate(self._ids)}
+            self._ann = None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._matrix = np.zeros((0, 0), dtype=self.dtype)
+            self._pending = []
+            self._ids, self._ref_doc_ids, self._rows = [], [], {}
+            self._ann = None
+
+    def get(self, text_id: str) -> List[float]:
+        """Get a node's (normalized) embedding."""
+        matrix, _, _ = self._snapshot()
+        return matrix[self._rows[text_id]].astype(np.float32).tolist()
+
+    def query(self, query: VectorStoreQuery, **kwargs: Any) -> VectorStoreQueryResult:
+        """Get the nodes most similar to the query embedding."""
+        if query.mode != VectorStoreQueryMode.DEFAULT:
+            raise ValueError(f"Unsupported query mode for NumpyVectorStore: {query.mode}")
+        if query.filters is not None:
+            raise ValueError("Metadata filters are not supported by NumpyVectorStore")
+
+        matrix, ids, ann = self._snapshot()
+        if not ids or not query.similarity_top_k or query.query_embedding is None:
+            return VectorStoreQueryResult(similarities=[], ids=[])
+        vector = _normalize(np.asarray(query.query_embedding, dtype=np.float32))
+
+        rows = None
+        if query.node_ids is not None:
+            rows = np.array(sorted(self._rows[i] for i in set(query.node_ids) if i in self._rows), dtype=np.int64)
+        elif ann is not None:
+            rows = ann.candidates(vector, self.n_probe)
+            if len(rows) < query.similarity_top_k:
+                rows = None
+        if rows is not None and not len(rows):
+            return VectorStoreQueryResult(similarities=[], ids=[])
+
+        scores = _scores(matrix, vector, rows)
+        top = _top_k(scores, query.similarity_top_k)
+        positions = rows[top] if rows is not None else top
+        return VectorStoreQueryResult(
+            similarities=scores[top].tolist(),
+            ids=[ids[row] for row in positions]
+        )
+
+    def persist(self, persist_path: str, fs: Any = None) -> None:
+        """
+        Write the matrix and its node ids, then memory-map the written matrix.
+
+        Both files are replaced atomically, so processes that mapped the previous
+        version keep reading it undisturbed. Only local paths are supported.
+
+        Args:
+            persist_path (str): Path of the JSON file with the node ids
+            fs: Unused; present for StorageContext compatibility
+        """
+        matrix, ids, _ = self._snapshot()
+        os.makedirs(os.path.dirname(persist_path) or ".", exist_ok=True)
+        matrix_path = _matrix_path(persist_path)
+        # np.save adds .npy to names without it
+        tmp_matrix_path = f"{matrix_path}.tmp.npy"
+        np.save(tmp_matrix_path, np.ascontiguousarray(matrix))
+        os.replace(tmp_matrix_path, matrix_path)
+        tmp_path = f"{persist_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"dtype": self.dtype, "ids": ids, "ref_doc_ids": self._ref_doc_ids[:len(ids)]}, f)
+        os.replace(tmp_path, persist_path)
+
+        if len(matrix):
+            mapped = np.load(matrix_path, mmap_mode="r")
+            with self._lock:
+                # Only swap in the mapped copy if nothing was added meanwhile
+                if self._matrix is matrix and not self._pending:
+                    self._matrix = mapped
+
+    @classmethod
+    def from_persist_path(cls, persist_path: str, mmap: bool = True, **kwargs: Any) -> "NumpyVectorStore":
+        """
+        Load a persisted store.
+
+        Args:
+            persist_path (str): Path of the JSON file written by persist
+            mmap (bool): Memory-map the matrix read-only instead of reading it into memory
+            **kwargs: Store options such as ann_threshold
+
+        Returns:
+            NumpyVectorStore: The loaded store
+        """
+        with open(persist_path, "r", encoding="utf-8") as f:
+            stored = json.load(f)
+        matrix = np.load(_matrix_path(persist_path), mmap_mode="r" if mmap else None)
+        if len(matrix) != len(stored["ids"]):
+            raise ValueError(f"Embedding matrix does not match the node ids in {persist_path}")
+        kwargs.setdefault("dtype", stored["dtype"])
+        if matrix.dtype != np.dtype(kwargs["dtype"]):
+            matrix = matrix.astype(kwargs["dtype"])
+        return cls(matrix=matrix, ids=stored["ids"], ref_doc_ids=stored["ref_doc_ids"], **kwargs)
+
+    @classmethod
+    def from_persist_dir(cls, persist_dir: str, mmap: bool = True, **kwargs: Any) -> "NumpyVectorStore":
+        """Load the store StorageContext.persist wrote into a directory."""
+        return cls.from_persist_path(os.path.join(persist_dir, DEFAULT_PERSIST_FNAME), mmap=mmap, **kwargs)
@@ -8,24 +8,38 @@ if (typeof debateId !== 'undefined') {
         loadingIndicator.style.display = show ? 'block' : 'none';
     }
 
+    // ETags of the last responses, so unchanged polls come back as 304
+    const etags = {};
+    // Number of log entries already rendered
+    let renderedLogLength = 0;
+
+    async function fetchIfChanged(url, key) {
+        const headers = etags[key] ? { 'If-None-Match': etags[key] } : {};
+        const response = await fetch(url, { headers, cache: 'no-store' });
+        if (response.status === 304) {
+            return null;
+        }
+        etags[key] = response.headers.get('ETag');
+        return await response.json();
+    }
+
     async function updateDebateStatus() {
         try {
-            const response = await fetch(`/api/debate/${debateId}/status`);
-            const data = await response.json();
-            
+            const data = await fetchIfChanged(`/api/debate/${debateId}/status`, 'status');
+            if (data === null) {
+                return;
+            }
+
             if (data.error) {
                 console.error('Error:', data.error);
                 return;
             }
 
-            document.getElementById('status').textContent = data.status;
-            document.getElementById('status').className = `debate-status status-${data.status}`;
+            updateStatusBadge(data.status);
 
-            // Show loading indicator while debate is in progress
-            updateLoadingState(data.status === 'in_progress');
-
-            // Stop polling if debate is completed or errored
-            if (data.status === 'completed' || data.status === 'error') {
+            // Stop polling once the debate has finished and its summary is written
+            const finished = data.status === 'completed' || data.status === 'error' || data.status === 'cancelled';
+            if (finished && !summaryPending(data.summary_status)) {
                 isPolling = false;
                 updateLoadingState(false);
                 await updateDebateLog();
@@ -35,103 +49,117 @@ if (typeof debateId !== 'undefined') {
         }
     }
 
+    function resetDebateLog() {
+        document.getElementById('debate-log').innerHTML = '';
+        renderedLogLength = 0;
+        delete etags.log;
+    }
+
+    function renderAnalysis(logContainer, data) {
+        let analysisDiv = logContainer.querySelector('.debate-analysis');
+        if (!analysisDiv) {
+            analysisDiv = document.createElement('div');
+            analysisDiv.className = 'debate-analysis';
+            logContainer.prepend(analysisDiv);
+        }
+        analysisDiv.innerHTML = `
+            <h3>Debate Information</h3>
+            <p><strong>Topic:</strong> ${data.debate_info.topic}</p>
+            <p><strong>Round:</strong> ${data.debate_info.current_round}/${data.debate_info.total_rounds}</p>
+            <p><strong>Participants:</strong> ${data.debate_info.participants.join(', ')}</p>
+            <p><strong>Interaction Score:</strong> ${data.debate_analysis.interaction_score}%</p>
+            <p><strong>Topic Adherence:</strong> ${data.debate_analysis.topic_adherence}%</p>
+        `;
+    }
+
+    function appendMessages(logContainer, entries) {
+        let messagesDiv = logContainer.querySelector('.debate-messages');
+        if (!messagesDiv) {
+            messagesDiv = document.createElement('div');
+            messagesDiv.className = 'debate-messages';
+            logContainer.appendChild(messagesDiv);
+        }
+        entries.forEach(entry => {
+            const messageDiv = document.createElement('div');
+            messageDiv.className = 'debate-message';
+
+            const agentDiv = document.createElement('div');
+            agentDiv.className = 'agent-name';
+            agentDiv.textContent = entry.agent;
+
+            const responseDiv = document.createElement('div');
+            responseDiv.className = 'agent-response';
+            responseDiv.textContent = entry.response;
+
+            messageDiv.appendChild(agentDiv);
+            messageDiv.appendChild(responseDiv);
+            messagesDiv.appendChild(messageDiv);
+        });
+    }
+
+    function summaryPending(summaryStatus) {
+        return summaryStatus === 'pending' || summaryStatus === 'in_progress';
+    }
+
+    function renderSummary(data) {
+        const summaryDiv = document.getElementById('debate-summary');
+        const summaryContent = document.getElementById('summary-content');
+
+        if (data.status === 'queued' || data.status === 'in_progress') {
+            summaryContent.innerHTML = `
+                <div class="summary-processing">
+                    Debate in progress... Summary will be available when completed.
+                </div>
+            `;
+            summaryDiv.style.display = 'block';
+        } else if (summaryPending(data.debate_content && data.debate_content.summary_status)) {
+            summaryContent.innerHTML = `
+                <div class="summary-processing">
+                    Debate completed. Generating the summary...
+                </div>
+            `;
+            summaryDiv.style.display = 'block';
+        } else if (data.debate_content && data.debate_content.summary) {
+            // The server renders and sanitizes the summary once, so it is inserted as is
+            summaryContent.innerHTML = `
+                <div class="summary-section markdown-content">
+                    <h3>Debate Summary</h3>
+                    <div class="summary-text">${data.debate_content.summary}</div>
+                </div>
+            `;
+            summaryDiv.style.display = 'block';
+        }
+    }
+
     async function updateDebateLog() {
         try {
-            const response = await fetch(`/api/debate/${debateId}/log`);
-            const data = await response.json();
-            
+            // Only entries after the ones already rendered are sent back
+            const data = await fetchIfChanged(
+                `/api/debate/${debateId}/log?since=${renderedLogLength}`, 'log'
+            );
+            if (data === null) {
+                return;
+            }
+
             if (data.error) {
                 console.error('Error:', data.error);
                 return;
             }
 
-            // Update debate info
             const logContainer = document.getElementById('debate-log');
-            logContainer.innerHTML = '';
 
             // Add debate analysis if available
             if (data.debate_info && data.debate_analysis) {
-                const analysisDiv = document.createElement('div');
-                analysisDiv.className = 'debate-analysis';
-                analysisDiv.innerHTML = `
-                    <h3>Debate Information</h3>
-                    <p><strong>Topic:</strong> ${data.debate_info.topic}</p>
-                    <p><strong>Round:</strong> ${data.debate_info.current_round}/${data.debate_info.total_rounds}</p>
-                    <p><strong>Participants:</strong> ${data.debate_info.participants.join(', ')}</p>
-                    <p><strong>Interaction Score:</strong> ${data.debate_analysis.interaction_score}%</p>
-                    <p><strong>Topic Adherence:</strong> ${data.debate_analysis.topic_adherence}%</p>
-                `;
-                logContainer.appendChild(analysisDiv);
+                renderAnalysis(logContainer, data);
             }
 
-            // Add debate messages
-            if (data.debate_content && data.debate_content.log && data.debate_content.log.length > 0) {
-                const messagesDiv = document.createElement('div');
-                messagesDiv.className = 'debate-messages';
-                data.debate_content.log.forEach(entry => {
-                    const messageDiv = document.createElement('div');
-                    messageDiv.className = 'debate-message';
-                    
-                    const agentDiv = document.createElement('div');
-                    agentDiv.className = 'agent-name';
-                    agentDiv.textContent = entry.agent;
-                    
-                    const responseDiv = document.createElement('div');
-                    responseDiv.className = 'agent-response';
-                    responseDiv.textContent = entry.response;
-                    
-                    messageDiv.appendChild(agentDiv);
-                    messageDiv.appendChild(responseDiv);
-                    messagesDiv.appendChild(messageDiv);
-                });
-                logContainer.appendChild(messagesDiv);
+            // Add new debate messages
+            if (data.debate_content && data.debate_content.log.length > 0) {
+                appendMessages(logContainer, data.debate_content.log);
+                renderedLogLength = data.debate_content.log_offset + data.debate_content.log.length;
             }
 
-            // Update summary handling
-            const summaryDiv = document.getElementById('debate-summary');
-            const summaryContent = document.getElementById('summary-content');
-
-            if (data.status === 'in_progress') {
-                summaryContent.innerHTML = `
-                    <div class="summary-processing">
-                        Debate in progress... Summary will be available when completed.
-                    </div>
-                `;
-                summaryDiv.style.display = 'block';
-            } else if (data.debate_content && data.debate_content.summary) {
-                // Check if marked library is loaded
-                if (typeof marked === 'undefined') {
-                    console.error('Marked library not loaded. Displaying raw content.');
-                    summaryContent.innerHTML = `
-                        <div class="summary-section">
-                            <h3>Debate Summary</h3>
-                            <div class="summary-text">${data.debate_content.summary}</div>
-                        </div>
-                    `;
-                } else {
-                    try {
-                        // Convert markdown to HTML using marked
-                        const markdownContent = data.debate_content.summary;
-                        const htmlContent = marked.parse(markdownContent);
-                        
-                        summaryContent.innerHTML = `
-                            <div class="summary-section markdown-content">
-                                <h3>Debate Summary</h3>
-                                <div class="summary-text">${htmlContent}</div>
-                            </div>
-                        `;
-                    } catch (error) {
-                        console.error('Error parsing summary:', error);
-                        summaryContent.innerHTML = `
-                            <div class="summary-section">
-                                <h3>Debate Summary</h3>
-                                <div class="summary-text">${data.debate_content.summary}</div>
-                            </div>
-                        `;
-                    }
-                }
-                summaryDiv.style.display = 'block';
-            }
+            renderSummary(data);
         } catch (error) {
             console.error('Error fetching log:', error);
         }
@@ -146,6 +174,119 @@ if (typeof debateId !== 'undefined') {
         }
     }
 
+    function updateStatusBadge(status) {
+        const statusElement = document.getElementById('status');
+        statusElement.textContent = status;
+        statusElement.className = `debate-status status-${status}`;
+        updateLoadingState(status === 'queued' || status === 'in_progress');
+    }
+
+    // Stream rounds, turns and tokens as they are generated
+    function streamDebate() {
+        const source = new EventSource(`/api/debate/${debateId}/stream`);
+        const logContainer = document.getElementById('debate-log');
+        const messagesDiv = document.createElement('div');
+        messagesDiv.className = 'debate-messages';
+        logContainer.innerHTML = '';
+        logContainer.appendChild(messagesDiv);
+
+        // Message element currently being streamed for each agent
+        const liveMessages = {};
+        // Turns already rendered, so events replayed after a reconnect are skipped
+        const completedTurns = new Set();
+        let finished = false;
+
+        function messageFor(agent) {
+            if (!liveMessages[agent]) {
+                const messageDiv = document.createElement('div');
+                messageDiv.className = 'debate-message streaming';
+
+                const agentDiv = document.createElement('div');
+                agentDiv.className = 'agent-name';
+                agentDiv.textContent = agent;
+
+                const responseDiv = document.createElement('div');
+                responseDiv.className = 'agent-response';
+
+                messageDiv.appendChild(agentDiv);
+                messageDiv.appendChild(responseDiv);
+                messagesDiv.appendChild(messageDiv);
+                liveMessages[agent] = messageDiv;
+            }
+            return liveMessages[agent];
+        }
+
+        source.addEventListener('status', event => {
+            const status = JSON.parse(event.data).status;
+            updateStatusBadge(status);
+            // The summary is generated after the last round; the stream ends once it is written
+            if (status === 'completed') {
+                renderSummary({ status, debate_content: { summary_status: 'in_progress' } });
+            }
+        });
+
+        const seenRounds = new Set();
+        source.addEventListener('round_start', event => {
+            const data = JSON.parse(event.data);
+            if (seenRounds.has(data.round)) {
+                return;
+            }
+            seenRounds.add(data.round);
+            const marker = document.createElement('div');
+            marker.className = 'round-marker';
+            marker.textContent = `Round ${data.round} of ${data.total_rounds}`;
+            messagesDiv.appendChild(marker);
+        });
+
+        source.addEventListener('turn_start', event => {
+            const data = JSON.parse(event.data);
+            if (!completedTurns.has(`${data.round}:${data.agent}`)) {
+                messageFor(data.agent).querySelector('.agent-response').textContent = '';
+            }
+        });
+
+        source.addEventListener('token', event => {
+            const data = JSON.parse(event.data);
+            if (!completedTurns.has(`${data.round}:${data.agent}`)) {
+                messageFor(data.agent).querySelector('.agent-response').textContent += data.delta;
+            }
+        });
+
+        source.addEventListener('turn_end', event => {
+            const data = JSON.parse(event.data);
+            const turnKey = `${data.round}:${data.agent}`;
+            if (completedTurns.has(turnKey)) {
+                return;
+            }
+            completedTurns.add(turnKey);
+            const messageDiv = messageFor(data.agent);
+            messageDiv.querySelector('.agent-response').textContent = data.response;
+            messageDiv.classList.remove('streaming');
+            delete liveMessages[data.agent];
+        });
+
+        source.addEventListener('end', () => {
+            finished = true;
+            source.close();
+            updateLoadingState(false);
+            // Replace the streamed messages with the final log, analysis and summary
+            resetDebateLog();
+            updateDebateLog();
+        });
+
+        source.onerror = () => {
+            // EventSource retries on its own; fall back to polling if it gives up
+            if (!finished && source.readyState === EventSource.CLOSED) {
+                resetDebateLog();
+                pollDebate();
+            }
+        };
+    }
+
     // Initialize
-    pollDebate();
+    if (typeof EventSource !== 'undefined') {
+        streamDebate();
+    } else {
+        pollDebate();
+    }
 }
\ No newline at end of file
@@ -0,0 +1,83 @@
+import asyncio
+import time
+
+import pytest
+
+from agents.completion_cache import CompletionCache
+
+
+def counting(completion=("text", {}), error=None, delay=0.05):
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return completion
+
+    return compute, calls
+
+
+async def gather_calls(cache, compute, count=5):
+    return await asyncio.gather(
+        *[cache.get_or_compute("key", compute) for _ in range(count)], return_exceptions=True
+    )
+
+
+def test_identical_calls_share_one_generation():
+    cache = CompletionCache(":memory:")
+    compute, calls = counting()
+
+    results = asyncio.run(gather_calls(cache, compute))
+
+    assert len(calls) == 1
+    assert sorted(source for _, source in results) == ["coalesced"] * 4 + ["miss"]
+    assert asyncio.run(cache.get_or_compute("key", compute)) == (("text", {}), "hit")
+    assert cache.get_stats() == {"hits": 1, "misses": 1, "coalesced": 4, "entries": 1}
+
+
+def test_waiters_get_the_generation_error_without_retrying():
+    cache = CompletionCache(":memory:")
+    compute, calls = counting(error=TimeoutError("backend timed out"))
+
+    results = asyncio.run(gather_calls(cache, compute))
+
+    assert len(calls) == 1
+    assert all(isinstance(result, TimeoutError) for result in results)
+    assert cache.get_stats()["entries"] == 0
+
+
+def test_a_waiter_takes_over_when_the_generating_call_is_cancelled():
+    cache = CompletionCache(":memory:")
+    compute, calls = counting()
+
+    async def run():
+        owner = asyncio.ensure_future(cache.get_or_compute("key", compute))
+        await asyncio.sleep(0.01)
+        waiters = [asyncio.ensure_future(cache.get_or_compute("key", compute)) for _ in range(3)]
+        await asyncio.sleep(0.01)
+        owner.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await owner
+        return await asyncio.gather(*waiters)
+
+    results = asyncio.run(run())
+
+    assert len(calls) == 2
+    assert sorted(source for _, source in results) == ["coalesced", "coalesced", "miss"]
+
+
+def test_least_recently_used_completions_are_evicted(tmp_path):
+    path = str(tmp_path / "completions.db")
+    cache = CompletionCache(path, max_entries=2)
+    # Apart enough that last-used times never tie
+    for step in (lambda: cache.put("a", "A"), lambda: cache.put("b", "B"), lambda: cache.get("a")):
+        step()
+        time.sleep(0.01)
+    cache.put("c", "C")
+
+    reopened = CompletionCache(path, max_entries=2)
+    assert reopened.get("b") is None
+    assert reopened.get("a") == ("A", {})
+    assert reopened.get("c") == ("C", {})
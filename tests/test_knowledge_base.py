@@ -0,0 +1,27 @@
+from agents.llm_registry import LLMRegistry
+from knowledge_base.rag import KnowledgeBase
+
+
+def make_knowledge_base(tmp_path):
+    documents_dir = tmp_path / "docs"
+    documents_dir.mkdir()
+    (documents_dir / "notes.txt").write_text("Neural networks learn representations from data.")
+    return KnowledgeBase("ai", str(documents_dir), llm_type="fake", registry=LLMRegistry())
+
+
+def test_unreadable_document_is_not_added(tmp_path):
+    kb = make_knowledge_base(tmp_path)
+
+    assert not kb.add_document(b"not a pdf", "bad.pdf")
+    assert [document["name"] for document in kb.list_documents()] == ["notes.txt"]
+    assert sorted(path.name for path in (tmp_path / "docs").iterdir()) == ["notes.txt"]
+
+
+def test_unreadable_replacement_keeps_the_previous_document(tmp_path):
+    kb = make_knowledge_base(tmp_path)
+    assert kb.add_document(b"Gradient descent minimizes a loss.", "method.txt")
+
+    assert not kb.add_document(b"", "method.txt")
+    assert (tmp_path / "docs" / "method.txt").read_bytes() == b"Gradient descent minimizes a loss."
+    assert {document["name"]: document["chunks"] for document in kb.list_documents()} == {"notes.txt": 1, "method.txt": 1}
+    assert sorted(path.name for path in (tmp_path / "docs").iterdir()) == ["method.txt", "notes.txt"]
@@ -0,0 +1,61 @@
+import threading
+import time
+
+import httpx
+import pytest
+from llama_index.core.base.llms.types import ChatMessage
+
+from agents.llm_registry import PooledOllama
+
+
+def make_llm(handler, request_timeout=30.0):
+    client = httpx.Client(transport=httpx.MockTransport(handler))
+    return PooledOllama(
+        client=client, limiter=threading.BoundedSemaphore(1), model="llama2", request_timeout=request_timeout
+    )
+
+
+def reply(request):
+    return httpx.Response(200, json={"message": {"role": "assistant", "content": "ok"}, "eval_count": 1})
+
+
+def test_http_timeout_ends_at_the_deadline():
+    timeouts = []
+
+    def handler(request):
+        timeouts.append(request.extensions["timeout"]["read"])
+        return reply(request)
+
+    llm = make_llm(handler)
+    llm.chat([ChatMessage(role="user", content="Hi")], deadline=time.monotonic() + 2.0)
+    llm.chat([ChatMessage(role="user", content="Hi")])
+
+    assert 0 < timeouts[0] <= 2.0
+    assert timeouts[1] == 30.0
+
+
+def test_call_gives_up_waiting_for_a_slot_at_its_deadline():
+    sent = []
+    release = threading.Event()
+
+    def handler(request):
+        sent.append(request)
+        release.wait(5)
+        return reply(request)
+
+    llm = make_llm(handler)
+    busy = threading.Thread(target=llm.chat, args=([ChatMessage(role="user", content="First")],))
+    busy.start()
+    while not sent:
+        time.sleep(0.01)
+
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        llm.chat([ChatMessage(role="user", content="Second")], deadline=time.monotonic() + 0.1)
+    assert time.monotonic() - started < 1.0
+
+    release.set()
+    busy.join()
+    # The abandoned call never reached the server, and the slot is free again
+    assert len(sent) == 1
+    assert llm.chat([ChatMessage(role="user", content="Third")]).message.content == "ok"
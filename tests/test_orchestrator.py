@@ -0,0 +1,131 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from agents.llm_registry import LLMRegistry
+from agents.orchestrator import DebateOrchestrator
+from agents.specializations import create_agent_for_domain
+from agents.store import InMemoryDebateStore
+
+
+def make_debate(**kwargs):
+    agents = [
+        SimpleNamespace(name="AI Expert", domain="ai", system_prompt="", knowledge_base=None),
+        SimpleNamespace(name="ML Expert", domain="ml", system_prompt="", knowledge_base=None)
+    ]
+    return DebateOrchestrator(
+        "Topic", agents, rounds=10, summary_llm_type="fake", summary_model_name="fake",
+        registry=LLMRegistry(), **kwargs
+    )
+
+
+def finish_round(debate, round_number):
+    for agent in debate.agents:
+        debate.debate_log.append({"agent": agent.name, "response": f"{agent.name} argues point {round_number}"})
+    debate.round_digests[round_number] = f"Digest of round {round_number}\nwith two lines"
+
+
+def histories(debate, rounds, budget):
+    result = []
+    for round_number in range(1, rounds + 1):
+        finish_round(debate, round_number)
+        result.append(asyncio.run(debate._build_history(budget)))
+    return result
+
+
+def test_history_only_replaces_the_latest_round():
+    debate = make_debate(context_window=100000)
+    history = histories(debate, 5, 10000)
+
+    assert history[0] == "Round 1:\nAI Expert: AI Expert argues point 1\nML Expert: ML Expert argues point 1"
+    for previous, current in zip(history, history[1:]):
+        digests = previous.rpartition("Round ")[0].rstrip("\n")
+        if digests:
+            assert current.startswith(digests + "\n")
+    assert history[-1].startswith(
+        "Round 1 (summary): Digest of round 1 with two lines\n"
+        "Round 2 (summary): Digest of round 2 with two lines\n"
+    )
+    assert history[-1].endswith("\nRound 5:\nAI Expert: AI Expert argues point 5\nML Expert: ML Expert argues point 5")
+
+
+def test_condensed_digests_are_appended_to_until_the_next_fold():
+    debate = make_debate()
+    history = histories(debate, 8, 150)
+
+    folds = [
+        number for number, (previous, current) in enumerate(zip(history, history[1:]), 2)
+        if not current.startswith(previous.rpartition("Round ")[0].rstrip("\n"))
+    ]
+    assert debate._history_digest.startswith("Rounds 1-")
+    # Folding to half the budget leaves room for more digests before the next fold
+    assert 0 < len(folds) < 7 - 1
+
+
+class SlowStore(InMemoryDebateStore):
+    def save(self, debate_id, state, entry=None):
+        time.sleep(0.1)
+        super().save(debate_id, state, entry=entry)
+
+
+def test_store_writes_do_not_block_the_event_loop():
+    debate = make_debate()
+    store = SlowStore()
+    debate.attach_store(store, "debate")
+
+    async def append_entries():
+        started = time.perf_counter()
+        for number in range(5):
+            debate._append_entry({"agent": "AI Expert", "response": f"Response {number}"})
+        queued_in = time.perf_counter() - started
+        await debate.flush_store()
+        return queued_in
+
+    assert asyncio.run(append_entries()) < 0.1
+    assert [entry["response"] for entry in store.get_entries("debate")] == [f"Response {n}" for n in range(5)]
+    assert store.get("debate")["details"]["status_info"]["log_length"] == 5
+
+
+class StubKnowledgeBase:
+    context_token_budget = 0
+
+    async def aquery(self, query_text, max_tokens=None):
+        return "Relevant knowledge."
+
+
+def make_agent_debate(loader):
+    registry = LLMRegistry()
+    agents = [create_agent_for_domain(domain, None, "fake", "fake", registry=registry) for domain in ("ai", "ml")]
+    return DebateOrchestrator(
+        "Topic", agents, rounds=1, summary_llm_type="fake", summary_model_name="fake",
+        registry=registry, knowledge_base_loader=loader
+    )
+
+
+def test_knowledge_bases_are_loaded_when_the_debate_starts():
+    loaded = []
+
+    def loader(domain):
+        loaded.append(domain)
+        return StubKnowledgeBase()
+
+    debate = make_agent_debate(loader)
+    assert loaded == []
+
+    asyncio.run(debate.conduct_debate(summarize=False))
+
+    assert sorted(loaded) == ["ai", "ml"]
+    assert debate.status == "completed"
+    assert len(debate.debate_log) == 2
+    assert "knowledge_bases" in debate.get_status()["timings"]["stages"]
+
+
+def test_debate_fails_when_a_knowledge_base_is_missing():
+    debate = make_agent_debate(lambda domain: StubKnowledgeBase() if domain == "ai" else None)
+
+    with pytest.raises(ValueError):
+        asyncio.run(debate.conduct_debate(summarize=False))
+    assert debate.status == "error"
+    assert debate.summary_status == "skipped"
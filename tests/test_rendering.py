@@ -0,0 +1,28 @@
+import pytest
+
+from agents.rendering import render_markdown
+
+
+@pytest.mark.parametrize("url", [
+    "javascript:alert(1)",
+    "&#106;avascript:alert(1)",
+    "java&#x09;script:alert(1)",
+    "java&Tab;script:alert(1)",
+    "javascript&colon;alert(1)",
+    "JaVaScRiPt:alert(1)",
+    "data:text/html,<script>alert(1)</script>"
+])
+def test_script_urls_are_dropped(url):
+    for text in (f"[x]({url})", f"![x]({url})"):
+        rendered = render_markdown(text)
+        assert "href" not in rendered and "src" not in rendered
+
+
+@pytest.mark.parametrize("url", ["https://example.com/a?b=1&c=2", "mailto:someone@example.com", "/relative/path"])
+def test_safe_urls_are_kept(url):
+    assert "href=" in render_markdown(f"[x]({url})")
+
+
+def test_raw_html_is_escaped():
+    rendered = render_markdown("<script>alert(1)</script> <img src=x onerror=alert(1)>")
+    assert "<script>" not in rendered and "<img" not in rendered
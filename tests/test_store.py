@@ -0,0 +1,99 @@
+import os
+import socket
+import time
+
+import pytest
+
+from agents.store import InMemoryDebateStore, SQLiteDebateStore
+
+
+def make_state(status, summary_status="pending"):
+    return {
+        "topic": "Topic",
+        "summary": "",
+        "agents": [],
+        "status_info": {
+            "status": status,
+            "current_round": 1,
+            "total_rounds": 3,
+            "agents": [],
+            "log_length": 0,
+            "has_summary": False,
+            "summary_status": summary_status,
+            "version": 1
+        }
+    }
+
+
+def test_reopen_marks_debates_of_a_stopped_process_as_failed(tmp_path):
+    path = str(tmp_path / "debates.db")
+    store = SQLiteDebateStore(path)
+    store.create("running", make_state("in_progress"))
+    store.create("queued", make_state("queued"))
+    store.create("summarizing", make_state("completed", "in_progress"))
+    store.create("done", make_state("completed", "completed"))
+
+    # Reopening in the same process stands in for a restart with the same PID
+    reopened = SQLiteDebateStore(path)
+
+    assert reopened.get("running")["status"] == "error"
+    assert reopened.get("running")["details"]["status_info"]["status"] == "error"
+    assert reopened.get("running")["details"]["status_info"]["summary_status"] == "skipped"
+    assert reopened.get("queued")["status"] == "error"
+    summarizing = reopened.get("summarizing")
+    assert summarizing["status"] == "completed"
+    assert summarizing["details"]["status_info"]["summary_status"] == "error"
+    assert summarizing["version"] == 2
+    assert reopened.get("done")["version"] == 1
+
+
+def test_reopen_keeps_debates_of_a_running_process(tmp_path):
+    path = str(tmp_path / "debates.db")
+    store = SQLiteDebateStore(path)
+    store.create("running", make_state("in_progress"))
+    # Owned by another process that is still alive
+    with store._conn:
+        store._conn.execute(
+            "UPDATE debates SET owner = ? WHERE id = ?",
+            (f"{socket.gethostname()}:{os.getppid()}", "running")
+        )
+
+    reopened = SQLiteDebateStore(path)
+
+    assert reopened.get("running")["status"] == "in_progress"
+
+
+def test_reopen_marks_debates_without_an_owner_as_failed(tmp_path):
+    path = str(tmp_path / "debates.db")
+    store = SQLiteDebateStore(path)
+    store.create("legacy", make_state("in_progress"))
+    with store._conn:
+        store._conn.execute("UPDATE debates SET owner = NULL")
+
+    reopened = SQLiteDebateStore(path)
+
+    assert reopened.get("legacy")["status"] == "error"
+
+
+@pytest.mark.parametrize("make_store", [
+    lambda tmp_path: InMemoryDebateStore(max_finished=1, retention_seconds=None),
+    lambda tmp_path: SQLiteDebateStore(str(tmp_path / "debates.db"), max_finished=1, retention_seconds=None)
+])
+def test_prune_keeps_debates_still_being_summarized(tmp_path, make_store):
+    store = make_store(tmp_path)
+    for debate_id, status, summary_status in [
+        ("summarizing", "completed", "in_progress"),
+        ("summary_pending", "completed", "pending"),
+        ("old", "completed", "completed"),
+        ("failed", "error", "skipped"),
+        ("running", "in_progress", "pending")
+    ]:
+        store.create(debate_id, make_state(status, summary_status))
+        # Apart enough that update times never tie
+        time.sleep(0.01)
+
+    # Creating a debate prunes the store
+    assert store.prune() == 0
+    assert store.get("old") is None
+    for debate_id in ("summarizing", "summary_pending", "failed", "running"):
+        assert store.get(debate_id) is not None